@@ -0,0 +1,73 @@
+import io
+import os
+import sys
+import shutil
+import tempfile
+import argparse
+import contextlib
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from recorded_site import start_site, MirrorUrls
+from page_ready import set_url_mapper
+
+# What a DOM-only Chrome session costs per posting of recorded_site.py's board
+# (banner image, web font and tag manager script on every posting):
+#   full - the old sessions: everything downloaded, no profile
+#   lean - browser_profiles.BrowserProfiles: images, media, fonts and trackers
+#          blocked, extra Chrome features off, fresh profile directory
+#   warm - lean again, on the profile directory the previous run left behind
+# Reports bytes downloaded and load time per page, and Chrome's resident memory
+# (chromedriver and all its Chrome processes). Needs Chrome and chromedriver.
+#
+#   python benchmarks/bench_browser_profiles.py [--postings 20] [--site-latency 0.02]
+
+def run(links, profiles):
+    from browser_pool import BrowserPool
+    from browser_profiles import process_tree_rss
+    from page_ready import PageReadiness, DomainLatency
+    readiness = PageReadiness(latency=DomainLatency(path=os.devnull))
+    peak_rss = 0
+    with contextlib.redirect_stdout(io.StringIO()), BrowserPool(size=1, profiles=profiles) as pool, \
+            pool.driver() as driver:
+        for link in links:
+            readiness.get(driver, link, baseline=0)
+            peak_rss = max(peak_rss, process_tree_rss(driver.service.process.pid) or 0)
+        readiness.settle(driver)  # Count the last page's late requests too
+    downloaded, blocked = readiness.traffic()
+    return {"bytes": downloaded / readiness.loads, "seconds": readiness.load_seconds / readiness.loads,
+            "blocked": blocked / readiness.loads, "rss": peak_rss}
+
+def main():
+    parser = argparse.ArgumentParser(description="Lean vs full Chrome sessions for DOM-only work")
+    parser.add_argument("--postings", type=int, default=20)
+    parser.add_argument("--site-latency", type=float, default=0.0, help="Board seconds per request")
+    args = parser.parse_args()
+
+    site = start_site(jobs=args.postings, latency=args.site_latency)
+    set_url_mapper(MirrorUrls(site.url))
+    from browser_profiles import BrowserProfiles
+    links = [f"https://www.indeed.com/viewjob?jk={posting['jk']}" for posting in site.postings]
+    profile_dir = tempfile.mkdtemp(prefix="bench-profiles-")
+
+    print(f"{len(links)} postings from the local board")
+    results = {}
+    try:
+        for name in ("full", "lean", "warm"):
+            profiles = None if name == "full" else BrowserProfiles(profile_dir=profile_dir)
+            try:
+                results[name] = result = run(links, profiles)
+            except Exception as e:
+                print(f"  skipped: {str(e).splitlines()[0] if str(e) else type(e).__name__}")
+                return
+            print(f"  {name:5} {result['bytes'] / 1e3:7.0f} kB/page, {1000 * result['seconds']:6.0f} ms/page, "
+                  f"{result['blocked']:.1f} blocked/page, Chrome RSS {result['rss'] / 1e6:.0f} MB")
+        print(f"  lean downloads {results['full']['bytes'] / max(results['lean']['bytes'], 1):.1f}x fewer bytes, "
+              f"loads {results['full']['seconds'] / max(results['lean']['seconds'], 1e-9):.1f}x faster")
+    finally:
+        shutil.rmtree(profile_dir, ignore_errors=True)
+        site.shutdown()
+
+if __name__ == "__main__":
+    main()
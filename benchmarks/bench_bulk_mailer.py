@@ -0,0 +1,158 @@
+import io
+import os
+import sys
+import json
+import base64
+import time
+import asyncio
+import socket
+import contextlib
+import smtplib
+import tempfile
+import argparse
+import logging
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from bulk_mailer import TokenCache, SMTPSession, BulkMailer, SendRateLimiter, SentLog, generate_oauth2_string, \
+    resume_part
+from email.mime.multipart import MIMEMultipart
+from email.mime.text import MIMEText
+
+# Messages/second of application emails against a local aiosmtpd server that
+# accepts XOAUTH2, with a local OAuth2 token endpoint:
+#   legacy - what send_email_oauth2 did for every message: fetch a token, open
+#            and authenticate a new connection, read and encode the resume
+#   bulk   - bulk_mailer.BulkMailer: cached token, one connection, resume encoded once
+# Provider rate limits are off here; they cap real sends far below either rate.
+#
+#   pip install aiosmtpd
+#   python benchmarks/bench_bulk_mailer.py [--messages 50] [--auth-latency 0.3]
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+RESUME_PATH = os.path.join(ROOT, "Resume Mar 25.pdf")
+
+class Mailbox:
+    """aiosmtpd handler: accepts XOAUTH2 after `auth_latency` (TLS + auth round trips) and counts messages."""
+
+    def __init__(self, auth_latency, data_latency):
+        self.auth_latency = auth_latency
+        self.data_latency = data_latency
+        self.logins = 0
+        self.messages = 0
+
+    async def auth_XOAUTH2(self, server, args):
+        from aiosmtpd.smtp import AuthResult
+        await asyncio.sleep(self.auth_latency)
+        self.logins += 1
+        # args: ["XOAUTH2", base64("user=...\x01auth=Bearer <token>\x01\x01")]
+        return AuthResult(success=b"auth=Bearer " in base64.b64decode(args[-1]), handled=False, auth_data=args[-1])
+
+    async def handle_DATA(self, server, session, envelope):
+        await asyncio.sleep(self.data_latency)
+        self.messages += 1
+        return "250 Message accepted for delivery"
+
+def start_token_server(latency):
+    class TokenHandler(BaseHTTPRequestHandler):
+        def log_message(self, format, *args):
+            pass
+
+        def do_POST(self):
+            self.rfile.read(int(self.headers.get("Content-Length", 0)))
+            time.sleep(latency)
+            self.server.requests += 1
+            body = json.dumps({"access_token": f"token-{self.server.requests}", "expires_in": 3599}).encode()
+            self.send_response(200)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), TokenHandler)
+    server.requests = 0
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+def free_port():
+    # The controller checks it's up by connecting to its port, so port 0 won't do
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+def render(job):
+    return (f"Application for {job['title']} Position at {job['company']}",
+            f"Dear Hiring Manager,\n\nI am writing to express my interest in the {job['title']} position "
+            f"at {job['company']}.\n")
+
+def legacy(jobs, host, port, token_url):
+    for job in jobs:
+        tokens = TokenCache("client", "secret", "refresh", path=None, token_url=token_url)
+        subject, body = render(job)
+        msg = MIMEMultipart()
+        msg["From"], msg["To"], msg["Subject"] = "me@example.com", job["recipient"], subject
+        msg.attach(MIMEText(body, "plain"))
+        msg.attach(resume_part(RESUME_PATH))
+        with smtplib.SMTP(host, port) as server:
+            server.ehlo()
+            code, response = server.docmd("AUTH", "XOAUTH2 " + generate_oauth2_string("me@example.com", tokens.get()))
+            if code != 235:
+                raise Exception("Authentication failed: " + str(response))
+            server.send_message(msg)
+
+def bulk(jobs, host, port, token_url, workdir):
+    tokens = TokenCache("client", "secret", "refresh", path=os.path.join(workdir, "token.json"), token_url=token_url)
+    session = SMTPSession(host, port, username="me@example.com", tokens=tokens, use_ssl=False)
+    sent_log = SentLog(os.path.join(workdir, "sent.json"))
+    mailer = BulkMailer(session, "me@example.com", render, resume_path=RESUME_PATH,
+                        limiter=SendRateLimiter(sent_log=sent_log), sent_log=sent_log)
+    mailer.send_all(jobs)
+    mailer.close()
+    return mailer
+
+def main():
+    parser = argparse.ArgumentParser(description="Bulk application email benchmark")
+    parser.add_argument("--messages", type=int, default=50)
+    parser.add_argument("--auth-latency", type=float, default=0.3, help="Seconds to connect and authenticate")
+    parser.add_argument("--data-latency", type=float, default=0.05, help="Seconds to accept a message")
+    parser.add_argument("--token-latency", type=float, default=0.2, help="Seconds per OAuth2 token request")
+    args = parser.parse_args()
+    try:
+        from aiosmtpd.controller import Controller
+        logging.getLogger("mail.log").setLevel(logging.ERROR)  # aiosmtpd warns about its own API on every AUTH
+    except ImportError:
+        print("This benchmark needs aiosmtpd: pip install aiosmtpd")
+        return
+
+    mailbox = Mailbox(args.auth_latency, args.data_latency)
+    host, port = "127.0.0.1", free_port()
+    controller = Controller(mailbox, hostname=host, port=port, auth_require_tls=False)
+    controller.start()
+    token_server = start_token_server(args.token_latency)
+    token_url = f"http://127.0.0.1:{token_server.server_port}/token"
+    jobs = [{"company": f"Company {i}", "title": "Software Engineer", "recipient": f"hr{i}@example.com"}
+            for i in range(args.messages)]
+
+    print(f"{args.messages} messages with a {os.path.getsize(RESUME_PATH) // 1024} KiB resume, local aiosmtpd")
+    results = {}
+    for name in ("legacy", "bulk"):
+        logins, tokens = mailbox.logins, token_server.requests
+        with tempfile.TemporaryDirectory() as workdir:
+            start = time.perf_counter()
+            if name == "legacy":
+                legacy(jobs, host, port, token_url)
+            else:
+                with contextlib.redirect_stdout(io.StringIO()):  # One "Email sent" line per message
+                    bulk(jobs, host, port, token_url, workdir)
+            elapsed = time.perf_counter() - start
+        results[name] = elapsed
+        print(f"  {name:6} {args.messages / elapsed:6.2f} messages/s ({elapsed:.1f}s), "
+              f"{mailbox.logins - logins} SMTP logins, {token_server.requests - tokens} token requests")
+    print(f"  speedup {results['legacy'] / results['bulk']:.1f}x; {mailbox.messages} messages delivered")
+    controller.stop()
+    token_server.shutdown()
+
+if __name__ == "__main__":
+    main()
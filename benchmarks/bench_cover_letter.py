@@ -0,0 +1,77 @@
+import os
+import sys
+import json
+import time
+import tempfile
+import argparse
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from llm_gateway import LLMGateway
+from cover_letter import CoverLetterWriter, LETTER_INSTRUCTIONS
+from prompts import PromptBuilder
+from mock_openai_server import start_server
+
+# Latency and output size of cover letters for the sample postings in
+# fixtures/match_samples.json, each applied to twice (a repost or the same role
+# on another board), against a mock server paced per generated word:
+#   full     - the whole letter written by the LLM for every application
+#   template - cover_letter.CoverLetterWriter: template filled locally plus one
+#              streamed, capped tailoring paragraph cached per company and role
+#
+#   python benchmarks/bench_cover_letter.py [--token-latency 0.005]
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+PARAGRAPH = ("My recent work automating job applications with Python, Selenium and LLM integration maps "
+             "directly onto the tooling this role describes, and leading a 33-member detachment taught me "
+             "to turn loose requirements into plans a team can deliver.")
+
+def mock_reply(messages):
+    if "ONE short paragraph" in messages[0]["content"]:
+        # Models often keep going after the paragraph; the writer stops reading at the break
+        return PARAGRAPH + "\n\n" + "Furthermore, " + "I would welcome the chance to discuss this. " * 10
+    return "Dear Hiring Manager,\n\n" + " ".join([PARAGRAPH] * 8) + "\n\nSincerely,\nIssac Vinson"
+
+def main():
+    parser = argparse.ArgumentParser(description="Cover letter generation benchmark")
+    parser.add_argument("--latency", type=float, default=0.3, help="Mock seconds before the first token")
+    parser.add_argument("--token-latency", type=float, default=0.005, help="Mock seconds per generated word")
+    args = parser.parse_args()
+
+    with open(os.path.join(ROOT, "profile.json")) as f:
+        profile = json.load(f)
+    with open(os.path.join(ROOT, "fixtures", "match_samples.json")) as f:
+        samples = json.load(f)
+    applications = samples + samples
+
+    server = start_server(latency=args.latency, token_latency=args.token_latency, reply=mock_reply)
+    gateway = LLMGateway(api_key="test", base_url=f"http://127.0.0.1:{server.server_port}/v1",
+                         rate=1000, burst=1000)
+    prompts = PromptBuilder(profile)
+
+    start = time.perf_counter()
+    words = 0
+    for sample in applications:
+        letter = gateway.call("cover_letter", prompts.messages(
+            "cover_letter", LETTER_INSTRUCTIONS, f"Job description: {sample['description']}"))
+        words += len(letter.split())
+    full = time.perf_counter() - start, words
+
+    with tempfile.TemporaryDirectory() as tmp:
+        writer = CoverLetterWriter(gateway, profile, prompts, variants_path=os.path.join(tmp, "variants.json"))
+        start = time.perf_counter()
+        for sample in applications:
+            writer.letter(sample["description"], sample.get("company"), sample.get("title"))
+        # Only generated paragraphs cost output tokens; each one is cut at PARAGRAPH's end
+        template = time.perf_counter() - start, writer.stats["generated"] * len(PARAGRAPH.split())
+
+    print(f"{len(applications)} applications ({len(samples)} distinct roles), mock server")
+    for name, (elapsed, words) in (("full", full), ("template", template)):
+        print(f"  {name:8} {elapsed / len(applications):.2f}s per letter, "
+              f"~{words / len(applications):.0f} generated words per letter")
+    gateway.close()
+    server.shutdown()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,230 @@
+import os
+import re
+import sys
+import json
+import time
+import shutil
+import tempfile
+import argparse
+import itertools
+import threading
+import subprocess
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from mock_openai_server import start_server
+from recorded_site import start_site, MirrorUrls
+from bench_match_scoring import mock_reply as match_reply
+
+# End-to-end throughput on a fixed offline baseline: the job board comes from
+# recorded_site.py (recorded HAR/WARC pages, or a board generated from the
+# fixtures) and Grok from mock_openai_server.py with deterministic replies.
+# Every scenario runs in a fresh process and a fresh working directory, so no
+# cache, ledger or crawl state carries over between runs:
+#   scrape  - job_applier.scrape_jobs over every results page (plain HTTP)
+#   filter  - scrape, then filter_jobs on the posting descriptions (plain HTTP + LLM)
+#   apply   - scrape, then filter_job and apply_to_job per posting on Chrome
+#   main    - job_applier.main() end to end on Chrome
+#   vision  - jobbappVision.main() end to end on Chrome (one worker: the mock plans
+#             the application steps in order)
+# Reported: jobs/minute, time to the first submitted application, LLM calls per
+# job and peak RSS (this process and the browsers it started).
+#
+#   python benchmarks/bench_end_to_end.py                           # every scenario Chrome allows
+#   python benchmarks/bench_end_to_end.py --scenario filter --latency 0.5
+#   python benchmarks/bench_end_to_end.py --recording indeed.warc.gz --scenario scrape
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+SCENARIOS = ["scrape", "filter", "apply", "main", "vision"]
+BROWSER_SCENARIOS = {"apply", "main", "vision"}
+KEYWORD, LOCATION = "python developer", "remote"
+
+PARAGRAPH = ("My recent work automating job applications with Python, Selenium and LLM integration maps "
+             "directly onto the tooling this role describes.")
+
+# The application steps of a generated posting, as a vision model would plan them
+APPLY_STEPS = [
+    {"inputs": [], "file_inputs": [],
+     "button": {"xpath": "//button[contains(text(), 'Apply Now')]", "text": "Apply Now"}},
+    {"inputs": [{"xpath": f"//input[@id='{name}']", "type": "text"}
+                for name in ("first_name", "last_name", "email", "phone")]
+               + [{"xpath": "//textarea[@name='motivation']", "type": "text"}],
+     "file_inputs": [{"xpath": "//input[@id='resume_upload']", "type": "file"},
+                     {"xpath": "//input[@id='cover_upload']", "type": "file"}],
+     "button": {"xpath": "//button[@type='submit']", "text": "Submit application"}},
+    {"inputs": [], "file_inputs": [], "button": None, "complete": True},
+]
+
+def make_reply():
+    """Deterministic replies for every prompt the scripts send."""
+    steps = itertools.cycle(APPLY_STEPS)
+    lock = threading.Lock()
+
+    def reply(messages):
+        system = str(messages[0].get("content", ""))
+        content = str(messages[-1].get("content", ""))
+        if "Postings:" in content:
+            return match_reply(messages)
+        if "ONE short paragraph" in system:
+            return PARAGRAPH
+        if content.startswith("Fields:") or "\nFields:" in content:
+            ids = re.findall(r"^\[(\d+)\]", content.split("Fields:", 1)[1], re.MULTILINE)
+            return json.dumps({"answers": [{"id": int(i), "answer": "Yes", "reusable": True} for i in ids]})
+        if "next action" in content:
+            with lock:
+                return json.dumps(next(steps))
+        if "successfully submitted" in content:
+            return json.dumps({"success": True, "message": "Application submitted"})
+        if "identify job" in content:
+            return json.dumps({"jobs": []})
+        if "Extract the job description" in content:
+            return "No description found."
+        if "Answer this question" in content:
+            return "I enjoy building reliable Python services and this team's work matches my experience."
+        return match_reply(messages)
+
+    return reply
+
+def browser_available():
+    return any(shutil.which(name) for name in ("chromedriver", "google-chrome", "chromium", "chromium-browser"))
+
+def peak_rss():
+    """Peak resident set size in MB of this process and of its (waited-for) children, e.g. Chrome."""
+    import resource
+    scale = 1024 * 1024 if sys.platform == "darwin" else 1024  # ru_maxrss is bytes on macOS, KB on Linux
+    return (resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / scale,
+            resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss / scale)
+
+def scrape_all(job_applier, pages):
+    jobs = []
+    for page in range(pages):
+        found = job_applier.scrape_jobs(KEYWORD, LOCATION, page)
+        if not found:
+            break
+        jobs.extend(found)
+    return jobs
+
+def descriptions(jobs):
+    import requests
+    from bs4 import BeautifulSoup
+    from page_ready import fetch_url
+    texts = []
+    with requests.Session() as session:
+        for job in jobs:
+            soup = BeautifulSoup(session.get(fetch_url(job["link"])).text, "html.parser")
+            element = soup.select_one("#jobDescriptionText")
+            texts.append(element.get_text("\n", strip=True) if element else "")
+    return texts
+
+def run_child(scenario, pages, max_applications):
+    """One scenario in this (fresh) process; returns its counts."""
+    started = time.time()
+    result = {"started": started, "jobs": 0, "applied": 0}
+    if scenario == "vision":
+        import jobbappVision
+        jobbappVision.main(["--workers", "1", "--max-pages", str(pages), "--max-applications", str(max_applications),
+                            "--query", KEYWORD, "--location", LOCATION, "--verbosity", "0"])
+    elif scenario == "main":
+        import job_applier
+        job_applier.main(["--max-pages", str(pages), "--max-applications", str(max_applications),
+                          "--query", KEYWORD, "--location", LOCATION, "--verbosity", "0"])
+    else:
+        import job_applier
+        jobs = scrape_all(job_applier, pages)
+        result["jobs"] = len(jobs)
+        if scenario == "filter":
+            job_applier.filter_jobs(descriptions(jobs))
+        elif scenario == "apply":
+            from browser_pool import BrowserPool
+            with BrowserPool(size=1) as pool, pool.driver() as driver:
+                for job in jobs:
+                    if result["applied"] >= max_applications:
+                        break
+                    if job_applier.filter_job(driver, job["link"]):
+                        result["applied"] += bool(job_applier.apply_to_job(driver, job["link"], job=job))
+        job_applier.close_resources()
+    if scenario in ("main", "vision"):
+        import tracing
+        counts = tracing.tracer().counts
+        result["jobs"], result["applied"] = counts.get("postings", 0), counts.get("applied", 0)
+    result["elapsed"] = time.time() - started
+    result["rss"], result["rss_children"] = peak_rss()
+    return result
+
+def run_scenario(scenario, site, llm, args):
+    workdir = tempfile.mkdtemp(prefix=f"bench-{scenario}-")
+    shutil.copy(os.path.join(ROOT, "profile.json"), workdir)
+    env = dict(os.environ, XAI_BASE_URL=f"http://127.0.0.1:{llm.server_port}/v1", XAI_API_KEY="test",
+               RESUME_URL=site.resume_url, RESUME_PATH=os.path.join(workdir, "resume.pdf"),
+               TRACE_DIR="", JOB_APPLIER_VERBOSITY="0", PYTHONPATH=ROOT,
+               POLITENESS="0")  # Per-host pacing would only time its own intervals on a local board
+    llm_before, applications_before = llm.requests, len(site.applied_at)
+    try:
+        child = subprocess.run(
+            [sys.executable, os.path.abspath(__file__), "--child", scenario, "--pages", str(args.pages),
+             "--max-applications", str(args.max_applications), "--mirror", site.url],
+            cwd=workdir, env=env, capture_output=True, text=True, timeout=args.timeout)
+    finally:
+        if not args.keep:
+            shutil.rmtree(workdir, ignore_errors=True)
+    if args.verbose or child.returncode:
+        sys.stderr.write(child.stdout + child.stderr)
+    lines = [line for line in child.stdout.splitlines() if line.startswith("RESULT ")]
+    if child.returncode or not lines:
+        return None
+    result = json.loads(lines[-1][len("RESULT "):])
+    result["llm_calls"] = llm.requests - llm_before
+    applied_at = site.applied_at[applications_before:]
+    result["first_application"] = min(applied_at) - result["started"] if applied_at else None
+    return result
+
+def main():
+    parser = argparse.ArgumentParser(description="Offline end-to-end throughput benchmark")
+    parser.add_argument("--scenario", action="append", choices=SCENARIOS, dest="scenarios",
+                        help="Scenario to run (repeatable; default: all that can run here)")
+    parser.add_argument("--recording", help="HAR or WARC file to serve instead of the generated board")
+    parser.add_argument("--jobs", type=int, default=40, help="Postings on the generated board")
+    parser.add_argument("--pages", type=int, default=5, help="Results pages to crawl")
+    parser.add_argument("--max-applications", type=int, default=3)
+    parser.add_argument("--latency", type=float, default=0.2, help="Mock LLM seconds per request")
+    parser.add_argument("--token-latency", type=float, default=0.0, help="Mock LLM seconds per generated word")
+    parser.add_argument("--site-latency", type=float, default=0.0, help="Board seconds per request")
+    parser.add_argument("--timeout", type=float, default=1800, help="Seconds before a scenario is abandoned")
+    parser.add_argument("--keep", action="store_true", help="Keep each scenario's working directory")
+    parser.add_argument("--verbose", action="store_true", help="Show the scripts' output")
+    parser.add_argument("--child", choices=SCENARIOS, help=argparse.SUPPRESS)
+    parser.add_argument("--mirror", help=argparse.SUPPRESS)  # The child's board: the parent's recorded_site
+    args = parser.parse_args()
+
+    if args.child:
+        from page_ready import set_url_mapper
+        set_url_mapper(MirrorUrls(args.mirror))
+        print("RESULT " + json.dumps(run_child(args.child, args.pages, args.max_applications)))
+        return
+
+    scenarios = args.scenarios or SCENARIOS
+    site = start_site(args.recording, jobs=args.jobs, latency=args.site_latency)
+    llm = start_server(latency=args.latency, token_latency=args.token_latency, reply=make_reply())
+    print(f"{'recording ' + args.recording if args.recording else f'{args.jobs} generated postings'}, "
+          f"mock LLM {args.latency}s per request")
+    print(f"  {'scenario':8} {'jobs':>5} {'time':>8} {'jobs/min':>9} {'applied':>8} {'1st app':>8} "
+          f"{'LLM calls':>10} {'calls/job':>10} {'peak RSS':>9} {'+ browser':>10}")
+    for scenario in scenarios:
+        if scenario in BROWSER_SCENARIOS and not browser_available():
+            print(f"  {scenario:8} skipped: needs Chrome and chromedriver")
+            continue
+        result = run_scenario(scenario, site, llm, args)
+        if result is None:
+            print(f"  {scenario:8} failed (rerun with --verbose for its output)")
+            continue
+        jobs = result["jobs"]
+        first = f"{result['first_application']:.1f}s" if result["first_application"] is not None else "-"
+        print(f"  {scenario:8} {jobs:5} {result['elapsed']:7.1f}s {60 * jobs / max(result['elapsed'], 1e-9):9.1f} "
+              f"{result['applied']:8} {first:>8} {result['llm_calls']:10} "
+              f"{result['llm_calls'] / jobs if jobs else 0:10.2f} {result['rss']:7.0f}MB {result['rss_children']:8.0f}MB")
+    llm.shutdown()
+    site.shutdown()
+
+if __name__ == "__main__":
+    main()
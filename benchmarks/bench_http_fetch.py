@@ -0,0 +1,68 @@
+import io
+import os
+import sys
+import time
+import argparse
+import resource
+import contextlib
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from recorded_site import start_site, MirrorUrls
+from page_ready import set_url_mapper
+
+# Cost of reading one posting: http_fetch.HttpFetcher (pooled keep-alive client,
+# extraction on the raw HTML) against a pooled Chrome session (navigate, wait for
+# readiness, extract from the DOM), on the generated board of recorded_site.py.
+# Chrome is skipped when it isn't installed.
+#
+#   python benchmarks/bench_http_fetch.py [--postings 30] [--site-latency 0.02]
+
+def peak_rss_mb(who=resource.RUSAGE_SELF):
+    return resource.getrusage(who).ru_maxrss / (1024 * 1024 if sys.platform == "darwin" else 1024)
+
+def main():
+    parser = argparse.ArgumentParser(description="HTTP fast path vs Chrome per posting")
+    parser.add_argument("--postings", type=int, default=30)
+    parser.add_argument("--site-latency", type=float, default=0.0, help="Board seconds per request")
+    args = parser.parse_args()
+
+    site = start_site(jobs=args.postings, latency=args.site_latency)
+    set_url_mapper(MirrorUrls(site.url))
+    from http_fetch import HttpFetcher
+    from extractors import Extractor
+    links = [f"https://www.indeed.com/viewjob?jk={posting['jk']}" for posting in site.postings]
+
+    print(f"{len(links)} postings from the local board")
+    fetcher, extractor = HttpFetcher(), Extractor()
+    rss_before = peak_rss_mb()
+    start = time.perf_counter()
+    with contextlib.redirect_stdout(io.StringIO()):
+        snapshots = [fetcher.snapshot(link, extractor) for link in links]
+    elapsed = time.perf_counter() - start
+    print(f"  http    {1000 * elapsed / len(links):7.1f} ms per posting, "
+          f"{sum(s is not None for s in snapshots)}/{len(links)} described, "
+          f"peak RSS +{peak_rss_mb() - rss_before:.0f} MB")
+    fetcher.close()
+
+    try:
+        from browser_pool import BrowserPool
+        from page_ready import PageReadiness
+        with contextlib.redirect_stdout(io.StringIO()), BrowserPool(size=1) as pool, pool.driver() as driver:
+            readiness = PageReadiness()
+            start = time.perf_counter()
+            described = 0
+            for link in links:
+                readiness.get(driver, link, baseline=2)
+                described += extractor.description(driver, link) is not None
+            elapsed = time.perf_counter() - start
+    except Exception as e:
+        print(f"  chrome  skipped: {str(e).splitlines()[0] if str(e) else type(e).__name__}")
+    else:
+        print(f"  chrome  {1000 * elapsed / len(links):7.1f} ms per posting, {described}/{len(links)} described, "
+              f"Chrome peak RSS {peak_rss_mb(resource.RUSAGE_CHILDREN):.0f} MB")
+    site.shutdown()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,51 @@
+import os
+import sys
+import time
+import statistics
+import subprocess
+
+# Measures cold-start cost of the applier scripts: bare import, and a full
+# `--dry-run` invocation. Each sample is a fresh interpreter so nothing is cached.
+#
+#   python benchmarks/bench_import.py [runs]
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+MODULES = ["job_applier", "jobbappVision"]
+
+def time_command(args, runs):
+    samples = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        subprocess.run(args, cwd=REPO_ROOT, check=True,
+                       stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+        samples.append(time.perf_counter() - start)
+    return samples
+
+def heaviest_imports(module, top=5):
+    """Cumulative import time per module from `python -X importtime`."""
+    result = subprocess.run([sys.executable, "-X", "importtime", "-c", f"import {module}"],
+                            cwd=REPO_ROOT, capture_output=True, text=True, check=True)
+    rows = []
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _, cumulative, name = line[len("import time:"):].split("|")
+        rows.append((int(cumulative), name.strip()))
+    return sorted(rows, reverse=True)[:top]
+
+def main():
+    runs = int(sys.argv[1]) if len(sys.argv) > 1 else 5
+    baseline = statistics.median(time_command([sys.executable, "-c", "pass"], runs))
+    print(f"Interpreter startup: {baseline * 1000:.0f} ms (median of {runs})")
+    for module in MODULES:
+        imports = time_command([sys.executable, "-c", f"import {module}"], runs)
+        dry_run = time_command([sys.executable, f"{module}.py", "--dry-run"], runs)
+        print(f"{module}:")
+        print(f"  import:    {statistics.median(imports) * 1000:.0f} ms "
+              f"({(statistics.median(imports) - baseline) * 1000:.0f} ms over bare startup)")
+        print(f"  --dry-run: {statistics.median(dry_run) * 1000:.0f} ms")
+        for cumulative, name in heaviest_imports(module):
+            print(f"    {cumulative / 1000:7.1f} ms  {name}")
+
+if __name__ == "__main__":
+    main()
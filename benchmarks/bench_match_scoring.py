@@ -0,0 +1,99 @@
+import os
+import re
+import sys
+import json
+import time
+import argparse
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from llm_gateway import LLMGateway
+from match_scoring import MatchScorer
+from mock_openai_server import start_server
+
+# Accuracy, round trips, prompt size and latency of match decisions on the fixed
+# sample set in fixtures/match_samples.json:
+#   legacy  - one yes/no completion per posting, decided by `"yes" in answer or "match" in answer`
+#   batched - match_scoring.MatchScorer, several postings per structured-output request
+#
+#   python benchmarks/bench_match_scoring.py           # mock server (accuracy reflects its heuristic)
+#   python benchmarks/bench_match_scoring.py --live    # real API (XAI_API_KEY, XAI_BASE_URL)
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+SKILLS = ["python", "sql", "flask", "selenium", "bash", "c/c++", "arm", "kotlin", "llm", "data visualization"]
+DEALBREAKERS = ["phd", "12+ years", "5+ years", "license", "cdl", "certification"]
+
+def mock_fit(text):
+    text = text.lower()
+    if any(word in text for word in DEALBREAKERS):
+        return 20, [word for word in DEALBREAKERS if word in text]
+    hits = sum(word in text for word in SKILLS)
+    return min(95, 40 + 15 * hits), []
+
+def mock_reply(messages):
+    """Answers both prompt styles like a model would, including the negative phrasing that fools the legacy check."""
+    content = messages[-1]["content"]
+    if "Postings:" in content:
+        results = []
+        for posting_id, body in re.findall(r"^\[(\d+)\] (.*?)(?=^\[\d+\] |\Z)", content.split("Postings:", 1)[1],
+                                           re.DOTALL | re.MULTILINE):
+            score, gaps = mock_fit(body)
+            results.append({"id": int(posting_id), "score": score, "gaps": gaps, "reasoning": "mock"})
+        return json.dumps({"results": results})
+    description = content.split("Job description:", 1)[-1]
+    return "Yes, this is a good match." if mock_fit(description)[0] >= 60 else "No, this job does not match your profile."
+
+def legacy(gateway, profile, samples):
+    batch = [[
+        {"role": "system", "content": "You are a job application assistant."},
+        {"role": "user", "content": f"Given this profile: {profile}, does this job description match my skills and "
+                                    f"experience? Job description: {sample['description']}"},
+    ] for sample in samples]
+    prompt_chars = sum(len(m["content"]) for messages in batch for m in messages)
+    answers = gateway.call_many("filter", batch)
+    decisions = [not isinstance(a, Exception) and ("yes" in a.lower() or "match" in a.lower()) for a in answers]
+    return decisions, len(batch), prompt_chars
+
+def batched(gateway, profile, samples, batch_size):
+    scorer = MatchScorer(gateway, profile, batch_size=batch_size)
+    results = scorer.score_many(samples)
+    return [bool(r and r["match"]) for r in results], scorer.requests, scorer.prompt_chars
+
+def main():
+    parser = argparse.ArgumentParser(description="Match scoring benchmark")
+    parser.add_argument("--live", action="store_true", help="Call the real API instead of the mock server")
+    parser.add_argument("--batch-size", type=int, default=6)
+    parser.add_argument("--latency", type=float, default=0.5, help="Mock seconds per request")
+    args = parser.parse_args()
+
+    with open(os.path.join(ROOT, "profile.json")) as f:
+        profile = json.load(f)
+    with open(os.path.join(ROOT, "fixtures", "match_samples.json")) as f:
+        samples = json.load(f)
+    expected = [sample["expected"] for sample in samples]
+
+    server = None
+    if args.live:
+        gateway = LLMGateway(api_key=os.getenv("XAI_API_KEY"))
+    else:
+        # Fewer concurrent slots than postings, as with the real endpoint limits
+        server = start_server(latency=args.latency, latency_per_kb=0.01, reply=mock_reply)
+        gateway = LLMGateway(api_key="test", base_url=f"http://127.0.0.1:{server.server_port}/v1",
+                             rate=1000, burst=1000, limits={"filter": 4})
+
+    print(f"{len(samples)} sample postings, {'live API' if args.live else 'mock server'}")
+    for name, run in (("legacy", lambda: legacy(gateway, profile, samples)),
+                      ("batched", lambda: batched(gateway, profile, samples, args.batch_size))):
+        start = time.perf_counter()
+        decisions, requests, prompt_chars = run()
+        elapsed = time.perf_counter() - start
+        correct = sum(d == e for d, e in zip(decisions, expected))
+        false_matches = sum(d and not e for d, e in zip(decisions, expected))
+        print(f"  {name:8} accuracy {correct}/{len(samples)} ({false_matches} false matches), "
+              f"{requests} requests, ~{prompt_chars // 4 // len(samples)} prompt tokens/posting, {elapsed:.2f}s")
+    gateway.close()
+    if server:
+        server.shutdown()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,121 @@
+import os
+import sys
+import glob
+import time
+import random
+import base64
+import argparse
+import statistics
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from image_prep import ScreenshotPrep
+from llm_gateway import LLMGateway
+from mock_openai_server import start_server
+
+# Bytes sent and response latency per vision call: today's raw full-viewport PNG
+# versus the cropped/downscaled/re-encoded image from image_prep.
+#
+#   python benchmarks/bench_vision_payload.py                 # synthetic pages, mock server
+#   python benchmarks/bench_vision_payload.py --images shots/ # your own PNG screenshots
+#   python benchmarks/bench_vision_payload.py --live          # real API (XAI_API_KEY, XAI_BASE_URL)
+#
+# The mock server charges --latency-per-kb for the request body, standing in for
+# upload and prompt-processing time; use --live for real numbers.
+
+WORDS = "apply senior python developer remote salary benefits experience team requirements " \
+        "first name last name email phone resume cover letter upload submit next".split()
+
+def synthetic_page(seed, width=1920, height=1080):
+    """Screenshot-like PNG: header, sidebar, and an application form with labelled fields."""
+    import io
+    from PIL import Image, ImageDraw
+    rng = random.Random(seed)
+    image = Image.new("RGB", (width, height), "white")
+    draw = ImageDraw.Draw(image)
+    draw.rectangle((0, 0, width, 64), fill=(37, 87, 167))
+    draw.text((24, 24), "JobBoard  |  Find jobs  |  Company reviews  |  Sign in", fill="white")
+    for y in range(96, height - 40, 90):
+        draw.rectangle((24, y, 420, y + 70), outline=(210, 210, 210), fill=(247, 247, 250))
+        draw.text((36, y + 12), " ".join(rng.choices(WORDS, k=5)), fill=(30, 30, 30))
+        draw.text((36, y + 40), " ".join(rng.choices(WORDS, k=7)), fill=(110, 110, 110))
+    form = (480, 96, 1440, 1000)
+    draw.rectangle(form, outline=(180, 180, 180))
+    y = form[1] + 24
+    for _ in range(8):
+        draw.text((form[0] + 32, y), " ".join(rng.choices(WORDS, k=3)).title(), fill=(20, 20, 20))
+        draw.rectangle((form[0] + 32, y + 20, form[2] - 32, y + 56), outline=(150, 150, 150))
+        y += 84
+    draw.rectangle((form[2] - 200, form[3] - 70, form[2] - 32, form[3] - 24), fill=(37, 87, 167))
+    draw.text((form[2] - 150, form[3] - 54), "Continue", fill="white")
+    for x in range(1480, width - 24, 8):  # Ads / noise column
+        draw.line((x, 96, x, height - 40), fill=tuple(rng.randrange(256) for _ in range(3)))
+    buffer = io.BytesIO()
+    image.save(buffer, format="PNG")
+    return base64.b64encode(buffer.getvalue()).decode("ascii"), form
+
+def load_images(directory, count):
+    if directory:
+        paths = sorted(glob.glob(os.path.join(directory, "*.png")))[:count]
+        return [(base64.b64encode(open(path, "rb").read()).decode("ascii"), None) for path in paths]
+    return [synthetic_page(seed) for seed in range(count)]
+
+def vision_messages(data_url):
+    return [
+        {"role": "system", "content": "You are a web automation assistant with vision capabilities."},
+        {"role": "user", "content": f"Determine the next action for this job application: {data_url}"},
+    ]
+
+def measure(gateway, payloads):
+    sizes, latencies = [], []
+    for data_url in payloads:
+        start = time.perf_counter()
+        gateway.call("vision", vision_messages(data_url), timeout=60)
+        latencies.append(time.perf_counter() - start)
+        sizes.append(len(data_url))
+    return sizes, latencies
+
+def main():
+    parser = argparse.ArgumentParser(description="Vision payload size and latency benchmark")
+    parser.add_argument("--images", help="Directory of PNG screenshots (default: synthetic pages)")
+    parser.add_argument("--count", type=int, default=5)
+    parser.add_argument("--live", action="store_true", help="Call the real API instead of the mock server")
+    parser.add_argument("--latency-per-kb", type=float, default=0.002)
+    args = parser.parse_args()
+
+    server = None
+    if args.live:
+        gateway = LLMGateway(api_key=os.getenv("XAI_API_KEY"))
+    else:
+        server = start_server(latency=0.2, latency_per_kb=args.latency_per_kb)
+        gateway = LLMGateway(api_key="test", base_url=f"http://127.0.0.1:{server.server_port}/v1",
+                             rate=1000, burst=1000)
+
+    images = load_images(args.images, args.count)
+    prep = ScreenshotPrep()
+    start = time.perf_counter()
+    prepared = [prep.prepare(screenshot, region) for screenshot, region in images]
+    prep_ms = (time.perf_counter() - start) * 1000 / len(images)
+
+    paths = {
+        "raw PNG": [f"data:image/png;base64,{screenshot}" for screenshot, _ in images],
+        f"{prep.image_format} q{prep.quality} <= {prep.max_width}px": [image.data_url for image in prepared],
+    }
+    print(f"{len(images)} screenshots, {'live API' if args.live else 'mock server'}; "
+          f"preprocessing {prep_ms:.0f} ms per image")
+    for name, payloads in paths.items():
+        sizes, latencies = measure(gateway, payloads)
+        print(f"  {name:24} {statistics.mean(sizes) / 1024:8.0f} KB/call   "
+              f"p50 {statistics.median(latencies) * 1000:6.0f} ms   max {max(latencies) * 1000:6.0f} ms")
+
+    # A repeated frame (page didn't change after an action) is answered without a call
+    prep.remember("bench", prepared[0], "previous reply")
+    repeat = prep.prepare(*images[0])
+    print(f"  unchanged frame re-sent: {'no' if prep.repeat('bench', repeat) else 'yes'}")
+    prep.report()
+    gateway.close()
+    if server:
+        server.shutdown()
+
+if __name__ == "__main__":
+    main()
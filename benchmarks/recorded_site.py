@@ -0,0 +1,308 @@
+import os
+import sys
+import gzip
+import json
+import time
+import html
+import base64
+import random
+import argparse
+import threading
+from urllib.parse import urlparse, parse_qs, quote
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+# Offline stand-in for the job boards. Serves either recorded pages (a HAR file
+# exported from the browser's dev tools, or a WARC file from wget --warc-file /
+# a crawler) or, without a recording, an Indeed-style board generated from
+# fixtures/match_samples.json: search pages, postings with an apply form (and,
+# like real postings, a banner image, a web font and a tag manager script), a
+# confirmation page and a resume PDF.
+#
+# Pages are served under their host, http://127.0.0.1:<port>/www.indeed.com/jobs?q=...,
+# which is the layout MirrorUrls maps the scripts' page loads to (page_ready.set_url_mapper).
+#
+#   python benchmarks/recorded_site.py                         # generated board
+#   python benchmarks/recorded_site.py --recording run.har     # recorded pages
+#   python benchmarks/recorded_site.py --run job_applier.py --max-pages 1   # a script on the board
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+SAMPLES_PATH = os.path.join(ROOT, "fixtures", "match_samples.json")
+BOARD_HOST = "www.indeed.com"
+PER_PAGE = 10
+
+# Filler sentences that make every generated posting distinct enough for the near-duplicate check
+_FILLER = """
+Our team ships every week and values clear written communication.
+We offer a home office stipend and a yearly learning budget.
+You will pair with product designers and support engineers.
+The role reports to the engineering manager of the platform group.
+Benefits include health insurance, paid parental leave and flexible hours.
+We run quarterly hackathons and an internal tech talk series.
+Most of the team works in North American time zones.
+Interviews are a short call, a take-home exercise and a team chat.
+You will be on call one week per quarter with generous time off in lieu.
+We are growing quickly after our latest funding round.
+Code review is done within a day and deploys are automated.
+Travel is limited to one company offsite per year.
+""".strip().splitlines()
+
+def load_har(path):
+    """{url: (status, content type, body bytes)} of every response recorded in a HAR file."""
+    with open(path, "r", encoding="utf-8") as f:
+        entries = json.load(f)["log"]["entries"]
+    pages = {}
+    for entry in entries:
+        response = entry["response"]
+        content = response.get("content", {})
+        text = content.get("text") or ""
+        body = base64.b64decode(text) if content.get("encoding") == "base64" else text.encode("utf-8")
+        pages[entry["request"]["url"]] = (response.get("status", 200), content.get("mimeType") or "text/html", body)
+    return pages
+
+def _read_headers(stream):
+    headers = {}
+    while True:
+        line = stream.readline()
+        if not line or line in (b"\r\n", b"\n"):
+            return headers
+        key, _, value = line.decode("utf-8", "replace").partition(":")
+        headers[key.strip().lower()] = value.strip()
+
+def load_warc(path):
+    """{url: (status, content type, body bytes)} of the response records of a .warc or .warc.gz file."""
+    pages = {}
+    with (gzip.open if path.endswith(".gz") else open)(path, "rb") as stream:
+        while True:
+            line = stream.readline()
+            if not line:
+                return pages
+            if not line.startswith(b"WARC/"):
+                continue
+            headers = _read_headers(stream)
+            block = stream.read(int(headers.get("content-length", 0)))
+            if headers.get("warc-type") != "response" or not block.startswith(b"HTTP/"):
+                continue
+            separator = b"\r\n\r\n" if b"\r\n\r\n" in block else b"\n\n"
+            head, _, body = block.partition(separator)
+            status_line, *header_lines = head.decode("utf-8", "replace").splitlines()
+            content_type = next((l.split(":", 1)[1].strip() for l in header_lines
+                                 if l.lower().startswith("content-type:")), "text/html")
+            pages[headers.get("warc-target-uri", "").strip("<>")] = (int(status_line.split()[1]), content_type, body)
+
+def load_recording(path):
+    return load_har(path) if path.endswith(".har") else load_warc(path)
+
+def generated_postings(count, seed=0):
+    """Deterministic postings: the fixture samples in turn, each with its own filler paragraph."""
+    with open(SAMPLES_PATH, "r") as f:
+        samples = json.load(f)
+    postings = []
+    for n in range(count):
+        sample = samples[n % len(samples)]
+        rng = random.Random(seed * 100003 + n)
+        filler = " ".join(rng.sample(_FILLER, 5))
+        postings.append({"jk": f"{n:06d}", "title": sample["title"], "company": sample["company"],
+                         "description": f"{sample['description']}\n{filler}", "expected": sample["expected"]})
+    return postings
+
+def search_page(postings, start, host=BOARD_HOST):
+    cards = "".join(
+        f'<div class="job_seen_beacon" data-testid="jobcard" data-jk="{p["jk"]}">'
+        f'<a class="jcs-JobTitle" data-testid="jobTitle" href="/{host}/viewjob?jk={p["jk"]}">{html.escape(p["title"])}</a>'
+        f'<span class="companyName" data-testid="company-name">{html.escape(p["company"])}</span></div>'
+        for p in postings[start:start + PER_PAGE])
+    return f"<!DOCTYPE html><html><head><title>Jobs</title></head><body><div id='mosaic'>{cards}</div></body></html>"
+
+def posting_page(posting, host=BOARD_HOST):
+    jsonld = json.dumps({"@context": "https://schema.org", "@type": "JobPosting", "title": posting["title"],
+                         "hiringOrganization": {"@type": "Organization", "name": posting["company"]},
+                         "description": posting["description"]})
+    paragraphs = "".join(f"<p>{html.escape(line)}</p>" for line in posting["description"].splitlines())
+    return f"""<!DOCTYPE html><html><head><title>{html.escape(posting['title'])} - {html.escape(posting['company'])}</title>
+<script type="application/ld+json">{jsonld}</script>
+<style>@font-face {{font-family: "Board Sans"; src: url("/{host}/static/board-sans.woff2") format("woff2")}}
+body {{font-family: "Board Sans", sans-serif}}</style>
+<script async src="/{TRACKER_HOST}/gtm.js?id=GTM-BENCH"></script></head><body>
+<img src="/{host}/static/banner.png?jk={posting['jk']}" alt="" width="960" height="240">
+<h1>{html.escape(posting['title'])}</h1>
+<div id="jobDescriptionText" class="jobsearch-JobDescriptionSection">{paragraphs}</div>
+<button type="button" onclick="document.getElementById('apply').style.display='block'">Apply Now</button>
+<form id="apply" style="display:none" method="post" action="/{host}/applied?jk={posting['jk']}" enctype="multipart/form-data">
+<label for="first_name">First name</label><input id="first_name" name="first_name">
+<label for="last_name">Last name</label><input id="last_name" name="last_name">
+<label for="email">Email</label><input id="email" name="email" type="email">
+<label for="phone">Phone</label><input id="phone" name="phone" type="tel">
+<label for="resume_upload">Resume</label><input id="resume_upload" name="resume" type="file">
+<label for="cover_upload">Cover letter</label><input id="cover_upload" name="cover" type="file">
+<textarea name="motivation" placeholder="Why do you want to work here?"></textarea>
+<button type="submit">Submit application</button>
+</form></body></html>"""
+
+CONFIRMATION = ("<!DOCTYPE html><html><head><title>Applied</title></head><body>"
+                "<h1>Application submitted</h1><p>Thank you for applying.</p></body></html>")
+
+# Smallest well-formed PDF, for the resume download
+RESUME_PDF = (b"%PDF-1.4\n1 0 obj<</Type/Catalog/Pages 2 0 R>>endobj\n2 0 obj<</Type/Pages/Kids[]/Count 0>>endobj\n"
+              b"trailer<</Root 1 0 R>>\n%%EOF\n")
+
+# Page weight that DOM-only work doesn't need (browser_profiles blocks it in lean sessions).
+# The image bytes aren't a decodable picture, which doesn't change what Chrome downloads.
+TRACKER_HOST = "www.googletagmanager.com"
+_noise = random.Random(0)
+ASSETS = {
+    "/static/banner.png": ("image/png", b"\x89PNG\r\n\x1a\n" + _noise.randbytes(250 * 1024)),
+    "/static/board-sans.woff2": ("font/woff2", b"wOF2" + _noise.randbytes(80 * 1024)),
+    "/gtm.js": ("application/javascript",
+                ("/* " + base64.b64encode(_noise.randbytes(66 * 1024)).decode() + " */\n"
+                 "window.dataLayer = window.dataLayer || [];\n").encode()),
+}
+
+class SiteHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    disable_nagle_algorithm = True  # Headers and body go out separately; don't add 40 ms delayed ACKs to keep-alive
+
+    def log_message(self, format, *args):
+        if self.server.verbose:
+            super().log_message(format, *args)
+
+    def _send(self, status, content_type, body):
+        if isinstance(body, str):
+            body = body.encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _target(self):
+        """The original URL of a mirrored path: /www.indeed.com/jobs?q=x -> https://www.indeed.com/jobs?q=x"""
+        host, _, rest = self.path.lstrip("/").partition("/")
+        return f"https://{host}/{rest}"
+
+    def _recorded(self, url):
+        pages = self.server.recording
+        if url in pages:
+            return pages[url]
+        # Same page under a different query string (another search keyword, a tracking parameter)
+        path = url.split("?", 1)[0]
+        return next((page for recorded_url, page in pages.items() if recorded_url.split("?", 1)[0] == path), None)
+
+    def _rewrite(self, body, content_type):
+        """Absolute links to recorded hosts go to their mirrored copies."""
+        if "html" not in content_type and "json" not in content_type:
+            return body
+        for host in self.server.hosts:
+            body = body.replace(f"https://{host}/".encode(), f"/{host}/".encode())
+            body = body.replace(f"http://{host}/".encode(), f"/{host}/".encode())
+        return body
+
+    def _generated(self, url):
+        parts = urlparse(url)
+        query = parse_qs(parts.query)
+        if parts.path == "/resume.pdf" or parts.path.endswith("/resume.pdf"):
+            return 200, "application/pdf", RESUME_PDF
+        if parts.path in ASSETS:
+            return (200, *ASSETS[parts.path])
+        if parts.path == "/jobs":
+            start = int(query.get("start", ["0"])[0])
+            return 200, "text/html; charset=utf-8", search_page(self.server.postings, start, parts.hostname)
+        if parts.path == "/viewjob":
+            posting = self.server.by_jk.get(query.get("jk", [""])[0])
+            if posting:
+                return 200, "text/html; charset=utf-8", posting_page(posting, parts.hostname)
+        if parts.path == "/applied":
+            with self.server.lock:
+                self.server.applied_at.append(time.time())
+            return 200, "text/html; charset=utf-8", CONFIRMATION
+        return None
+
+    def do_GET(self):
+        with self.server.lock:
+            self.server.requests += 1
+        if self.server.latency:
+            threading.Event().wait(self.server.latency)
+        url = self._target()
+        page = self._recorded(url) if self.server.recording else self._generated(url)
+        if page is None:
+            self._send(404, "text/plain", f"Not recorded: {url}")
+            return
+        status, content_type, body = page
+        self._send(status, content_type, self._rewrite(body if isinstance(body, bytes) else body.encode("utf-8"),
+                                                       content_type))
+
+    def do_POST(self):
+        self.rfile.read(int(self.headers.get("Content-Length", 0)))  # The uploaded form
+        self.do_GET()
+
+class MirrorUrls:
+    """
+    page_ready URL mapper that loads every page from the site at `base`:
+    https://www.indeed.com/jobs?q=x is loaded as <base>/www.indeed.com/jobs?q=x
+    and still counts as indeed.com.
+    """
+
+    def __init__(self, base):
+        self.base = base.rstrip("/")
+
+    def fetch_url(self, url):
+        if url.startswith(self.base + "/"):
+            return url
+        parts = urlparse(url)
+        return f"{self.base}/{parts.netloc}{parts.path or '/'}" + (f"?{parts.query}" if parts.query else "")
+
+    def original_url(self, url):
+        if not url.startswith(self.base + "/"):
+            return url
+        return "https://" + url[len(self.base) + 1:]
+
+def start_site(recording=None, jobs=40, latency=0.0, seed=0, verbose=False):
+    """
+    Start the site on a background thread and return the server; server.url is
+    the MirrorUrls base and server.resume_url the resume download.
+    """
+    server = ThreadingHTTPServer(("127.0.0.1", 0), SiteHandler)
+    server.daemon_threads = True
+    server.recording = load_recording(recording) if recording else {}
+    server.hosts = sorted({urlparse(url).hostname for url in server.recording} | {BOARD_HOST, TRACKER_HOST})
+    server.postings = [] if recording else generated_postings(jobs, seed)
+    server.by_jk = {p["jk"]: p for p in server.postings}
+    server.latency = latency  # Seconds per request, like a remote server's round trip
+    server.verbose = verbose
+    server.requests = 0
+    server.applied_at = []  # When each application form was submitted
+    server.lock = threading.Lock()
+    server.url = f"http://127.0.0.1:{server.server_port}"
+    server.resume_url = f"{server.url}/{quote(BOARD_HOST)}/resume.pdf"
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Serve recorded or generated job board pages locally")
+    parser.add_argument("--recording", help="HAR (.har) or WARC (.warc, .warc.gz) file to serve")
+    parser.add_argument("--jobs", type=int, default=40, help="Generated postings (without --recording)")
+    parser.add_argument("--latency", type=float, default=0.0, help="Seconds of delay per request")
+    parser.add_argument("--run", metavar="SCRIPT", help="Run a script (e.g. job_applier.py) on the site, "
+                                                      "passing it the remaining arguments, then stop")
+    args, script_args = parser.parse_known_args()
+    if script_args and not args.run:
+        parser.error(f"unrecognized arguments: {' '.join(script_args)}")
+    server = start_site(args.recording, jobs=args.jobs, latency=args.latency, verbose=not args.run)
+    if args.run:
+        import runpy
+        sys.path.insert(0, ROOT)
+        from page_ready import set_url_mapper
+        set_url_mapper(MirrorUrls(server.url))
+        os.environ.setdefault("RESUME_URL", server.resume_url)
+        sys.argv = [args.run] + script_args
+        try:
+            runpy.run_path(args.run, run_name="__main__")
+        finally:
+            server.shutdown()
+        sys.exit()
+    print(f"Serving {len(server.recording) or len(server.postings)} "
+          f"{'recorded pages' if args.recording else 'generated postings'} at {server.url} "
+          f"(resume at {server.resume_url}); run a script on them with --run", file=sys.stderr)
+    try:
+        threading.Event().wait()
+    except KeyboardInterrupt:
+        server.shutdown()
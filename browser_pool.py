@@ -0,0 +1,172 @@
+import os
+import threading
+from contextlib import contextmanager
+from tracing import log
+
+CHROMEDRIVER_PATH = "/usr/bin/chromedriver"
+
+# Pool size defaults to one Chrome per core (capped, Chrome is memory hungry)
+DEFAULT_POOL_SIZE = int(os.getenv("BROWSER_POOL_SIZE", min(4, os.cpu_count() or 1)))
+# Recycle a session after this many checkouts to keep Chrome's memory in check
+DEFAULT_MAX_PAGES = int(os.getenv("BROWSER_MAX_PAGES", "25"))
+
+def default_chrome_options():
+    """Headless Chromium options shared by every pooled session."""
+    from selenium.webdriver.chrome.options import Options
+    chrome_options = Options()
+    chrome_options.add_argument("--headless")  # Run in headless mode
+    chrome_options.add_argument("--no-sandbox")
+    chrome_options.add_argument("--disable-dev-shm-usage")
+    # Return from driver.get() at DOMContentLoaded; page_ready decides when the page is usable
+    chrome_options.page_load_strategy = "eager"
+    # Expose DevTools Network events to page_ready through the performance log
+    chrome_options.set_capability("goog:loggingPrefs", {"performance": "ALL"})
+    return chrome_options
+
+class BrowserPool:
+    """
+    Bounded pool of headless Chrome WebDriver sessions.
+    At most `size` sessions exist at once. Sessions are started lazily on first
+    checkout, health-checked before they are handed out, and quit and replaced
+    after `max_pages` checkouts or as soon as they stop responding.
+    Idle sessions keep their last page loaded, so a caller that passes
+    `prefer_url` gets the session already showing that page when there is one.
+    With `profiles` (browser_profiles.BrowserProfiles) every session gets its
+    own warm profile directory and starts in lean mode, and is put back into
+    lean mode whenever it is returned. `on_discard(driver)`, if given, is called
+    for every session just before it is quit (e.g. PageReadiness.forget).
+    """
+
+    def __init__(self, size=None, max_pages=None, options_factory=default_chrome_options,
+                 driver_path=CHROMEDRIVER_PATH, profiles=None, on_discard=None):
+        self.size = size or DEFAULT_POOL_SIZE
+        self.max_pages = max_pages or DEFAULT_MAX_PAGES
+        self.options_factory = options_factory
+        self.driver_path = driver_path
+        self.profiles = profiles
+        self.on_discard = on_discard
+        self._idle = []
+        self._slots = threading.BoundedSemaphore(self.size)
+        self._lock = threading.Lock()
+        self._pages = {}
+        self._urls = {}
+        self._closed = False
+        self.created = 0
+        self.recycled = 0
+
+    def _create_driver(self):
+        # Selenium's webdriver package is only imported once a browser is really needed
+        from selenium import webdriver
+        from selenium.webdriver.chrome.service import Service
+        service = Service(self.driver_path)
+        if self.profiles is None:
+            driver = webdriver.Chrome(service=service, options=self.options_factory())
+        else:
+            slot = self.profiles.claim_slot()
+            try:
+                driver = webdriver.Chrome(service=service, options=self.profiles.options(slot, self.options_factory()))
+            except Exception:
+                self.profiles.detach(None, slot)
+                raise
+            self.profiles.attach(driver, slot)
+        with self._lock:
+            self._pages[driver] = 0
+            self.created += 1
+        log(f"Browser pool: started Chrome session {self.created}")
+        return driver
+
+    def _discard(self, driver):
+        with self._lock:
+            self._pages.pop(driver, None)
+            self._urls.pop(driver, None)
+            self.recycled += 1
+        if self.profiles is not None:
+            self.profiles.detach(driver)
+        if self.on_discard is not None:
+            self.on_discard(driver)
+        try:
+            driver.quit()
+        except Exception as e:
+            log(f"Warning: Browser pool could not quit a session: {e}")
+
+    @staticmethod
+    def is_healthy(driver):
+        """Cheap liveness probe: a crashed or hung session fails the round trip."""
+        try:
+            driver.execute_script("return 1")
+            return True
+        except Exception:
+            return False
+
+    def _take_idle(self, prefer_url=None):
+        with self._lock:
+            if not self._idle:
+                return None
+            if prefer_url:
+                for i, driver in enumerate(self._idle):
+                    if self._urls.get(driver) == prefer_url:
+                        return self._idle.pop(i)
+            return self._idle.pop()  # LIFO keeps the warmest session busy
+
+    def acquire(self, timeout=None, prefer_url=None):
+        """Check out a healthy session, blocking while all `size` sessions are in use."""
+        if self._closed:
+            raise RuntimeError("Browser pool is closed")
+        if not self._slots.acquire(timeout=timeout):
+            raise TimeoutError("Timed out waiting for a browser session")
+        try:
+            while True:
+                driver = self._take_idle(prefer_url)
+                if driver is None:
+                    return self._create_driver()
+                if self.is_healthy(driver):
+                    return driver
+                log("Warning: Browser pool idle session failed health check, replacing it")
+                self._discard(driver)
+        except Exception:
+            self._slots.release()
+            raise
+
+    def release(self, driver):
+        """Return a session to the pool, recycling it if it is worn out or broken."""
+        try:
+            with self._lock:
+                pages = self._pages.get(driver, 0) + 1
+                self._pages[driver] = pages
+            try:
+                url = driver.current_url  # Doubles as the health check
+            except Exception:
+                url = None
+            if url is not None and self.profiles is not None:
+                self.profiles.sample(driver)
+                self.profiles.use(driver, self.profiles.default_mode)
+            if self._closed or pages >= self.max_pages or url is None:
+                self._discard(driver)
+            else:
+                with self._lock:
+                    self._urls[driver] = url
+                    self._idle.append(driver)
+        finally:
+            self._slots.release()
+
+    @contextmanager
+    def driver(self, timeout=None, prefer_url=None):
+        driver = self.acquire(timeout=timeout, prefer_url=prefer_url)
+        try:
+            yield driver
+        finally:
+            self.release(driver)
+
+    def close(self):
+        self._closed = True
+        while True:
+            driver = self._take_idle()
+            if driver is None:
+                break
+            self._discard(driver)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
@@ -0,0 +1,152 @@
+import os
+import threading
+from tracing import log
+
+PROFILE_DIR = os.getenv("BROWSER_PROFILE_DIR", "browser_profiles")  # Empty: a fresh temporary profile per session
+# Resource types lean sessions never download (comma-separated keys of RESOURCE_PATTERNS)
+BLOCK_RESOURCES = [t for t in os.getenv("BROWSER_BLOCK", "image,media,font").split(",") if t]
+BLOCK_TRACKERS = os.getenv("BROWSER_BLOCK_TRACKERS", "1") != "0"
+
+RESOURCE_PATTERNS = {
+    "image": ["*.png*", "*.jpg*", "*.jpeg*", "*.gif*", "*.webp*", "*.avif*", "*.svg*", "*.ico*"],
+    "media": ["*.mp4*", "*.webm*", "*.m3u8*", "*.mp3*", "*.ogg*", "*.mov*"],
+    "font": ["*.woff*", "*.ttf*", "*.otf*", "*.eot*"],
+    "stylesheet": ["*.css*"],  # Not blocked by default: visibility checks need the page's CSS
+}
+# Ads, analytics and session recorders; none of them affects the text or forms of a page
+TRACKER_DOMAINS = [
+    "google-analytics.com", "googletagmanager.com", "doubleclick.net", "googlesyndication.com",
+    "googleadservices.com", "adservice.google.com", "facebook.net", "connect.facebook.net", "hotjar.com",
+    "segment.io", "segment.com", "fullstory.com", "optimizely.com", "nr-data.net", "newrelic.com",
+    "quantserve.com", "scorecardresearch.com", "criteo.com", "taboola.com", "outbrain.com", "clarity.ms",
+    "mouseflow.com", "amplitude.com", "mixpanel.com", "bat.bing.com", "ads.linkedin.com", "px.ads.linkedin.com",
+]
+# Chrome features a scraping session never uses: they cost startup time, memory and background traffic
+LEAN_FLAGS = [
+    "--disable-extensions", "--disable-background-networking", "--disable-component-update",
+    "--disable-default-apps", "--disable-sync", "--disable-client-side-phishing-detection",
+    "--disable-domain-reliability", "--disable-notifications", "--metrics-recording-only", "--mute-audio",
+    "--no-first-run", "--no-default-browser-check", "--autoplay-policy=user-gesture-required",
+    "--disable-features=Translate,OptimizationHints,MediaRouter,AutofillServerCommunication,"
+    "InterestFeedContentSuggestions",
+]
+
+def process_tree_rss(pid):
+    """Summed resident memory (bytes) of a process and all its descendants, from /proc; None off Linux."""
+    if not os.path.isdir("/proc"):
+        return None
+    page_size = os.sysconf("SC_PAGE_SIZE")
+    children, rss = {}, {}
+    for entry in os.listdir("/proc"):
+        if not entry.isdigit():
+            continue
+        try:
+            with open(f"/proc/{entry}/stat") as f:
+                fields = f.read().rsplit(")", 1)[1].split()  # The command name may contain spaces
+        except OSError:
+            continue
+        children.setdefault(int(fields[1]), []).append(int(entry))
+        rss[int(entry)] = int(fields[21]) * page_size
+    total, stack = 0, [pid]
+    while stack:
+        current = stack.pop()
+        total += rss.get(current, 0)
+        stack.extend(children.get(current, []))
+    return total
+
+class BrowserProfiles:
+    """
+    Chrome profiles for the browser pool. Every session starts lean: extra
+    features off (LEAN_FLAGS), and images, media, fonts and tracker domains
+    blocked through the DevTools protocol (Network.setBlockedURLs), so
+    DOM-only work downloads just the HTML, CSS and scripts. use(driver, "full")
+    lifts the blocking for the steps that take a vision screenshot; the pool
+    puts sessions back to lean when they are returned. Each pool slot keeps
+    its own user-data directory under `profile_dir`, so the disk cache,
+    cookies and consent choices stay warm between runs. Chrome's memory is
+    sampled whenever a session is returned.
+    """
+
+    def __init__(self, block=BLOCK_RESOURCES, trackers=BLOCK_TRACKERS, profile_dir=PROFILE_DIR, lean_flags=True):
+        self.blocked_urls = [pattern for kind in block for pattern in RESOURCE_PATTERNS.get(kind, [])]
+        if trackers:
+            self.blocked_urls += [f"*{domain}/*" for domain in TRACKER_DOMAINS]
+        self.profile_dir = profile_dir
+        self.lean_flags = lean_flags
+        self.default_mode = "lean" if self.blocked_urls else "full"
+        self.switches = 0
+        self.peak_rss = 0  # All sessions together
+        self.peak_session_rss = 0
+        self._modes = {}
+        self._slots = {}
+        self._rss = {}
+        self._lock = threading.Lock()
+
+    def claim_slot(self):
+        """The lowest profile directory index no live session is using."""
+        with self._lock:
+            used = set(self._slots.values())
+            slot = next(i for i in range(len(used) + 1) if i not in used)
+            self._slots[slot] = slot  # Held until attach() maps it to the driver
+            return slot
+
+    def options(self, slot, base_options):
+        if self.lean_flags:
+            for flag in LEAN_FLAGS:
+                base_options.add_argument(flag)
+        if self.profile_dir:
+            path = os.path.abspath(os.path.join(self.profile_dir, f"session-{slot}"))
+            os.makedirs(path, exist_ok=True)
+            base_options.add_argument(f"--user-data-dir={path}")
+        return base_options
+
+    def attach(self, driver, slot):
+        with self._lock:
+            self._slots.pop(slot, None)
+            self._slots[driver] = slot
+        self.use(driver, self.default_mode)
+
+    def detach(self, driver, slot=None):
+        """Free the profile slot of a session that is quitting (or of one that never started)."""
+        with self._lock:
+            self._slots.pop(driver if slot is None else slot, None)
+            self._modes.pop(driver, None)
+            self._rss.pop(driver, None)
+
+    def mode(self, driver):
+        return self._modes.get(driver, "full")
+
+    def use(self, driver, mode):
+        """Switch a session to "lean" or "full" for its next page loads; True if that changed anything."""
+        if self._modes.get(driver) == mode:
+            return False
+        try:
+            driver.execute_cdp_cmd("Network.enable", {})
+            driver.execute_cdp_cmd("Network.setBlockedURLs", {"urls": self.blocked_urls if mode == "lean" else []})
+        except Exception as e:
+            log(f"Warning: Browser profiles could not switch to {mode} ({e})")
+            return False
+        with self._lock:
+            changed = driver in self._modes
+            self._modes[driver] = mode
+            self.switches += changed
+        return changed
+
+    def sample(self, driver):
+        try:
+            rss = process_tree_rss(driver.service.process.pid)
+        except AttributeError:
+            rss = None
+        if rss is None:
+            return
+        with self._lock:
+            self._rss[driver] = rss
+            self.peak_session_rss = max(self.peak_session_rss, rss)
+            self.peak_rss = max(self.peak_rss, sum(self._rss.values()))
+
+    def report(self):
+        if not self.peak_rss and not self.switches:
+            return
+        print(f"Browser profiles: {self.default_mode} by default ({len(self.blocked_urls)} blocked URL patterns), "
+              f"{self.switches} switches for screenshots; Chrome peak RSS {self.peak_rss / 1e6:.0f} MB "
+              f"({self.peak_session_rss / 1e6:.0f} MB per session)")
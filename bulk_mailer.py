@@ -0,0 +1,295 @@
+import os
+import json
+import time
+import base64
+import smtplib
+import threading
+from email.mime.multipart import MIMEMultipart
+from email.mime.application import MIMEApplication
+from email.mime.text import MIMEText
+
+TOKEN_URL = "https://oauth2.googleapis.com/token"
+TOKEN_CACHE_PATH = os.getenv("SMTP_TOKEN_CACHE", "oauth2_token.json")
+SENT_LOG_PATH = os.getenv("EMAIL_SENT_LOG", "email_sent.json")
+TOKEN_MARGIN = 120  # Seconds before expiry at which a cached token is refreshed
+MAX_PER_CONNECTION = 100  # Messages before the SMTP connection is recycled
+SMTP_DEBUG = int(os.getenv("SMTP_DEBUG", "0"))
+
+# Conservative send limits per SMTP host; the providers suspend accounts that exceed theirs
+PROVIDER_LIMITS = {
+    "smtp.gmail.com": {"per_minute": 20, "per_day": 500},
+    "smtp.office365.com": {"per_minute": 30, "per_day": 10000},
+    "smtp-mail.outlook.com": {"per_minute": 30, "per_day": 300},
+    "smtp.mail.yahoo.com": {"per_minute": 20, "per_day": 500},
+}
+DEFAULT_LIMITS = {"per_minute": 20, "per_day": 500}
+
+class DailyLimitReached(Exception):
+    pass
+
+def generate_oauth2_string(username, access_token):
+    """
+    Generate an OAuth2 authentication string for SMTP (XOAUTH2).
+    Format: base64("user=<email>\x01auth=Bearer <token>\x01\x01")
+    """
+    auth_string = f"user={username}\1auth=Bearer {access_token}\1\1"
+    return base64.b64encode(auth_string.encode("utf-8")).decode("utf-8")
+
+def resume_part(resume_path):
+    """The resume as a MIME part, base64-encoded once and attached as-is to every message."""
+    with open(resume_path, "rb") as f:
+        part = MIMEApplication(f.read(), Name="resume.pdf")
+    part["Content-Disposition"] = 'attachment; filename="resume.pdf"'
+    return part
+
+class TokenCache:
+    """
+    OAuth2 access token from a refresh token, cached (in memory and in a JSON
+    file) until shortly before it expires, so a run of many messages, or
+    several runs within the hour, cost one token request.
+    """
+
+    def __init__(self, client_id, client_secret, refresh_token, path=TOKEN_CACHE_PATH, token_url=TOKEN_URL,
+                 margin=TOKEN_MARGIN):
+        self.client_id = client_id
+        self.client_secret = client_secret
+        self.refresh_token = refresh_token
+        self.path = path
+        self.token_url = token_url
+        self.margin = margin
+        self.refreshes = 0
+        self._token = None
+        self._expires_at = 0
+        if path:
+            try:
+                with open(path, "r") as f:
+                    cached = json.load(f)
+                if cached.get("client_id") == client_id:
+                    self._token, self._expires_at = cached["access_token"], cached["expires_at"]
+            except (OSError, ValueError, KeyError):
+                pass
+
+    def get(self):
+        if self._token is None or time.time() >= self._expires_at - self.margin:
+            self.refresh()
+        return self._token
+
+    def refresh(self):
+        import requests
+        response = requests.post(self.token_url, data={
+            "client_id": self.client_id,
+            "client_secret": self.client_secret,
+            "refresh_token": self.refresh_token,
+            "grant_type": "refresh_token",
+        }, headers={"Content-Type": "application/x-www-form-urlencoded"}, timeout=30)
+        if response.status_code != 200:
+            raise Exception("Error obtaining access token: " + response.text)
+        data = response.json()
+        self._token = data["access_token"]
+        self._expires_at = time.time() + int(data.get("expires_in", 3600))
+        self.refreshes += 1
+        if self.path:
+            with open(self.path, "w") as f:
+                json.dump({"client_id": self.client_id, "access_token": self._token,
+                           "expires_at": self._expires_at}, f)
+            os.chmod(self.path, 0o600)
+
+    def invalidate(self):
+        """Forget the token after the server rejected it (revoked or expired early)."""
+        self._token = None
+
+class SentLog:
+    """Who was already emailed about which job (never email twice), and when (for the daily limit)."""
+
+    def __init__(self, path=SENT_LOG_PATH):
+        self.path = path
+        try:
+            with open(path, "r") as f:
+                self.sent = json.load(f)
+        except (OSError, ValueError):
+            self.sent = {}
+
+    @staticmethod
+    def key(job):
+        return f"{job['recipient'].lower()}|{job.get('company', '')}|{job.get('title', '')}"
+
+    def __contains__(self, job):
+        return self.key(job) in self.sent
+
+    def sent_since(self, since):
+        return sum(1 for sent_at in self.sent.values() if sent_at >= since)
+
+    def add(self, job):
+        self.sent[self.key(job)] = time.time()
+        # Written after every message: a crash must not lead to a second email
+        tmp_path = self.path + ".tmp"
+        with open(tmp_path, "w") as f:
+            json.dump(self.sent, f)
+        os.replace(tmp_path, self.path)
+
+class SendRateLimiter:
+    """Spaces messages to the provider's per-minute limit; raises DailyLimitReached at the daily cap."""
+
+    def __init__(self, per_minute=None, per_day=None, sent_log=None):
+        self.interval = 60.0 / per_minute if per_minute else 0.0
+        self.per_day = per_day
+        self.sent_log = sent_log
+        self.waited = 0.0
+        self._next = 0.0
+
+    def wait(self):
+        if self.per_day and self.sent_log is not None and \
+                self.sent_log.sent_since(time.time() - 24 * 3600) >= self.per_day:
+            raise DailyLimitReached(f"{self.per_day} messages sent in the last 24 hours")
+        delay = self._next - time.monotonic()
+        if delay > 0:
+            time.sleep(delay)
+            self.waited += delay
+        self._next = max(self._next, time.monotonic()) + self.interval
+
+class SMTPSession:
+    """
+    One authenticated SMTP connection kept open across messages. It is opened
+    on the first send, recycled every `max_per_connection` messages, and
+    reopened (and the message retried once) when the server drops it or
+    rejects the access token.
+    """
+
+    def __init__(self, host, port=465, username=None, tokens=None, use_ssl=True, starttls=False,
+                 max_per_connection=MAX_PER_CONNECTION, timeout=30, debug=SMTP_DEBUG):
+        self.host = host
+        self.port = port
+        self.username = username
+        self.tokens = tokens  # TokenCache for XOAUTH2; None sends without authenticating
+        self.use_ssl = use_ssl
+        self.starttls = starttls
+        self.max_per_connection = max_per_connection
+        self.timeout = timeout
+        self.debug = debug
+        self.connections = 0
+        self.reconnects = 0
+        self._server = None
+        self._sent_on_connection = 0
+        self._lock = threading.Lock()
+
+    def _connect(self):
+        if self.use_ssl:
+            server = smtplib.SMTP_SSL(self.host, self.port, timeout=self.timeout)
+        else:
+            server = smtplib.SMTP(self.host, self.port, timeout=self.timeout)
+        server.set_debuglevel(self.debug)
+        server.ehlo()
+        if self.starttls:
+            server.starttls()
+            server.ehlo()
+        if self.tokens is not None:
+            code, response = server.docmd("AUTH", "XOAUTH2 " + generate_oauth2_string(self.username, self.tokens.get()))
+            if code != 235:
+                server.close()
+                raise smtplib.SMTPAuthenticationError(code, response)
+        self._server = server
+        self._sent_on_connection = 0
+        self.connections += 1
+
+    def _disconnect(self):
+        if self._server is not None:
+            try:
+                self._server.quit()
+            except (smtplib.SMTPException, OSError):
+                self._server.close()
+            self._server = None
+
+    def send(self, msg):
+        with self._lock:
+            if self._server is not None and self._sent_on_connection >= self.max_per_connection:
+                self._disconnect()
+            for attempt in range(2):
+                try:
+                    if self._server is None:
+                        self._connect()
+                    self._server.send_message(msg)
+                    self._sent_on_connection += 1
+                    return
+                except smtplib.SMTPAuthenticationError:
+                    if attempt or self.tokens is None:
+                        raise
+                    self.tokens.invalidate()
+                except (smtplib.SMTPServerDisconnected, smtplib.SMTPResponseException, OSError) as e:
+                    # 421 and dropped connections are worth a fresh connection; other rejections aren't
+                    if attempt or (isinstance(e, smtplib.SMTPResponseException) and e.smtp_code != 421):
+                        raise
+                self._disconnect()
+                self.reconnects += 1
+
+    def close(self):
+        with self._lock:
+            self._disconnect()
+
+class BulkMailer:
+    """
+    Sends one application email per queued job, (company, title, recipient),
+    over a shared SMTPSession at the provider's rate limit. The resume is
+    encoded once for the whole run; jobs already in the sent log are skipped.
+    `render(job) -> (subject, body)` writes each message.
+    """
+
+    def __init__(self, session, sender, render, resume_path=None, limiter=None, sent_log=None):
+        self.session = session
+        self.sender = sender
+        self.render = render
+        self.sent_log = sent_log if sent_log is not None else SentLog()
+        self.limiter = limiter or SendRateLimiter(sent_log=self.sent_log,
+                                                  **PROVIDER_LIMITS.get(session.host, DEFAULT_LIMITS))
+        self.attachment = None
+        if resume_path:
+            try:
+                self.attachment = resume_part(resume_path)
+            except OSError as e:
+                print("Error attaching resume:", e)
+        self.stats = {"sent": 0, "failed": 0, "skipped": 0, "elapsed": 0.0}
+
+    def message(self, job):
+        subject, body = self.render(job)
+        msg = MIMEMultipart()
+        msg["From"] = self.sender
+        msg["To"] = job["recipient"]
+        msg["Subject"] = subject
+        msg.attach(MIMEText(body, "plain"))
+        if self.attachment is not None:
+            msg.attach(self.attachment)
+        return msg
+
+    def send_all(self, jobs):
+        started = time.perf_counter()
+        try:
+            for job in jobs:
+                if job in self.sent_log:
+                    self.stats["skipped"] += 1
+                    continue
+                self.limiter.wait()
+                try:
+                    self.session.send(self.message(job))
+                except (smtplib.SMTPException, OSError) as e:
+                    print(f"Failed to send email to {job['recipient']} ({job.get('company')}): {e}")
+                    self.stats["failed"] += 1
+                    continue
+                self.sent_log.add(job)
+                self.stats["sent"] += 1
+                print(f"Email sent to {job['recipient']} for {job.get('title')} at {job.get('company')}")
+        except DailyLimitReached as e:
+            print(f"Stopping: daily send limit reached ({e}); the rest stay queued for the next run")
+        finally:
+            self.stats["elapsed"] += time.perf_counter() - started
+        return self.stats
+
+    def report(self):
+        stats = self.stats
+        rate = stats["sent"] / stats["elapsed"] if stats["elapsed"] else 0.0
+        tokens = self.session.tokens
+        print(f"Bulk mailer: {stats['sent']} sent, {stats['failed']} failed, {stats['skipped']} already sent; "
+              f"{rate:.2f} messages/s over {self.session.connections} SMTP connections "
+              f"({self.session.reconnects} reconnects), {tokens.refreshes if tokens else 0} token requests, "
+              f"{self.limiter.waited:.1f}s waiting on the rate limit")
+
+    def close(self):
+        self.session.close()
@@ -0,0 +1,57 @@
+import argparse
+
+def build_parser(description):
+    """Command-line flags shared by job_applier.py and jobbappVision.py."""
+    parser = argparse.ArgumentParser(description=description)
+    mode = parser.add_mutually_exclusive_group()
+    mode.add_argument("--dry-run", action="store_true",
+                      help="Print the run plan and check the configuration, without a browser, network or LLM calls")
+    mode.add_argument("--scrape-only", action="store_true",
+                      help="Scrape and deduplicate postings and list them, without filtering or applying")
+    parser.add_argument("--workers", type=int, default=None,
+                        help="Browser workers per stage (default: JOB_APPLIER_WORKERS or 3)")
+    parser.add_argument("--max-applications", type=int, default=None,
+                        help="Stop after this many applications")
+    parser.add_argument("--query", action="append", dest="queries", metavar="KEYWORDS",
+                        help="Search keywords (repeatable; every query is searched in every location)")
+    parser.add_argument("--location", action="append", dest="locations", metavar="LOCATION",
+                        help="Search location (repeatable)")
+    parser.add_argument("--max-pages", type=int, default=None,
+                        help="Results pages per board and query (default: CRAWL_MAX_PAGES or 5)")
+    parser.add_argument("--full-crawl", action="store_true",
+                        help="Page to the depth limit even past postings the last crawl already saw")
+    parser.add_argument("--resume", action="store_true",
+                        help="Continue the unfinished postings of earlier runs from the stage they reached")
+    parser.add_argument("--verbosity", type=int, choices=[0, 1, 2], default=None,
+                        help="0: run summaries only, 1: also failures and warnings, 2: every progress line "
+                             "(default: JOB_APPLIER_VERBOSITY or 2)")
+    parser.add_argument("--trace-chrome", metavar="FILE",
+                        help="Also write the run's spans as a Chrome trace viewer file")
+    parser.add_argument("--otlp-endpoint", metavar="URL",
+                        help="Also export the spans to an OpenTelemetry collector "
+                             "(OTLP/HTTP, e.g. http://localhost:4318/v1/traces)")
+    return parser
+
+def print_plan(script, queries, sources, workers, max_applications, profile_path="profile.json",
+               max_pages=None, incremental=True):
+    """--dry-run output: what a real run would do, checked without side effects."""
+    import os
+    import json
+    from dotenv import load_dotenv
+    load_dotenv()  # Only reads the local .env file
+    print(f"Dry run of {script}")
+    print(f"  Queries: {', '.join(f'{k!r} in {l!r}' for k, l in queries)}")
+    print(f"  Sources: {', '.join(sources)}")
+    if max_pages is not None:
+        print(f"  Pages per board and query: up to {max_pages}"
+              f"{', stopping at postings seen last crawl' if incremental else ''}")
+    print(f"  Browser workers per stage: {workers}")
+    print(f"  Applications capped at: {max_applications}")
+    try:
+        with open(profile_path, "r") as f:
+            profile = json.load(f)
+        missing = [key for key in ("name", "email", "phone", "skills", "experience") if not profile.get(key)]
+        print(f"  Profile: {profile_path} ({'missing ' + ', '.join(missing) if missing else 'ok'})")
+    except (OSError, ValueError) as e:
+        print(f"  Profile: could not load {profile_path}: {e}")
+    print(f"  XAI_API_KEY: {'set' if os.getenv('XAI_API_KEY') else 'not set'}")
@@ -0,0 +1,177 @@
+import os
+import re
+import json
+import time
+import hashlib
+import threading
+
+VARIANTS_PATH = os.getenv("COVER_LETTER_VARIANTS_PATH", "cover_letter_variants.json")
+MAX_TOKENS = int(os.getenv("COVER_LETTER_MAX_TOKENS", "160"))  # One short paragraph
+VARIANT_MAX_AGE = 30 * 24 * 3600
+TOP_SKILLS = 4
+
+PARAGRAPH_INSTRUCTIONS = (
+    "You are a job application assistant. The candidate above already has a cover letter; write ONE "
+    "short paragraph (3-4 sentences, under 100 words) to insert into it, connecting the candidate's "
+    "experience to what this role needs. Do not name the company, add a greeting or a sign-off; "
+    "reply with the paragraph only."
+)
+LETTER_INSTRUCTIONS = "You are a job application assistant. Write a cover letter for the candidate above."
+
+# Seniority and work-mode words don't change what the tailoring paragraph should say
+_ROLE_NOISE = re.compile(r"\(.*?\)|\b(senior|sr|junior|jr|lead|staff|principal|remote|hybrid|contract|"
+                         r"full[- ]time|part[- ]time|i{1,3}|[0-9]+)\b|[^a-z0-9+# ]", re.IGNORECASE)
+
+def role_key(company, title):
+    """
+    Cache key for a tailoring paragraph: normalized company plus title without
+    seniority/work mode. None without a company (vision and link-only cards):
+    the title alone doesn't identify the role, so such paragraphs aren't shared.
+    """
+    company = " ".join((company or "").lower().split())
+    if not company:
+        return None
+    role = " ".join(_ROLE_NOISE.sub(" ", (title or "").lower()).split())
+    return f"{company}|{role}"
+
+def cover_letter_path(job_link, directory="cover_letters"):
+    """Per-job file so parallel applications don't overwrite each other."""
+    os.makedirs(directory, exist_ok=True)
+    name = hashlib.sha1(job_link.encode("utf-8")).hexdigest()[:12]
+    return os.path.abspath(os.path.join(directory, f"cover_letter_{name}.txt"))
+
+def relevant_skills(skills, job_desc, limit=TOP_SKILLS):
+    """Profile skills the description mentions, in profile order; the first few if none match."""
+    text = (job_desc or "").lower()
+    found = [skill for skill in skills
+             if re.search(r"(?<![a-z0-9])" + re.escape(skill.split(" (")[0].lower()) + r"(?![a-z0-9])", text)]
+    return (found or list(skills))[:limit]
+
+def join_words(items):
+    """["A", "B", "C"] -> "A, B and C"."""
+    return " and ".join([", ".join(items[:-1]), items[-1]]) if len(items) > 1 else "".join(items)
+
+def experience_phrase(experience):
+    """First clause of the experience blurb, e.g. "3+ years in software development"."""
+    first = re.split(r"[,.;]\s", (experience or "").strip(), maxsplit=1)[0]
+    return first.rstrip(".") or "experience in software development"
+
+class CoverLetterWriter:
+    """
+    Template-first cover letters. The profile's cover_letter_template is filled
+    locally ([Employer], [Job Title], [Company], [Experience], [Skills]); the LLM
+    only writes one short tailoring paragraph, streamed with a token cap and cut
+    off at the first paragraph break, which is inserted after the opening
+    paragraph. Paragraphs are kept per company and role (VARIANTS_PATH), so
+    reposted or cross-board duplicates of a role cost no LLM call at all;
+    postings without a company always get their own paragraph.
+    Profiles without a template fall back to generating the whole letter.
+    """
+
+    def __init__(self, gateway, profile, prompts, max_tokens=MAX_TOKENS, variants_path=VARIANTS_PATH,
+                 endpoint="cover_letter"):
+        self.gateway = gateway
+        self.profile = profile
+        self.prompts = prompts
+        self.max_tokens = max_tokens
+        self.variants_path = variants_path
+        self.endpoint = endpoint
+        self.template = profile.get("cover_letter_template")
+        self.stats = {"letters": 0, "generated": 0, "cached": 0, "untailored": 0, "full": 0, "seconds": 0.0}
+        self._lock = threading.Lock()
+        self._pending = {}  # key -> Event, so concurrent applications to one role share a call
+        try:
+            with open(variants_path, "r") as f:
+                variants = json.load(f)
+            cutoff = time.time() - VARIANT_MAX_AGE
+            self.variants = {key: v for key, v in variants.items() if v.get("created", 0) >= cutoff}
+        except (OSError, ValueError, AttributeError):
+            self.variants = {}
+
+    def fill_template(self, job_desc, company=None, title=None):
+        skills = self.profile.get("skills") or []
+        if isinstance(skills, str):
+            skills = [skills]
+        slots = {
+            "[Employer]": f"{company} Hiring Team" if company else "Hiring Manager",
+            "[Job Title]": title or "advertised",
+            "[Company]": company or "your company",
+            "[Experience]": experience_phrase(self.profile.get("experience")),
+            "[Skills]": join_words(relevant_skills(skills, job_desc)),
+        }
+        letter = self.template
+        for slot, value in slots.items():
+            letter = letter.replace(slot, value)
+        return letter
+
+    def tailoring_paragraph(self, job_desc, company=None, title=None):
+        """The job-specific paragraph: cached per company and role, else one capped, streamed call."""
+        key = role_key(company, title)
+        while key is not None:
+            with self._lock:
+                if key in self.variants:
+                    self.stats["cached"] += 1
+                    return self.variants[key]["paragraph"]
+                pending = self._pending.get(key)
+                if pending is None:
+                    self._pending[key] = threading.Event()
+                    break
+            pending.wait()
+            with self._lock:
+                if key not in self.variants:  # The other call failed; don't wait on it again
+                    return None
+        try:
+            header = " at ".join(filter(None, [title, company])) or "Untitled role"
+            messages = self.prompts.messages("cover_letter", PARAGRAPH_INSTRUCTIONS,
+                                             f"Role: {header}\nJob description: {job_desc}")
+            paragraph = self.gateway.call_stream(self.endpoint, messages, stop_at="\n\n",
+                                                 max_tokens=self.max_tokens).strip()
+            if paragraph:
+                with self._lock:
+                    if key is not None:
+                        self.variants[key] = {"paragraph": paragraph, "created": time.time()}
+                    self.stats["generated"] += 1
+            return paragraph or None
+        except Exception as e:
+            print(f"Cover letter: tailoring paragraph failed, using the template alone: {e}")
+            return None
+        finally:
+            if key is not None:
+                with self._lock:
+                    self._pending.pop(key).set()
+
+    def letter(self, job_desc, company=None, title=None):
+        start = time.perf_counter()
+        if not self.template:
+            letter = self.gateway.call(self.endpoint, self.prompts.messages(
+                "cover_letter", LETTER_INSTRUCTIONS, f"Job description: {job_desc}"))
+            kind = "full"
+        else:
+            letter = self.fill_template(job_desc, company, title)
+            paragraph = self.tailoring_paragraph(job_desc, company, title)
+            if paragraph:
+                paragraphs = letter.split("\n\n")
+                # After the salutation and opening paragraph; before the sign-off in short templates
+                at = min(2, max(len(paragraphs) - 1, 1))
+                letter = "\n\n".join(paragraphs[:at] + [paragraph] + paragraphs[at:])
+            kind = None if paragraph else "untailored"
+        with self._lock:
+            self.stats["letters"] += 1
+            self.stats["seconds"] += time.perf_counter() - start
+            if kind:
+                self.stats[kind] += 1
+        return letter
+
+    def save(self):
+        with self._lock:
+            with open(self.variants_path, "w") as f:
+                json.dump(self.variants, f)
+
+    def report(self):
+        stats = self.stats
+        if not stats["letters"]:
+            return
+        print(f"Cover letters: {stats['letters']} written in {stats['seconds'] / stats['letters']:.2f}s on average "
+              f"({stats['generated']} tailoring paragraphs generated, {stats['cached']} reused, "
+              f"{stats['untailored']} template only, {stats['full']} fully generated)")
+        self.save()
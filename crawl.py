@@ -0,0 +1,184 @@
+import os
+import time
+import sqlite3
+import threading
+from urllib.parse import quote_plus
+from dedup_index import canonicalize_url
+from page_ready import fetch_url
+
+STATE_PATH = os.getenv("CRAWL_STATE_PATH", "crawl_state.sqlite3")
+MAX_PAGES = int(os.getenv("CRAWL_MAX_PAGES", "5"))
+# X search is one infinite-scroll page; the other boards page through the URL
+BOARD_MAX_PAGES = {"X": 1}
+# A page where this share of postings was already seen last crawl means we've caught up
+KNOWN_FRACTION = 0.8
+# An interrupted crawl resumes from its checkpoint if restarted within this window;
+# after that (e.g. the next daily run) it starts again from page one
+RESUME_WINDOW = float(os.getenv("CRAWL_RESUME_HOURS", "6")) * 3600
+SEEN_MAX_AGE = 30 * 24 * 3600
+
+INDEED_REMOTE = "032b3046-06a3-4876-8dfd-474eb5e7ed11"
+
+def search_url(board, keyword, location, page=0):
+    """URL to load for one page (0-based) of search results, newest postings first."""
+    return fetch_url(board_url(board, keyword, location, page))
+
+def board_url(board, keyword, location, page=0):
+    if board == "Indeed":
+        url = (f"https://www.indeed.com/jobs?q={quote_plus(keyword)}&l={quote_plus(location)}"
+               f"&remotejob={INDEED_REMOTE}&sort=date")
+        return url + (f"&start={10 * page}" if page else "")
+    if board == "Glassdoor":
+        keyword_formatted = keyword.replace(" OR ", "+").replace(" ", "+")
+        suffix = f"_IP{page + 1}" if page else ""
+        return (f"https://www.glassdoor.com/Job/{keyword_formatted}-jobs-SRCH_KO0,{len(keyword_formatted)}"
+                f"{suffix}.htm?remoteWorkType=1&sortBy=date_desc")
+    if board == "LinkedIn":
+        keyword_formatted = keyword.replace(" OR ", "+").replace(" ", "+")
+        url = (f"https://www.linkedin.com/jobs/search/?keywords={keyword_formatted}"
+               f"&location={quote_plus(location)}&f_WT=2&sortBy=DD")
+        return url + (f"&start={25 * page}" if page else "")
+    if board == "X":
+        query = f"{keyword} {location} job -filter:replies"
+        return f"https://x.com/search?q={quote_plus(query)}&src=typed_query&f=live"
+    raise ValueError(f"Unknown board {board}")
+
+def query_key(board, keyword, location):
+    return f"{board}|{keyword}|{location}"
+
+class CrawlFrontier:
+    """
+    Persistent crawl state: for each board x query, the page to continue from
+    (the checkpoint) and the postings seen by earlier crawls, which tell an
+    incremental crawl where the new postings end.
+    """
+
+    def __init__(self, path=STATE_PATH, resume_window=RESUME_WINDOW):
+        self.resume_window = resume_window
+        self._lock = threading.Lock()
+        self._started = {}  # key -> start time of the crawl in progress
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.executescript("""
+            CREATE TABLE IF NOT EXISTS queries (
+                key TEXT PRIMARY KEY,
+                next_page INTEGER NOT NULL,
+                status TEXT NOT NULL,
+                crawl_started REAL NOT NULL,
+                checkpoint_at REAL NOT NULL
+            );
+            CREATE TABLE IF NOT EXISTS seen (
+                key TEXT NOT NULL,
+                url TEXT NOT NULL,
+                crawl_started REAL NOT NULL,
+                PRIMARY KEY (key, url)
+            );
+        """)
+        self._conn.execute("DELETE FROM seen WHERE crawl_started < ?", (time.time() - SEEN_MAX_AGE,))
+        self._conn.commit()
+
+    def start(self, key):
+        """Page to crawl first: the checkpoint of a recently interrupted crawl, else 0."""
+        now = time.time()
+        with self._lock:
+            row = self._conn.execute("SELECT next_page, status, crawl_started, checkpoint_at FROM queries "
+                                     "WHERE key = ?", (key,)).fetchone()
+            if row and row[1] == "running" and now - row[3] < self.resume_window:
+                self._started[key] = row[2]
+                return row[0]
+            self._started[key] = now
+            self._conn.execute("INSERT OR REPLACE INTO queries (key, next_page, status, crawl_started, checkpoint_at) "
+                               "VALUES (?, 0, 'running', ?, ?)", (key, now, now))
+            self._conn.commit()
+            return 0
+
+    def known(self, key, urls):
+        """How many of these (canonical) URLs an earlier crawl of this query already saw."""
+        if not urls:
+            return 0
+        with self._lock:
+            placeholders = ",".join("?" * len(urls))
+            return self._conn.execute(
+                f"SELECT COUNT(*) FROM seen WHERE key = ? AND crawl_started < ? AND url IN ({placeholders})",
+                (key, self._started[key], *urls)).fetchone()[0]
+
+    def checkpoint(self, key, page, urls):
+        """Page `page` is done: remember its postings and continue from the next page if interrupted."""
+        with self._lock:
+            self._conn.executemany("INSERT OR REPLACE INTO seen (key, url, crawl_started) VALUES (?, ?, ?)",
+                                   [(key, url, self._started[key]) for url in urls])
+            self._conn.execute("UPDATE queries SET next_page = ?, checkpoint_at = ? WHERE key = ?",
+                               (page + 1, time.time(), key))
+            self._conn.commit()
+
+    def finish(self, key):
+        with self._lock:
+            self._conn.execute("UPDATE queries SET status = 'done' WHERE key = ?", (key,))
+            self._conn.commit()
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+class Crawler:
+    """
+    Crawls board x keyword x location queries page by page. `scrapers` maps a
+    board name to fetch(keyword, location, page) -> list of job dicts.
+    Pagination stops at max_pages, at the end of the results, or (incremental
+    mode) at the first page mostly made of postings the last crawl already saw,
+    so a daily run costs about as many pages as there are new postings.
+    """
+
+    def __init__(self, scrapers, frontier=None, max_pages=MAX_PAGES, incremental=True,
+                 known_fraction=KNOWN_FRACTION):
+        self.scrapers = scrapers
+        self.frontier = frontier or CrawlFrontier()
+        self.max_pages = max_pages
+        self.incremental = incremental
+        self.known_fraction = known_fraction
+        self.stats = {}
+        self._lock = threading.Lock()
+
+    def tasks(self, keywords, locations):
+        return [(board, keyword, location)
+                for keyword in keywords for location in locations for board in self.scrapers]
+
+    def crawl(self, task):
+        """Generator of the jobs found for one (board, keyword, location) task, page by page."""
+        board, keyword, location = task
+        key = query_key(board, keyword, location)
+        max_pages = min(self.max_pages, BOARD_MAX_PAGES.get(board, self.max_pages))
+        page = self.frontier.start(key)
+        if page:
+            print(f"Resuming crawl of {board} '{keyword}' in '{location}' at page {page + 1}")
+        stats = {"pages": 0, "jobs": 0, "known": 0, "stopped": "depth limit"}
+        with self._lock:
+            self.stats[key] = stats
+        previous = None
+        while page < max_pages:
+            jobs = self.scrapers[board](keyword, location, page)
+            urls = sorted({canonicalize_url(job["link"]) for job in jobs})
+            if not urls or urls == previous:
+                stats["stopped"] = "end of results"
+                break
+            known = self.frontier.known(key, urls) if self.incremental else 0
+            stats["pages"] += 1
+            stats["jobs"] += len(jobs)
+            stats["known"] += known
+            yield from jobs
+            # Only once every job was handed on, so an interrupted page is read again on resume
+            self.frontier.checkpoint(key, page, urls)
+            if self.incremental and known >= self.known_fraction * len(urls):
+                stats["stopped"] = "caught up with last crawl"
+                break
+            previous = urls
+            page += 1
+        self.frontier.finish(key)
+
+    def report(self):
+        print("Crawl summary:")
+        for key, stats in self.stats.items():
+            print(f"  {key.replace('|', ' / ')}: {stats['pages']} pages, {stats['jobs']} postings "
+                  f"({stats['known']} seen last crawl), stopped: {stats['stopped']}")
+
+    def close(self):
+        self.frontier.close()
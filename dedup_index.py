@@ -0,0 +1,230 @@
+import os
+import re
+import time
+import random
+import sqlite3
+import hashlib
+import threading
+from array import array
+from urllib.parse import urlparse, parse_qsl, urlencode, urlunparse
+from tracing import log
+
+INDEX_PATH = os.getenv("DEDUP_INDEX_PATH", "seen_postings.sqlite3")
+
+# Query parameters that only track where a click came from
+TRACKING_PARAMS = {
+    "from", "tk", "advn", "adid", "vjs", "sjdu", "acatk", "pub", "xkcb", "camk",
+    "ref", "refid", "trackingid", "trk", "src", "position", "pagenum", "eid", "lipi",
+    "guid", "ao", "s", "t", "cs", "gclid", "fbclid", "mc_cid", "mc_eid", "source",
+    "gh_src", "lever-origin", "lever-source[]",
+}
+# Per-board query parameters that identify the posting itself; everything else is dropped
+ID_PARAMS = {
+    "indeed.com": {"jk"},
+    "glassdoor.com": {"jl"},
+    "linkedin.com": {"currentjobid"},
+}
+# Hosts and paths that only bounce to the real posting
+REDIRECT_HOSTS = {"t.co", "lnkd.in", "bit.ly"}
+INDEED_CLICK_PATHS = ("/rc/clk", "/pagead/clk", "/clk")
+
+NUM_PERM = 64
+BANDS = 16  # 16 bands x 4 rows: ~50% candidate chance at 0.7 Jaccard, ~99% at 0.9
+ROWS = NUM_PERM // BANDS
+SIMILARITY_THRESHOLD = 0.8
+# Outcomes a later run should try again instead of skipping
+RETRY_STATUSES = ("failed",)
+_PRIME = (1 << 61) - 1
+_rng = random.Random(1729)  # Fixed seed: signatures must be comparable across runs
+_PERMUTATIONS = [(_rng.randrange(1, _PRIME), _rng.randrange(0, _PRIME)) for _ in range(NUM_PERM)]
+
+def _site(host):
+    host = (host or "").lower()
+    for site in ID_PARAMS:
+        if host == site or host.endswith("." + site):
+            return site
+    return None
+
+def canonicalize_url(url):
+    """Drop fragments, tracking parameters and `www.` so one posting has one URL."""
+    parts = urlparse(url.strip())
+    host = (parts.hostname or "").lower()
+    if host.startswith("www."):
+        host = host[4:]
+    path = parts.path.rstrip("/") or "/"
+    query = parse_qsl(parts.query, keep_blank_values=False)
+    site = _site(host)
+    if site == "indeed.com" and (path in INDEED_CLICK_PATHS or path == "/viewjob"):
+        # Every Indeed click-tracking URL carries the job key; point it at the job page
+        path = "/viewjob"
+    if site == "linkedin.com" and "/jobs/view/" in path:
+        query = []  # The posting id is in the path
+    elif site:
+        query = [(k, v) for k, v in query if k.lower() in ID_PARAMS[site]]
+    else:
+        query = [(k, v) for k, v in query
+                 if k.lower() not in TRACKING_PARAMS and not k.lower().startswith("utm_")]
+    return urlunparse(("https", host, path, "", urlencode(sorted(query)), ""))
+
+def normalize_words(text):
+    return re.findall(r"[a-z0-9+#]+", (text or "").lower())
+
+def shingles(text, size=3):
+    words = normalize_words(text)
+    if len(words) < size:
+        return {" ".join(words)} if words else set()
+    return {" ".join(words[i:i + size]) for i in range(len(words) - size + 1)}
+
+def minhash(tokens):
+    """64-permutation MinHash signature of a set of shingles."""
+    hashes = [int.from_bytes(hashlib.blake2b(t.encode("utf-8"), digest_size=8).digest(), "big")
+              for t in tokens]
+    if not hashes:
+        return None
+    return [min((a * h + b) % _PRIME for h in hashes) for a, b in _PERMUTATIONS]
+
+def similarity(sig_a, sig_b):
+    return sum(1 for x, y in zip(sig_a, sig_b) if x == y) / NUM_PERM
+
+def band_keys(signature):
+    return [f"{band}:" + hashlib.md5(
+                array("Q", signature[band * ROWS:(band + 1) * ROWS]).tobytes()).hexdigest()
+            for band in range(BANDS)]
+
+def posting_text(job, description=None):
+    return " ".join(filter(None, [job.get("company"), job.get("title"), description]))
+
+class DedupIndex:
+    """
+    Persistent index of postings already seen, across boards and runs.
+    Exact duplicates are caught by canonical URL before any browser work.
+    Near-duplicates (the same role reposted on another board) are caught by
+    MinHash over company + title + description shingles, with LSH banding so a
+    lookup only compares against a handful of candidates. Claims last for the
+    current run; postings only become permanent once record() stores their
+    outcome, so a crashed run doesn't lose the ones it never got to; postings
+    recorded as "failed" are claimable again by a later run.
+    """
+
+    def __init__(self, path=INDEX_PATH, threshold=SIMILARITY_THRESHOLD, resolve_redirects=True):
+        self.threshold = threshold
+        self.resolve_redirects = resolve_redirects
+        self.duplicates = 0
+        self.near_duplicates = 0
+        self._lock = threading.Lock()
+        self._claimed = set()
+        self._run_bands = {}  # LSH band -> [(signature, url)] for postings claimed this run
+        self._redirects = {}
+        self._session = None
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.executescript("""
+            CREATE TABLE IF NOT EXISTS postings (
+                id INTEGER PRIMARY KEY,
+                url TEXT UNIQUE NOT NULL,
+                title TEXT,
+                company TEXT,
+                signature BLOB,
+                status TEXT NOT NULL,
+                seen_at REAL NOT NULL
+            );
+            CREATE TABLE IF NOT EXISTS bands (
+                band TEXT NOT NULL,
+                posting_id INTEGER NOT NULL REFERENCES postings(id)
+            );
+            CREATE INDEX IF NOT EXISTS idx_bands_band ON bands(band);
+        """)
+        self._conn.commit()
+
+    def canonical(self, url):
+        """Canonical URL, following known redirectors (t.co, lnkd.in, ...) with one HEAD request."""
+        host = (urlparse(url).hostname or "").lower()
+        if self.resolve_redirects and host in REDIRECT_HOSTS:
+            if url not in self._redirects:
+                import requests
+                try:
+                    if self._session is None:
+                        self._session = requests.Session()
+                    self._redirects[url] = self._session.head(url, allow_redirects=True, timeout=10).url
+                except requests.RequestException as e:
+                    log(f"Warning: Dedup could not resolve redirect {url}: {e}")
+                    self._redirects[url] = url
+            url = self._redirects[url]
+        return canonicalize_url(url)
+
+    def claim_url(self, job):
+        """
+        First, cheap check right after scraping: True if this URL is new.
+        Also claims it for this run, so the copy from another board is dropped.
+        """
+        url = self.canonical(job["link"])
+        job["canonical_url"] = url
+        with self._lock:
+            if url in self._claimed:
+                self.duplicates += 1
+                return False
+            seen = self._conn.execute("SELECT status FROM postings WHERE url = ?", (url,)).fetchone()
+            if seen and seen[0] not in RETRY_STATUSES:
+                self.duplicates += 1
+                return False
+            self._claimed.add(url)
+            return True
+
+    def claim_content(self, job, description):
+        """
+        Second check once the description is known, before any LLM work:
+        True unless a posting with near-identical company/title/description was seen.
+        """
+        signature = minhash(shingles(posting_text(job, description)))
+        job["signature"] = signature
+        if signature is None:
+            return True
+        url = job.get("canonical_url")
+        keys = band_keys(signature)
+        with self._lock:
+            candidates = []
+            for key in keys:
+                for (blob, seen_url) in self._conn.execute(
+                        "SELECT p.signature, p.url FROM bands b JOIN postings p ON p.id = b.posting_id "
+                        f"WHERE b.band = ? AND p.status NOT IN ({','.join('?' * len(RETRY_STATUSES))})",
+                        (key, *RETRY_STATUSES)):
+                    candidates.append((array("Q", blob), seen_url))
+                candidates.extend(self._run_bands.get(key, []))
+            for other, seen_url in candidates:
+                if seen_url != url and similarity(signature, other) >= self.threshold:
+                    self.near_duplicates += 1
+                    log(f"Dedup: {job['link']} is a near-duplicate of {seen_url}")
+                    return False
+            # Remember it for this run so a concurrent copy from another board is caught too
+            for key in keys:
+                self._run_bands.setdefault(key, []).append((signature, url))
+            return True
+
+    def record(self, job, status):
+        """Persist the outcome ("rejected", "applied", ...) so later runs skip it; "failed" ones are retried."""
+        url = job.get("canonical_url") or canonicalize_url(job["link"])
+        signature = job.get("signature")
+        with self._lock:
+            row = self._conn.execute("SELECT id FROM postings WHERE url = ?", (url,)).fetchone()
+            if row:
+                self._conn.execute("UPDATE postings SET status = ? WHERE id = ?", (status, row[0]))
+            else:
+                cursor = self._conn.execute(
+                    "INSERT INTO postings (url, title, company, signature, status, seen_at) "
+                    "VALUES (?, ?, ?, ?, ?, ?)",
+                    (url, job.get("title"), job.get("company"),
+                     array("Q", signature).tobytes() if signature else None, status, time.time()),
+                )
+                if signature:
+                    self._conn.executemany("INSERT INTO bands (band, posting_id) VALUES (?, ?)",
+                                           [(key, cursor.lastrowid) for key in band_keys(signature)])
+            self._conn.commit()
+
+    def report(self):
+        with self._lock:
+            total = self._conn.execute("SELECT COUNT(*) FROM postings").fetchone()[0]
+        print(f"Dedup: dropped {self.duplicates} duplicate URLs and {self.near_duplicates} "
+              f"near-duplicate postings; {total} postings indexed")
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
@@ -0,0 +1,409 @@
+import re
+import json
+import threading
+from urllib.parse import urljoin
+from selenium.webdriver.common.by import By
+from page_ready import domain_of
+from tracing import log
+
+# Tiered extraction: structured data first (JSON-LD JobPosting, then the board's own
+# selectors), then a readability-style guess at the main text block, and only if
+# both fail the caller's fallback (the vision model). Each tier is counted so the
+# run summary shows how many vision calls were avoided.
+TIERS = ("jsonld", "dom", "readability", "fallback")
+
+# Per-board selectors; the card/title/link ones are the same as jobappV3's scrapers
+BOARD_SELECTORS = {
+    "indeed.com": {
+        "card": "[data-testid='jobcard'], .job_seen_beacon",
+        "title": "[data-testid='jobTitle'], a.jcs-JobTitle",
+        "link": "a",
+        "company": "[data-testid='company-name'], .companyName",
+        "description": "#jobDescriptionText, .jobsearch-JobDescriptionSection",
+    },
+    "linkedin.com": {
+        "card": ".base-card",
+        "title": ".base-search-card__title",
+        "link": ".base-card__full-link",
+        "company": ".base-search-card__subtitle",
+        "description": ".show-more-less-html__markup, .jobs-description",
+    },
+    "glassdoor.com": {
+        "card": ".JobsList_jobListItem__JBBUV, [data-test='jobListing']",
+        "title": ".JobCard_seoLink__WdqHZ, [data-test='job-title']",
+        "link": ".JobCard_seoLink__WdqHZ, [data-test='job-title']",
+        "company": "[class*='EmployerProfile_compactEmployerName'], .employer-name",
+        "description": "[class*='JobDetails_jobDescription'], .jobDescriptionContent",
+    },
+    "x.com": {
+        "card": "[data-testid='tweet']",
+        "title": "[data-testid='tweetText']",
+        "link": "a[href*='/status/']",
+        "description": "[data-testid='tweetText']",
+    },
+    "greenhouse.io": {"description": "#content, .job__description"},
+    "lever.co": {"description": ".posting-page .section-wrapper, [data-qa='job-description']"},
+    "myworkdayjobs.com": {"description": "[data-automation-id='jobPostingDescription']"},
+}
+# Any board: the class jobappV3 fell back to
+GENERIC_DESCRIPTION = ".jobsearch-JobDescriptionSection, .description, [class*='job-description']"
+
+# Links that point at a single posting, for search pages whose cards we don't recognise
+POSTING_LINK = re.compile(
+    r"/viewjob|/rc/clk|[?&]jk=|/jobs/view/|/job-listing/|/partner/jobListing|/jobs/\d+|/status/\d+|lever\.co/[^/]+/[0-9a-f-]{36}"
+)
+MIN_DESCRIPTION_CHARS = 100  # Less than this is a teaser or an error page, not a description
+MIN_TITLE_CHARS = 4
+
+# Posting ids boards put on their cards, and the posting URL each one maps to.
+# Cards whose title is a JS click handler rather than a link still yield a URL this way.
+CARD_ID_ATTRIBUTES = ["data-jk", "data-jobid", "data-job-id", "data-id", "data-entity-urn"]
+ID_URLS = {
+    "indeed.com": ("data-jk", "https://www.indeed.com/viewjob?jk={}"),
+    "glassdoor.com": ("data-jobid", "https://www.glassdoor.com/job-listing/j?jl={}"),
+    "linkedin.com": ("data-entity-urn", "https://www.linkedin.com/jobs/view/{}"),
+}
+
+_JSONLD_SCRIPT = """
+return Array.from(document.querySelectorAll('script[type="application/ld+json"]')).map(s => s.textContent);
+"""
+
+# Shared by the scripts below: the posting fields of one card (or of whatever an XPath points at)
+_CARD_FIELDS = """
+const ID_ATTRIBUTES = arguments[arguments.length - 1];
+function text(el) { return el ? (el.innerText || el.textContent || '').trim() : ''; }
+function cardFields(card, titleSel, linkSel, companySel) {
+    const title = titleSel ? card.querySelector(titleSel) : null;
+    const link = (linkSel && card.matches(linkSel) ? card : null) || (linkSel && card.querySelector(linkSel))
+        || card.closest('a[href]') || card.querySelector('a[href]');
+    const company = companySel ? card.querySelector(companySel) : null;
+    const ids = {};
+    for (const el of [card, ...card.querySelectorAll(ID_ATTRIBUTES.map(a => '[' + a + ']').join(','))]) {
+        for (const attr of ID_ATTRIBUTES) {
+            if (!ids[attr] && el.getAttribute(attr)) ids[attr] = el.getAttribute(attr);
+        }
+    }
+    return {title: text(title) || text(link) || text(card).split('\\n')[0], href: link ? link.href : null,
+            company: text(company), ids: ids};
+}
+"""
+
+# Every card on the page in one round trip, instead of several WebDriver calls per card
+_CARDS_SCRIPT = _CARD_FIELDS + """
+const [cardSel, titleSel, linkSel, companySel] = arguments;
+return Array.from(document.querySelectorAll(cardSel)).map(card => cardFields(card, titleSel, linkSel, companySel));
+"""
+
+_LINKS_SCRIPT = """
+return Array.from(document.querySelectorAll('a[href]')).map(a => [a.href, (a.innerText || '').trim()]);
+"""
+
+_XPATHS_SCRIPT = _CARD_FIELDS + """
+return arguments[0].map(xpath => {
+    try {
+        const node = document.evaluate(xpath, document, null, XPathResult.FIRST_ORDERED_NODE_TYPE, null).singleNodeValue;
+        return node && node.nodeType === 1 ? cardFields(node, null, 'a[href]', null) : null;
+    } catch (e) {
+        return null;
+    }
+});
+"""
+
+def board_selectors(url):
+    domain = domain_of(url)
+    for board, selectors in BOARD_SELECTORS.items():
+        if domain == board or domain.endswith("." + board):
+            return selectors
+    return {}
+
+def card_link(url, fields):
+    """Posting URL for a card: its link, or one built from the board's posting id."""
+    if fields.get("href") and not fields["href"].startswith("javascript:"):
+        return fields["href"]
+    domain = domain_of(url)
+    for board, (attribute, template) in ID_URLS.items():
+        if (domain == board or domain.endswith("." + board)) and fields.get("ids", {}).get(attribute):
+            return template.format(fields["ids"][attribute].rsplit(":", 1)[-1])
+    return None
+
+def resolve_xpaths(driver, xpaths):
+    """Card fields ({"title", "href", "company", "ids"}) for each XPath, or None where it matches nothing."""
+    return driver.execute_script(_XPATHS_SCRIPT, list(xpaths), CARD_ID_ATTRIBUTES) or []
+
+def parse_html(html):
+    from bs4 import BeautifulSoup
+    return BeautifulSoup(html or "", "lxml")
+
+def html_to_text(html):
+    return parse_html(html).get_text("\n", strip=True)
+
+def jsonld_blobs(soup):
+    return [script.string or "" for script in soup.select('script[type="application/ld+json"]')]
+
+def job_postings(blobs):
+    """JobPosting objects found in JSON-LD blobs (top level, lists and @graph)."""
+    found = []
+
+    def walk(node):
+        if isinstance(node, list):
+            for item in node:
+                walk(item)
+        elif isinstance(node, dict):
+            kind = node.get("@type")
+            if kind == "JobPosting" or (isinstance(kind, list) and "JobPosting" in kind):
+                found.append(node)
+            for key in ("@graph", "itemListElement", "item"):
+                if key in node:
+                    walk(node[key])
+
+    for blob in blobs:
+        try:
+            walk(json.loads(blob))
+        except (TypeError, ValueError):
+            continue
+    return found
+
+def readable_text(html):
+    """
+    Readability-style guess at the main text of a page: every paragraph/list item
+    scores its parent by text length (and its grandparent by half), chrome like
+    nav/header/footer is ignored, and the best-scoring block wins.
+    """
+    soup = parse_html(html)
+    for tag in soup(["script", "style", "noscript", "nav", "header", "footer", "aside", "svg"]):
+        tag.decompose()
+    scores = {}
+    nodes = {}
+    for block in soup.find_all(["p", "li", "pre"]):
+        length = len(block.get_text(" ", strip=True))
+        if length < 25:
+            continue
+        parent = block.parent
+        grandparent = parent.parent if parent is not None else None
+        for node, weight in ((parent, 1.0), (grandparent, 0.5)):
+            if node is not None and node.name not in ("[document]", "html"):
+                scores[id(node)] = scores.get(id(node), 0) + length * weight
+                nodes[id(node)] = node
+    if not scores:
+        return None
+    best = nodes[max(scores, key=scores.get)]
+    return best.get_text("\n", strip=True)
+
+class Extractor:
+    """Runs the extraction tiers for search pages and postings and counts which tier answered."""
+
+    def __init__(self, min_description_chars=MIN_DESCRIPTION_CHARS):
+        self.min_description_chars = min_description_chars
+        self.counts = {"cards": dict.fromkeys(TIERS + ("failed",), 0),
+                       "description": dict.fromkeys(TIERS + ("failed",), 0)}
+        self._lock = threading.Lock()
+
+    def _count(self, kind, tier):
+        with self._lock:
+            self.counts[kind][tier] += 1
+
+    # Search pages
+
+    def cards(self, driver, url, source, fallback=None):
+        """
+        Job dicts ({"title", "link", "source"}) on the search page the driver is showing.
+        fallback(driver, url, source) is only called when no structured tier finds anything.
+        """
+        # Board selectors go first here: a search page's JSON-LD often covers only the selected posting
+        for tier, method in (("dom", self._cards_dom), ("jsonld", self._cards_jsonld),
+                             ("readability", self._cards_links)):
+            try:
+                jobs = method(driver, url, source)
+            except Exception as e:
+                log(f"Warning: {tier} card extraction failed on {url}: {e}")
+                jobs = []
+            if jobs:
+                log(f"Success: Found {len(jobs)} jobs from {source} via {tier}")
+                self._count("cards", tier)
+                return jobs
+        if fallback is not None:
+            jobs = fallback(driver, url, source)
+            if jobs:
+                self._count("cards", "fallback")
+                return jobs
+        self._count("cards", "failed")
+        return []
+
+    def cards_html(self, html, url, source):
+        """cards() for a page fetched without a browser: the same tiers on the raw HTML, no fallback."""
+        soup = parse_html(html)
+        for tier, method in (("dom", self._cards_dom_html), ("jsonld", self._cards_jsonld_html),
+                             ("readability", self._cards_links_html)):
+            try:
+                jobs = method(soup, url, source)
+            except Exception as e:
+                log(f"Warning: {tier} card extraction failed on {url}: {e}")
+                jobs = []
+            if jobs:
+                log(f"Success: Found {len(jobs)} jobs from {source} via {tier} (HTTP)")
+                self._count("cards", tier)
+                return jobs
+        return []
+
+    def _cards_jsonld(self, driver, url, source):
+        return self._jsonld_jobs(driver.execute_script(_JSONLD_SCRIPT) or [], url, source)
+
+    def _jsonld_jobs(self, blobs, url, source):
+        jobs = []
+        for posting in job_postings(blobs):
+            link = posting.get("url") or posting.get("@id")
+            if posting.get("title") and link:
+                jobs.append(self._job(posting["title"], urljoin(url, link), source,
+                                      (posting.get("hiringOrganization") or {}).get("name")))
+        return jobs
+
+    def _cards_dom(self, driver, url, source):
+        selectors = board_selectors(url)
+        if "card" not in selectors:
+            return []
+        cards = driver.execute_script(_CARDS_SCRIPT, selectors["card"], selectors["title"], selectors["link"],
+                                      selectors.get("company"), CARD_ID_ATTRIBUTES) or []
+        jobs, seen = [], set()
+        for fields in cards:
+            link = card_link(url, fields)
+            if link and link not in seen and len(fields.get("title") or "") >= MIN_TITLE_CHARS:
+                seen.add(link)
+                jobs.append(self._job(fields["title"][:100], link, source, fields.get("company"), fields.get("ids")))
+        return jobs
+
+    def _cards_links(self, driver, url, source):
+        jobs, seen = [], set()
+        for link, title in driver.execute_script(_LINKS_SCRIPT) or []:
+            if link in seen or not POSTING_LINK.search(link):
+                continue
+            if len(title) >= MIN_TITLE_CHARS:
+                seen.add(link)
+                jobs.append(self._job(title.split("\n")[0][:100], link, source))
+        return jobs
+
+    def _cards_jsonld_html(self, soup, url, source):
+        return self._jsonld_jobs(jsonld_blobs(soup), url, source)
+
+    def _cards_dom_html(self, soup, url, source):
+        selectors = board_selectors(url)
+        if "card" not in selectors:
+            return []
+        jobs, seen = [], set()
+        for card in soup.select(selectors["card"]):
+            title = card.select_one(selectors["title"])
+            link = card if card.name == "a" and card.get("href") else card.select_one("a[href]")
+            company = card.select_one(selectors["company"]) if selectors.get("company") else None
+            ids = {}
+            for el in [card] + card.select(",".join(f"[{attr}]" for attr in CARD_ID_ATTRIBUTES)):
+                for attr in CARD_ID_ATTRIBUTES:
+                    if attr not in ids and el.get(attr):
+                        ids[attr] = el[attr]
+            fields = {"href": urljoin(url, link["href"]) if link else None, "ids": ids}
+            title_text = (title or link or card).get_text(" ", strip=True)
+            link = card_link(url, fields)
+            if link and link not in seen and len(title_text) >= MIN_TITLE_CHARS:
+                seen.add(link)
+                jobs.append(self._job(title_text[:100], link, source,
+                                      company.get_text(" ", strip=True) if company else None, ids))
+        return jobs
+
+    def _cards_links_html(self, soup, url, source):
+        jobs, seen = [], set()
+        for anchor in soup.select("a[href]"):
+            link, title = urljoin(url, anchor["href"]), anchor.get_text(" ", strip=True)
+            if link in seen or not POSTING_LINK.search(link):
+                continue
+            if len(title) >= MIN_TITLE_CHARS:
+                seen.add(link)
+                jobs.append(self._job(title[:100], link, source))
+        return jobs
+
+    @staticmethod
+    def _job(title, link, source, company=None, ids=None):
+        job = {"title": title, "link": link, "source": source}
+        if company:
+            job["company"] = company
+        if ids:
+            job["job_id"] = next(iter(ids.values()))
+        return job
+
+    # Postings
+
+    def description(self, driver, url, fallback=None):
+        """
+        Description text of the posting the driver is showing, or None.
+        fallback(driver, url) is only called when no structured tier finds enough text.
+        """
+        for tier, method in (("jsonld", self._description_jsonld), ("dom", self._description_dom),
+                             ("readability", self._description_readable)):
+            try:
+                text = method(driver, url)
+            except Exception as e:
+                log(f"Warning: {tier} description extraction failed on {url}: {e}")
+                text = None
+            if text and len(text) >= self.min_description_chars:
+                log(f"Success: Extracted description from {url} via {tier} ({len(text)} chars)")
+                self._count("description", tier)
+                return text
+        if fallback is not None:
+            text = fallback(driver, url)
+            if text:
+                self._count("description", "fallback")
+                return text
+        self._count("description", "failed")
+        return None
+
+    def description_html(self, html, url):
+        """description() for a page fetched without a browser: the same tiers on the raw HTML, no fallback."""
+        soup = parse_html(html)
+        for tier, method in (("jsonld", lambda: self._jsonld_description(jsonld_blobs(soup))),
+                             ("dom", lambda: self._description_dom_html(soup, url)),
+                             ("readability", lambda: readable_text(html))):
+            try:
+                text = method()
+            except Exception as e:
+                log(f"Warning: {tier} description extraction failed on {url}: {e}")
+                text = None
+            if text and len(text) >= self.min_description_chars:
+                log(f"Success: Extracted description from {url} via {tier} over HTTP ({len(text)} chars)")
+                self._count("description", tier)
+                return text
+        return None
+
+    def _description_jsonld(self, driver, url):
+        return self._jsonld_description(driver.execute_script(_JSONLD_SCRIPT) or [])
+
+    @staticmethod
+    def _jsonld_description(blobs):
+        for posting in job_postings(blobs):
+            if posting.get("description"):
+                return html_to_text(posting["description"])
+        return None
+
+    @staticmethod
+    def _description_dom_html(soup, url):
+        for selector in filter(None, (board_selectors(url).get("description"), GENERIC_DESCRIPTION)):
+            text = "\n".join(t for t in (el.get_text("\n", strip=True) for el in soup.select(selector)) if t)
+            if text:
+                return text
+        return None
+
+    def _description_dom(self, driver, url):
+        for selector in filter(None, (board_selectors(url).get("description"), GENERIC_DESCRIPTION)):
+            texts = [el.text.strip() for el in driver.find_elements(By.CSS_SELECTOR, selector)]
+            text = "\n".join(t for t in texts if t)
+            if text:
+                return text
+        return None
+
+    def _description_readable(self, driver, url):
+        return readable_text(driver.page_source)
+
+    def report(self):
+        for kind, counts in self.counts.items():
+            total = sum(counts.values())
+            if not total:
+                continue
+            avoided = total - counts["fallback"] - counts["failed"]
+            tiers = ", ".join(f"{tier} {counts[tier]}" for tier in TIERS + ("failed",))
+            print(f"Extraction ({kind}): {tiers}; fallback avoided on {avoided}/{total}")
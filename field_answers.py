@@ -0,0 +1,306 @@
+import os
+import re
+import json
+import time
+import sqlite3
+import difflib
+import threading
+
+STORE_PATH = os.getenv("FIELD_ANSWERS_PATH", "field_answers.sqlite3")
+# Similarity (0-1) a stored label needs to answer a differently worded field (see similarity())
+FUZZY_THRESHOLD = float(os.getenv("FIELD_FUZZY_THRESHOLD", "0.82"))
+SENSITIVE = ["ssn", "social security", "password", "credit card", "bank account"]
+
+# Labels answered straight from the profile; normalized like any other label
+PROFILE_LABELS = {
+    "first name": lambda p: p["name"].split()[0],
+    "given name": lambda p: p["name"].split()[0],
+    "last name": lambda p: p["name"].split()[-1],
+    "surname": lambda p: p["name"].split()[-1],
+    "family name": lambda p: p["name"].split()[-1],
+    "full name": lambda p: p["name"],
+    "name": lambda p: p["name"],
+    "email": lambda p: p["email"],
+    "email address": lambda p: p["email"],
+    "phone": lambda p: p["phone"],
+    "phone number": lambda p: p["phone"],
+    "mobile number": lambda p: p["phone"],
+    "linkedin": lambda p: p["linkedin"],
+    "linkedin profile url": lambda p: p["linkedin"],
+    "github": lambda p: p["github"],
+    "website": lambda p: p["website"],
+    "portfolio url": lambda p: p["website"],
+    "location": lambda p: p["location"],
+    "city": lambda p: p["location"],
+}
+
+INSTRUCTIONS = (
+    "You are a job application assistant filling in an application form as the candidate above. "
+    "Answer every field briefly, the way it would be typed into the form (a number for numeric "
+    "questions, Yes/No for yes/no questions). Set 'reusable' to true when the answer doesn't depend "
+    'on this particular job or company. Reply with JSON only: {"answers": [{"id": <field id>, '
+    '"answer": "...", "reusable": true/false}]}, one entry per field.'
+)
+
+# Everything a person or a model would read to know what a field asks, in one round trip
+_FIELDS_SCRIPT = """
+const text = node => node ? node.textContent.replace(/\\s+/g, ' ').trim() : '';
+return arguments[0].map(xpath => {
+    try {
+        const el = document.evaluate(xpath, document, null, XPathResult.FIRST_ORDERED_NODE_TYPE, null).singleNodeValue;
+        if (!el || el.nodeType !== 1) return null;
+        let label = '';
+        if (el.id) label = text(document.querySelector('label[for="' + CSS.escape(el.id) + '"]'));
+        if (!label && el.getAttribute('aria-labelledby'))
+            label = el.getAttribute('aria-labelledby').split(' ').map(id => text(document.getElementById(id))).join(' ');
+        if (!label) label = el.getAttribute('aria-label') || text(el.closest('label'));
+        if (!label) {
+            // Question text just before the field, e.g. <div>Question</div><input>
+            let prev = el.previousElementSibling || (el.parentElement && el.parentElement.previousElementSibling);
+            label = text(prev).slice(0, 200);
+        }
+        const options = el.tagName === 'SELECT' ? Array.from(el.options).map(o => text(o)).filter(Boolean) : [];
+        return {label: label, placeholder: el.getAttribute('placeholder') || '', name: el.getAttribute('name') || '',
+                id: el.id || '', tag: el.tagName.toLowerCase(), type: el.getAttribute('type') || '', options: options};
+    } catch (e) {
+        return null;
+    }
+});
+"""
+
+# @id='first_name' and contains(@id, 'first_name') alike
+_XPATH_ATTRIBUTE = re.compile(r"@(?:id|name|placeholder|aria-label)\s*[=,]\s*['\"]([^'\"]+)['\"]")
+
+def normalize_label(text):
+    """Lower-case words of a label: "First_Name *" and "first-name (required)" both become "first name"."""
+    text = re.sub(r"([a-z])([A-Z])", r"\1 \2", text or "")  # firstName -> first Name
+    text = re.sub(r"\((?:required|optional)\)|\*", " ", text.lower())
+    return " ".join(re.sub(r"[^a-z0-9+#]+", " ", text).split())
+
+# Question phrasing that doesn't change what a field asks for
+_FILLER = set("""
+a an the of with in on to for at by and or is are do does did you your have has please enter provide
+what which how many much who when where will would can could if this that
+""".split())
+# Content words that only reword a question ("Years of Python experience" / "How many years
+# have you worked with Python"); every other word (a technology, country, currency, number,
+# first/last, expected/current...) names what is asked and must be the same in both labels
+_WORDING = set("""
+year experience experienced work worked working professional total number level proficiency
+hand using use used long describe tell
+""".split())
+
+def content_words(label):
+    """Non-filler words of a normalized label, plurals folded ("years" -> "year")."""
+    return {word[:-1] if len(word) > 3 and word.endswith("s") and not word.endswith("ss") else word
+            for word in label.split()} - _FILLER
+
+def similarity(a, b):
+    """
+    1.0 for labels that differ only in wording ("Years of Python experience" /
+    "Python experience (years)"), 0.0 as soon as a word that names what is
+    asked differs ("Years of SQL experience" / "Years of C# experience").
+    Labels made of wording words alone fall back to character similarity.
+    """
+    words_a, words_b = content_words(a), content_words(b)
+    if (words_a ^ words_b) - _WORDING:
+        return 0.0
+    if words_a - _WORDING:
+        return 1.0
+    return difflib.SequenceMatcher(None, a, b).ratio()
+
+def field_keys(field):
+    """
+    Normalized labels a field could be known by: its visible label and placeholder,
+    or, only when it has neither, its name and id (a "Company name" field is often
+    just name="name").
+    """
+    keys = []
+    visible = [field.get("label"), field.get("placeholder")]
+    for value in visible if any(visible) else [field.get("name"), field.get("id")]:
+        key = normalize_label(value)
+        if key and key not in keys:
+            keys.append(key)
+    return keys
+
+def is_sensitive(field):
+    text = " ".join(field_keys(field))
+    return any(keyword in text for keyword in SENSITIVE)
+
+class FieldAnswers:
+    """
+    Form-field knowledge base: normalized field label -> answer, persisted in
+    SQLite. A field is looked up by its label, placeholder, name and id, first
+    exactly, then by a stored label that differs only in wording; contact
+    fields come straight from the profile. All fields of a form that are still
+    unknown go to the LLM in one batched call, and its answers that don't
+    depend on the job are written back, so the "Years of Python experience"
+    field costs one LLM call ever rather than one per application. Sensitive
+    fields are never stored or sent to the LLM.
+    """
+
+    def __init__(self, profile, gateway=None, prompts=None, ask=None, path=STORE_PATH,
+                 threshold=FUZZY_THRESHOLD, endpoint="essay"):
+        self.profile = profile
+        self.gateway = gateway
+        self.prompts = prompts
+        self.ask = ask  # ask(question) -> answer, for sensitive fields and LLM failures
+        self.threshold = threshold
+        self.endpoint = endpoint
+        self.stats = {"fields": 0, "profile": 0, "exact": 0, "fuzzy": 0, "llm": 0, "asked": 0, "sensitive": 0,
+                      "llm_calls": 0}
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute("""
+            CREATE TABLE IF NOT EXISTS answers (
+                label TEXT PRIMARY KEY,
+                answer TEXT NOT NULL,
+                source TEXT NOT NULL,
+                uses INTEGER NOT NULL DEFAULT 0,
+                updated REAL NOT NULL
+            )
+        """)
+        self._conn.commit()
+        self.answers = dict(self._conn.execute("SELECT label, answer FROM answers"))
+        self.profile_answers = {}
+        for label, value in PROFILE_LABELS.items():
+            try:
+                answer = value(profile)
+            except (KeyError, IndexError, AttributeError):
+                continue
+            if answer:  # An empty profile entry (e.g. no LinkedIn) leaves the field to the store or the LLM
+                self.profile_answers[normalize_label(label)] = answer
+
+    def describe(self, driver, xpaths):
+        """Label, placeholder, name, id, tag, type and options of each field, read in one script."""
+        found = driver.execute_script(_FIELDS_SCRIPT, list(xpaths)) or []
+        fields = []
+        for xpath, field in zip(xpaths, found + [None] * (len(xpaths) - len(found))):
+            if field is None:
+                # Not resolvable now; the XPath itself often names the field (@id='first_name')
+                attributes = _XPATH_ATTRIBUTE.findall(xpath)
+                field = {"label": attributes[0] if attributes else "", "name": " ".join(attributes[1:])}
+            fields.append(dict(field, xpath=xpath))
+        return fields
+
+    def lookup(self, field):
+        """(answer, how) from the profile or the store, or (None, None) if the field is unknown."""
+        keys = field_keys(field)
+        for key in keys:
+            if key in self.profile_answers:
+                return self.profile_answers[key], "profile"
+        with self._lock:
+            for key in keys:
+                if key in self.answers:
+                    return self.answers[key], "exact"
+            best, best_score = None, self.threshold
+            for key in keys:
+                for known in list(self.profile_answers) + list(self.answers):
+                    score = similarity(key, known)
+                    if score >= best_score:
+                        best, best_score = known, score
+        if best is None:
+            return None, None
+        return self.profile_answers.get(best, self.answers.get(best)), "fuzzy"
+
+    def remember(self, field, answer, source):
+        keys = field_keys(field)
+        if not keys or not answer or is_sensitive(field):
+            return
+        with self._lock:
+            self.answers[keys[0]] = answer
+            self._conn.execute("INSERT OR REPLACE INTO answers (label, answer, source, uses, updated) "
+                               "VALUES (?, ?, ?, 0, ?)", (keys[0], answer, source, time.time()))
+            self._conn.commit()
+
+    def _used(self, field):
+        keys = field_keys(field)
+        with self._lock:
+            self._conn.executemany("UPDATE answers SET uses = uses + 1 WHERE label = ?", [(k,) for k in keys])
+            self._conn.commit()
+
+    def _question(self, field):
+        parts = [field.get("label") or field.get("placeholder") or field.get("name") or field.get("xpath", "")]
+        if field.get("options"):
+            parts.append(f"options: {', '.join(field['options'][:20])}")
+        return " | ".join(parts)
+
+    def _ask_llm(self, fields):
+        """One batched call for all unknown fields; {index: (answer, reusable)} for the ones it answered."""
+        if not fields or self.gateway is None:
+            return {}
+        content = "Fields:\n" + "\n".join(f"[{i}] {self._question(field)}" for i, field in enumerate(fields))
+        with self._lock:
+            self.stats["llm_calls"] += 1
+        try:
+            reply = self.gateway.call(self.endpoint, self.prompts.messages("essay", INSTRUCTIONS, content))
+            match = re.search(r"\{.*\}", reply or "", re.DOTALL)
+            entries = json.loads(match.group(0)).get("answers", []) if match else []
+        except Exception as e:
+            print(f"Field answers: LLM call failed: {e}")
+            return {}
+        answers = {}
+        for entry in entries:
+            try:
+                index = int(entry["id"])
+            except (KeyError, TypeError, ValueError):
+                continue
+            if 0 <= index < len(fields) and str(entry.get("answer", "")).strip():
+                answers[index] = (str(entry["answer"]).strip(), bool(entry.get("reusable")))
+        return answers
+
+    def answer_all(self, fields):
+        """One answer per field (None if nobody could answer), with at most one LLM call for the form."""
+        answers = [None] * len(fields)
+        unknown = []
+        for i, field in enumerate(fields):
+            if is_sensitive(field):
+                with self._lock:
+                    self.stats["sensitive"] += 1
+                continue
+            answer, how = self.lookup(field)
+            if answer is None:
+                unknown.append(i)
+                continue
+            answers[i] = answer
+            with self._lock:
+                self.stats[how] += 1
+            if how != "profile":
+                self._used(field)
+
+        generated = self._ask_llm([fields[i] for i in unknown])
+        for position, i in enumerate(unknown):
+            if position in generated:
+                answers[i], reusable = generated[position]
+                with self._lock:
+                    self.stats["llm"] += 1
+                if reusable:
+                    self.remember(fields[i], answers[i], "llm")
+
+        for i, field in enumerate(fields):
+            if answers[i] is None and self.ask is not None:
+                answer = self.ask(self._question(field))
+                if answer and answer != "Skipped by user":
+                    answers[i] = answer
+                    self.remember(field, answer, "user")
+                with self._lock:
+                    self.stats["asked"] += 1
+        with self._lock:
+            self.stats["fields"] += len(fields)
+        return answers
+
+    def report(self):
+        stats = self.stats
+        if not stats["fields"]:
+            return
+        known = stats["profile"] + stats["exact"] + stats["fuzzy"]
+        # Without the store every field but contact details and sensitive ones cost an LLM call
+        avoided = stats["fields"] - stats["profile"] - stats["sensitive"] - stats["llm_calls"]
+        print(f"Field answers: {stats['fields']} fields, {known} answered from the store "
+              f"({stats['profile']} profile, {stats['exact']} exact, {stats['fuzzy']} fuzzy), "
+              f"{stats['llm']} by the LLM in {stats['llm_calls']} calls, {stats['asked']} asked; "
+              f"{avoided} LLM calls avoided")
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
@@ -0,0 +1,188 @@
+import os
+import re
+import json
+import time
+import sqlite3
+import hashlib
+import threading
+from urllib.parse import urlparse
+from tracing import log
+
+STORE_PATH = os.getenv("FLOW_STORE_PATH", "application_flows.sqlite3")
+# A recorded flow that failed this many applications in a row is recorded afresh
+MAX_FAILURES = 2
+CONFIRMATIONS = ["application submitted", "application has been submitted", "thank you for applying",
+                 "thanks for applying", "application received", "you applied", "successfully applied"]
+
+# Form controls and buttons of the page, without anything posting-specific: two
+# postings on the same ATS produce the same signature. Generated ids lose their digits.
+_SIGNATURE_SCRIPT = """
+const parts = new Set();
+for (const el of document.querySelectorAll('input, select, textarea, button, [role=button]')) {
+    if (el.type === 'hidden') continue;
+    const key = (el.getAttribute('name') || el.id || '').replace(/[0-9]+/g, '#');
+    const label = el.tagName === 'BUTTON' || el.getAttribute('role') === 'button'
+        ? el.textContent.replace(/\\s+/g, ' ').trim().toLowerCase().slice(0, 40) : '';
+    parts.add([el.tagName.toLowerCase(), el.getAttribute('type') || '', key, label].join(':'));
+}
+return Array.from(parts).sort();
+"""
+
+_EXISTS_SCRIPT = """
+return arguments[0].map(xpath => {
+    try {
+        return !!document.evaluate(xpath, document, null, XPathResult.FIRST_ORDERED_NODE_TYPE, null).singleNodeValue;
+    } catch (e) {
+        return false;
+    }
+});
+"""
+
+def ats_domain(url):
+    """Host without "www."; the ATS family is what matters, e.g. boards.greenhouse.io or acme.wd5.myworkdayjobs.com."""
+    host = (urlparse(url).hostname or "").lower()
+    host = host[4:] if host.startswith("www.") else host
+    # Workday puts the tenant in the host; the flow is the same for every tenant
+    return re.sub(r"^[^.]+\.(wd\d+\.myworkdayjobs\.com)$", r"\1", host)
+
+def fingerprint(driver):
+    """ATS fingerprint of the page a driver shows: domain + hash of its form-control signature."""
+    signature = driver.execute_script(_SIGNATURE_SCRIPT) or []
+    digest = hashlib.sha1("\n".join(signature).encode("utf-8")).hexdigest()[:12]
+    return f"{ats_domain(driver.current_url)}|{digest}"
+
+def plan_xpaths(plan):
+    xpaths = [field.get("xpath") for field in plan.get("inputs", []) + plan.get("file_inputs", [])]
+    if plan.get("button"):
+        xpaths.append(plan["button"].get("xpath"))
+    return [xpath for xpath in xpaths if xpath]
+
+def confirmed(driver):
+    """Whether the page text says the application went through; no screenshot or LLM needed."""
+    try:
+        text = (driver.execute_script("return document.body ? document.body.innerText : ''") or "").lower()
+    except Exception:
+        return False
+    return any(phrase in text for phrase in CONFIRMATIONS)
+
+class FlowRecorder:
+    """
+    Records the action plans (inputs, file_inputs, button, complete) of each
+    application and stores the sequence once it succeeds, keyed by the ATS
+    fingerprint of the page the application started on. A later application
+    starting on a page with the same fingerprint replays the recorded steps:
+    each step is used only if all of its elements exist on the current page (a
+    "complete" step only if the page shows a confirmation), and the first step
+    that doesn't fit hands control back to the vision planner for the rest of
+    that application. Field values are never recorded; they come from the
+    field-answer store and the profile as usual.
+    """
+
+    def __init__(self, path=STORE_PATH):
+        self.stats = {"applications": 0, "replayed": 0, "replayed_steps": 0, "vision_steps": 0,
+                      "diverged": 0, "recorded": 0}
+        self._lock = threading.Lock()
+        self._runs = {}  # job_link -> state of the application in progress
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute("""
+            CREATE TABLE IF NOT EXISTS flows (
+                fingerprint TEXT PRIMARY KEY,
+                steps TEXT NOT NULL,
+                successes INTEGER NOT NULL,
+                failures INTEGER NOT NULL,
+                updated REAL NOT NULL
+            )
+        """)
+        self._conn.commit()
+
+    def begin(self, job_link, driver):
+        """Fingerprint the application's first page and load its recorded flow, if any."""
+        try:
+            key = fingerprint(driver)
+        except Exception as e:
+            log(f"Warning: Flow replay could not fingerprint the page, not recording this application: {e}")
+            return False
+        with self._lock:
+            row = self._conn.execute("SELECT steps, failures FROM flows WHERE fingerprint = ?", (key,)).fetchone()
+            steps = json.loads(row[0]) if row and row[1] < MAX_FAILURES else None
+            self._runs[job_link] = {"fingerprint": key, "steps": steps, "position": 0, "diverged": False,
+                                    "recorded": [], "replayed": 0}
+            self.stats["applications"] += 1
+            if steps:
+                self.stats["replayed"] += 1
+        return steps is not None
+
+    def replay(self, job_link, driver):
+        """The recorded plan for the next step if its elements are all on the page, else None."""
+        run = self._runs.get(job_link)
+        if not run or not run["steps"] or run["diverged"] or run["position"] >= len(run["steps"]):
+            return None
+        plan = run["steps"][run["position"]]
+        xpaths = plan_xpaths(plan)
+        if plan.get("complete"):
+            fits = confirmed(driver)
+        elif not xpaths:
+            fits = False
+        else:
+            try:
+                fits = all(driver.execute_script(_EXISTS_SCRIPT, xpaths) or [False])
+            except Exception:
+                fits = False
+        if not fits:
+            log(f"Warning: Flow replay step {run['position'] + 1} no longer matches the page, handing over to vision")
+            run["diverged"] = True
+            with self._lock:
+                self.stats["diverged"] += 1
+            return None
+        run["position"] += 1
+        run["replayed"] += 1
+        with self._lock:
+            self.stats["replayed_steps"] += 1
+        return plan
+
+    def record(self, job_link, plan, replayed=False):
+        """Remember a step's plan (without anything the LLM said beyond the actions)."""
+        run = self._runs.get(job_link)
+        if run is None:
+            return
+        run["recorded"].append({
+            "inputs": [{"xpath": f.get("xpath"), "type": f.get("type", "text")} for f in plan.get("inputs", [])],
+            "file_inputs": [{"xpath": f.get("xpath")} for f in plan.get("file_inputs", [])],
+            "button": ({"xpath": plan["button"].get("xpath"), "text": plan["button"].get("text")}
+                       if plan.get("button") else None),
+            "complete": bool(plan.get("complete")),
+        })
+        if not replayed:
+            with self._lock:
+                self.stats["vision_steps"] += 1
+
+    def finish(self, job_link, success):
+        """Store the flow of a successful application; count a failure against a replayed one."""
+        run = self._runs.pop(job_link, None)
+        if run is None:
+            return
+        with self._lock:
+            if success and run["recorded"]:
+                # Replaces the stored flow when replay diverged and vision found the new path
+                self._conn.execute(
+                    "INSERT INTO flows (fingerprint, steps, successes, failures, updated) VALUES (?, ?, 1, 0, ?) "
+                    "ON CONFLICT(fingerprint) DO UPDATE SET steps = excluded.steps, "
+                    "successes = successes + 1, failures = 0, updated = excluded.updated",
+                    (run["fingerprint"], json.dumps(run["recorded"]), time.time()))
+                if run["replayed"] < len(run["recorded"]):
+                    self.stats["recorded"] += 1
+            elif not success and run["steps"]:
+                self._conn.execute("UPDATE flows SET failures = failures + 1 WHERE fingerprint = ?",
+                                   (run["fingerprint"],))
+            self._conn.commit()
+
+    def report(self):
+        stats = self.stats
+        if stats["applications"]:
+            print(f"Application flows: {stats['replayed']}/{stats['applications']} applications started on a known "
+                  f"flow, {stats['replayed_steps']} steps replayed, {stats['vision_steps']} planned by vision "
+                  f"({stats['diverged']} divergences), {stats['recorded']} flows recorded or updated")
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
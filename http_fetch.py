@@ -0,0 +1,157 @@
+import os
+import time
+import threading
+from page_ready import domain_of, fetch_url
+from politeness import is_challenge
+from posting_snapshot import PostingSnapshot
+from tracing import log
+
+HTTP_TIMEOUT = float(os.getenv("HTTP_TIMEOUT", "15"))
+POOL_SIZE = int(os.getenv("HTTP_POOL_SIZE", "10"))  # Keep-alive connections per host
+USER_AGENT = ("Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) "
+              "Chrome/124.0.0.0 Safari/537.36")
+
+# What each board's pages need: "http" pages are rendered server-side and can be
+# read from the raw HTML, "browser" pages only have content after JavaScript runs.
+# Postings on boards not listed here are tried over HTTP first.
+BOARD_CAPABILITIES = {
+    "indeed.com": {"search": "http", "posting": "http"},
+    "linkedin.com": {"search": "http", "posting": "http"},  # Guest pages
+    "glassdoor.com": {"search": "browser", "posting": "browser"},
+    "x.com": {"search": "browser", "posting": "browser"},
+    "greenhouse.io": {"posting": "http"},
+    "lever.co": {"posting": "http"},
+    "myworkdayjobs.com": {"posting": "browser"},
+}
+DEFAULT_CAPABILITIES = {"search": "browser", "posting": "http"}
+
+def capability(url, kind):
+    """"http" or "browser": how a search (kind="search") or posting (kind="posting") page at url must be read."""
+    domain = domain_of(url)
+    for board, capabilities in BOARD_CAPABILITIES.items():
+        if domain == board or domain.endswith("." + board):
+            return capabilities.get(kind, DEFAULT_CAPABILITIES[kind])
+    return DEFAULT_CAPABILITIES[kind]
+
+def _accept_encoding():
+    try:
+        import brotli  # noqa: F401 -- urllib3 and httpx decode br once it is installed
+        return "gzip, deflate, br"
+    except ImportError:
+        return "gzip, deflate"
+
+class HttpFetcher:
+    """
+    Plain-HTTP fast path for pages that render server-side: one pooled
+    keep-alive client for every thread (httpx with HTTP/2 when httpx[http2] is
+    installed, a requests.Session otherwise), compressed transfers, and the
+    extraction tiers run on the raw HTML. Pages whose board needs JavaScript,
+    fetches that fail or come back blocked, and pages the tiers find nothing
+    on return None, and the caller loads them in Chrome as before. With
+    `politeness` every fetch waits for its host's turn and reports back how
+    the host answered.
+    """
+
+    def __init__(self, pool_size=POOL_SIZE, timeout=HTTP_TIMEOUT, http2=True, politeness=None):
+        self.politeness = politeness
+        self.pool_size = pool_size
+        self.timeout = timeout
+        self.http2 = http2
+        self.stats = {"fetched": 0, "failed": 0, "bytes": 0, "seconds": 0.0, "http": 0, "browser": 0}
+        self._client = None
+        self._lock = threading.Lock()
+
+    def _count(self, key, n=1):
+        with self._lock:
+            self.stats[key] += n
+
+    def client(self):
+        with self._lock:
+            if self._client is None:
+                headers = {"User-Agent": USER_AGENT, "Accept-Encoding": _accept_encoding(),
+                           "Accept": "text/html,application/xhtml+xml,application/xml;q=0.9,*/*;q=0.8",
+                           "Accept-Language": "en-US,en;q=0.9"}
+                try:
+                    import httpx
+                    import h2  # noqa: F401 -- httpx only speaks HTTP/2 with it
+                    if not self.http2:
+                        raise ImportError
+                    self._client = httpx.Client(http2=True, headers=headers, follow_redirects=True,
+                                                timeout=self.timeout,
+                                                limits=httpx.Limits(max_keepalive_connections=self.pool_size))
+                except ImportError:
+                    import requests
+                    from requests.adapters import HTTPAdapter
+                    session = requests.Session()
+                    adapter = HTTPAdapter(pool_connections=self.pool_size, pool_maxsize=self.pool_size)
+                    session.mount("https://", adapter)
+                    session.mount("http://", adapter)
+                    session.headers.update(headers)
+                    self._client = session
+            return self._client
+
+    def get(self, url):
+        """(final URL, HTML) of a page, or None if it could not be fetched or was blocked."""
+        client = self.client()
+        if self.politeness is not None:
+            self.politeness.acquire(url)
+        started = time.perf_counter()
+        try:
+            response = client.get(fetch_url(url), timeout=self.timeout)
+        except Exception as e:  # requests and httpx raise different exception trees
+            log(f"Warning: HTTP fetch failed for {url}: {e}")
+            self._count("failed")
+            return None
+        finally:
+            self._count("seconds", time.perf_counter() - started)
+        challenged = is_challenge(html=response.text)
+        if self.politeness is not None:
+            self.politeness.observe(url, response.status_code, response.headers.get("retry-after"),
+                                    challenged=challenged)
+        if challenged or response.status_code != 200 or \
+                "html" not in response.headers.get("content-type", "html"):
+            # 403/429 and captcha pages are bot walls; Chrome gets a chance at those
+            self._count("failed")
+            return None
+        self._count("fetched")
+        self._count("bytes", len(response.content))
+        return str(response.url), response.text
+
+    def cards(self, url, source, extractor):
+        """Job dicts from a server-rendered search page, or None if it needs the browser."""
+        if capability(url, "search") != "http":
+            self._count("browser")
+            return None
+        page = self.get(url)
+        jobs = extractor.cards_html(page[1], page[0], source) if page else []
+        self._count("http" if jobs else "browser")
+        return jobs or None
+
+    def snapshot(self, url, extractor):
+        """PostingSnapshot of a server-rendered posting, or None if it needs the browser."""
+        if capability(url, "posting") != "http":
+            self._count("browser")
+            return None
+        page = self.get(url)
+        description = extractor.description_html(page[1], page[0]) if page else None
+        if not description:
+            self._count("browser")
+            return None
+        self._count("http")
+        from extractors import html_to_text
+        return PostingSnapshot(url=url, final_url=page[0], dom_text=html_to_text(page[1]), description=description)
+
+    def report(self):
+        stats = self.stats
+        if not stats["fetched"] + stats["failed"]:
+            return
+        average = stats["seconds"] / (stats["fetched"] + stats["failed"])
+        print(f"HTTP fast path: {stats['http']} pages read without a browser, {stats['browser']} sent to Chrome; "
+              f"{stats['fetched']} fetches ({stats['failed']} failed), {stats['bytes'] / 1e6:.1f} MB, "
+              f"{average * 1000:.0f} ms average")
+
+    def close(self):
+        with self._lock:
+            if self._client is not None:
+                self._client.close()
+                self._client = None
@@ -0,0 +1,194 @@
+import io
+import os
+import base64
+import threading
+from dataclasses import dataclass
+from tracing import log
+
+# Screenshots go to the vision model downscaled, cropped and re-encoded.
+# A 1280px JPEG at quality 60 keeps form labels and job titles legible
+# at roughly a tenth of the bytes of Chrome's full-viewport PNG.
+MAX_WIDTH = int(os.getenv("VISION_MAX_WIDTH", "1280"))
+IMAGE_FORMAT = os.getenv("VISION_IMAGE_FORMAT", "JPEG").upper()  # JPEG or WEBP
+IMAGE_QUALITY = int(os.getenv("VISION_IMAGE_QUALITY", "60"))
+# Frames whose perceptual hashes differ in at most this many of 1024 bits count as unchanged
+FRAME_DISTANCE = int(os.getenv("VISION_FRAME_DISTANCE", "8"))
+
+MIME_TYPES = {"PNG": "image/png", "JPEG": "image/jpeg", "WEBP": "image/webp"}
+
+# What the model actually needs to see on each kind of page; the first
+# selector group with visible matches decides the crop
+REGION_SELECTORS = {
+    "search": [
+        "[data-testid='jobcard'], .job_seen_beacon, [data-test='jobListing'], .base-card, [data-testid='tweet']",
+        "#mosaic-jobResults, [data-test='JobsList'], .jobs-search__results-list, main",
+    ],
+    "posting": [
+        "#jobDescriptionText, .jobsearch-JobDescriptionSection, [class*='JobDetails_jobDescription'], "
+        ".show-more-less-html__markup, [data-automation-id='jobPostingDescription'], .posting-page",
+        "main, [role='main']",
+    ],
+    "application": [
+        "form, [role='dialog'], #application, .application-form",
+        "main, [role='main']",
+    ],
+}
+MIN_REGION_FRACTION = 0.1  # Smaller crops are probably a stray match; send the whole viewport
+REGION_PADDING = 16  # CSS pixels kept around the content box
+
+# Union of the visible boxes matching the first selector group that matches anything,
+# clipped to the viewport, in screenshot pixels
+_REGION_SCRIPT = """
+const groups = arguments[0], pad = arguments[1];
+const vw = window.innerWidth, vh = window.innerHeight, ratio = window.devicePixelRatio || 1;
+for (const selector of groups) {
+    let left = vw, top = vh, right = 0, bottom = 0, found = false;
+    for (const el of document.querySelectorAll(selector)) {
+        const r = el.getBoundingClientRect();
+        if (r.width < 1 || r.height < 1 || r.bottom < 0 || r.top > vh || r.right < 0 || r.left > vw) continue;
+        left = Math.min(left, r.left); top = Math.min(top, r.top);
+        right = Math.max(right, r.right); bottom = Math.max(bottom, r.bottom);
+        found = true;
+    }
+    if (found) {
+        return [Math.max(0, left - pad) * ratio, Math.max(0, top - pad) * ratio,
+                Math.min(vw, right + pad) * ratio, Math.min(vh, bottom + pad) * ratio];
+    }
+}
+return null;
+"""
+
+def content_region(driver, kind):
+    """Bounding box (left, top, right, bottom) of the main content for this kind of page, or None."""
+    groups = REGION_SELECTORS.get(kind)
+    if not groups:
+        return None
+    try:
+        box = driver.execute_script(_REGION_SCRIPT, groups, REGION_PADDING)
+    except Exception as e:
+        log(f"Warning: Could not locate {kind} content region: {e}")
+        return None
+    return tuple(int(v) for v in box) if box else None
+
+def perceptual_hash(image, size=32):
+    """1024-bit difference hash: compares neighbouring cells of a 33x32 grayscale thumbnail."""
+    from PIL import Image
+    pixels = list(image.convert("L").resize((size + 1, size), Image.BILINEAR).getdata())
+    bits = 0
+    for row in range(size):
+        offset = row * (size + 1)
+        for col in range(size):
+            bits = (bits << 1) | (pixels[offset + col] > pixels[offset + col + 1])
+    return bits
+
+def hash_distance(a, b):
+    return bin(a ^ b).count("1")
+
+@dataclass
+class PreparedImage:
+    """A screenshot ready to inline into a vision prompt."""
+    data: str  # base64
+    mime: str
+    size: int  # encoded bytes
+    original_size: int
+    phash: int = None
+    region: tuple = None
+
+    @property
+    def data_url(self):
+        return f"data:{self.mime};base64,{self.data}"
+
+class ScreenshotPrep:
+    """
+    Shrinks screenshots before they are sent to the vision model: crops to the
+    content region, downscales to max_width and re-encodes as JPEG/WebP.
+    Also remembers the last frame (and the model's reply to it) per channel, so a
+    page that did not visibly change is not sent again. Without Pillow installed,
+    screenshots pass through as PNG unchanged.
+    """
+
+    def __init__(self, max_width=MAX_WIDTH, image_format=IMAGE_FORMAT, quality=IMAGE_QUALITY,
+                 frame_distance=FRAME_DISTANCE):
+        self.max_width = max_width
+        self.image_format = image_format if image_format in ("JPEG", "WEBP") else "JPEG"
+        self.quality = quality
+        self.frame_distance = frame_distance
+        self.enabled = True
+        self.prepared = 0
+        self.skipped = 0
+        self.bytes_in = 0
+        self.bytes_out = 0
+        self._frames = {}  # channel -> (phash, reply)
+        self._lock = threading.Lock()
+
+    def prepare(self, screenshot, region=None):
+        """PreparedImage for a base64 PNG screenshot, cropped to `region` if it is big enough."""
+        raw = base64.b64decode(screenshot)
+        if self.enabled:
+            try:
+                from PIL import Image
+            except ImportError:
+                print("Warning: Pillow is not installed, sending screenshots as full PNGs")
+                self.enabled = False
+        if not self.enabled:
+            self._count(len(raw), len(raw))
+            return PreparedImage(screenshot, MIME_TYPES["PNG"], len(raw), len(raw))
+
+        image = Image.open(io.BytesIO(raw))
+        image.load()
+        if region:
+            left, top, right, bottom = region
+            right, bottom = min(right, image.width), min(bottom, image.height)
+            if (right - left) * (bottom - top) >= MIN_REGION_FRACTION * image.width * image.height:
+                image = image.crop((left, top, right, bottom))
+            else:
+                region = None
+        if image.width > self.max_width:
+            height = max(1, round(image.height * self.max_width / image.width))
+            image = image.resize((self.max_width, height), Image.LANCZOS)
+        buffer = io.BytesIO()
+        image.convert("RGB").save(buffer, format=self.image_format, quality=self.quality, optimize=True)
+        encoded = buffer.getvalue()
+        self._count(len(raw), len(encoded))
+        return PreparedImage(
+            data=base64.b64encode(encoded).decode("ascii"),
+            mime=MIME_TYPES[self.image_format],
+            size=len(encoded),
+            original_size=len(raw),
+            phash=perceptual_hash(image),
+            region=region,
+        )
+
+    def _count(self, original, encoded):
+        with self._lock:
+            self.prepared += 1
+            self.bytes_in += original
+            self.bytes_out += encoded
+
+    def repeat(self, channel, image):
+        """The reply already given for this channel's last frame, if `image` looks the same."""
+        if image.phash is None:
+            return None
+        with self._lock:
+            last = self._frames.get(channel)
+            if last and hash_distance(last[0], image.phash) <= self.frame_distance:
+                self.skipped += 1
+                return last[1]
+        return None
+
+    def remember(self, channel, image, reply):
+        if image.phash is not None:
+            with self._lock:
+                self._frames[channel] = (image.phash, reply)
+
+    def forget(self, channel):
+        with self._lock:
+            self._frames.pop(channel, None)
+
+    def report(self):
+        if not self.prepared:
+            return
+        saved = 100 * (1 - self.bytes_out / self.bytes_in) if self.bytes_in else 0
+        print(f"Screenshots: {self.prepared} prepared, {self.bytes_in / 1024:.0f} KB -> "
+              f"{self.bytes_out / 1024:.0f} KB ({saved:.0f}% smaller), "
+              f"{self.skipped} unchanged frames not re-sent")
@@ -1,151 +1,99 @@
-import os
-import json
-import time
-import requests
-from bs4 import BeautifulSoup
-from selenium import webdriver
+import sys
 from selenium.webdriver.common.by import By
-from selenium.webdriver.chrome.options import Options
-from selenium.webdriver.chrome.service import Service
-from openai import OpenAI
-from dotenv import load_dotenv
-
-# Load environment variables
-load_dotenv()
-XAI_API_KEY = os.getenv("XAI_API_KEY")
-
-# Initialize Grok client
-client = OpenAI(api_key=XAI_API_KEY, base_url="https://api.x.ai/v1")
-
-# Function to download resume from GitHub
-def download_resume(url, local_path):
-    response = requests.get(url)
-    if response.status_code == 200:
-        with open(local_path, "wb") as f:
-            f.write(response.content)
-        print(f"Resume downloaded to {local_path}")
-    else:
-        raise Exception(f"Failed to download resume from {url}. Status code: {response.status_code}")
-
-# Download resume
-resume_url = "https://raw.githubusercontent.com/IssacVinson/AutoJobApplications/main/Resume%20Mar%2025.pdf"
-local_resume_path = "/home/vinso/job_applier/resume.pdf"
-download_resume(resume_url, local_resume_path)
-
-# Load profile and update resume path
-with open("profile.json", "r") as f:
-    profile = json.load(f)
-profile["resume"] = local_resume_path  # Update the resume path dynamically
-
-# Set up Selenium with headless Chromium
-chrome_options = Options()
-chrome_options.add_argument("--headless")  # Run in headless mode
-chrome_options.add_argument("--no-sandbox")
-chrome_options.add_argument("--disable-dev-shm-usage")
-service = Service("/usr/bin/chromedriver")  # Updated path to match your system
-driver = webdriver.Chrome(service=service, options=chrome_options)
-
-def scrape_jobs(keyword, location):
-    url = f"https://www.indeed.com/jobs?q={keyword}&l={location}&remotejob=032b3046-06a3-4876-8dfd-474eb5e7ed11"
-    response = requests.get(url)
-    soup = BeautifulSoup(response.text, "html.parser")
-    jobs = soup.find_all("div", class_="job_seen_beacon")  # Updated class for Indeed
-    
-    job_list = []
-    for job in jobs:
-        title_elem = job.find("a", class_="jcs-JobTitle")
-        if not title_elem:
-            continue
-        title = title_elem.text.strip()
-        link = "https://www.indeed.com" + title_elem["href"]
-        job_list.append({"title": title, "link": link})
-    return job_list
-
-def filter_job(job_link):
-    driver.get(job_link)
-    time.sleep(2)
-    try:
-        job_desc = driver.find_element(By.CLASS_NAME, "jobsearch-JobDescriptionSection").text
-    except:
+from posting_snapshot import snapshot_page
+from crawl import search_url, MAX_PAGES
+from cover_letter import cover_letter_path
+from jobs_pipeline import (get_gateway, get_resume_path, get_profile, get_readiness, get_extractor, get_fetcher,
+                           get_prompts, get_scorer, get_cover_letters, fetch_snapshot, close_resources,
+                           MAX_WORKERS, MAX_APPLICATIONS)
+import jobs_pipeline
+import cli
+import tracing
+from tracing import log
+
+def scrape_jobs(keyword, location, page=0):
+    url = search_url("Indeed", keyword, location, page)
+    return get_fetcher().cards(url, "Indeed", get_extractor()) or []
+
+# Load a posting once and capture it for the filter and apply stages
+def snapshot_job(driver, job_link):
+    get_readiness().get(driver, job_link, baseline=2)
+    job_desc = get_extractor().description(driver, job_link)
+    return snapshot_page(driver, job_link, description=job_desc)
+
+def filter_job(driver, job_link):
+    snapshot = fetch_snapshot(job_link) or snapshot_job(driver, job_link)
+    if snapshot.description is None:
         return False
+    return filter_jobs([snapshot.description])[0]
+
+# Score all descriptions with a few batched Grok calls; returns one bool per description
+def filter_jobs(job_descs):
+    results = get_scorer().score_many([{"description": job_desc} for job_desc in job_descs])
+    return [bool(result and result["match"]) for result in results]
 
-    response = client.chat.completions.create(
-        model="grok-beta",
-        messages=[
-            {"role": "system", "content": "You are a job application assistant."},
-            {"role": "user", "content": f"Given this profile: {profile}, does this job description match my skills and experience? Job description: {job_desc}"}
-        ]
-    )
-    answer = response.choices[0].message.content.lower()
-    return "yes" in answer or "match" in answer
-
-def generate_cover_letter(job_desc):
-    response = client.chat.completions.create(
-        model="grok-beta",
-        messages=[
-            {"role": "system", "content": "You are a job application assistant."},
-            {"role": "user", "content": f"Using this profile: {profile}, write a cover letter for this job description: {job_desc}"}
-        ]
-    )
-    return response.choices[0].message.content
+def generate_cover_letter(job_desc, company=None, title=None):
+    return get_cover_letters().letter(job_desc, company, title)
 
 def answer_essay_question(question):
-    response = client.chat.completions.create(
-        model="grok-beta",
-        messages=[
-            {"role": "system", "content": "You are a job application assistant answering essay questions based on this profile: " + str(profile)},
-            {"role": "user", "content": f"Answer this question: {question}"}
-        ]
-    )
-    return response.choices[0].message.content
-
-def apply_to_job(job_link):
-    print(f"Applying to: {job_link}")
-    driver.get(job_link)
-    time.sleep(3)  # Wait for page to load
-
-    # Get job description
-    try:
-        job_desc = driver.find_element(By.CLASS_NAME, "jobsearch-JobDescriptionSection").text
-    except:
-        job_desc = "No description found."
+    return get_gateway().call("essay", get_prompts().messages(
+        "essay",
+        "You are a job application assistant answering essay questions as the candidate above.",
+        f"Answer this question: {question}",
+    ))
+
+def apply_to_job(driver, job_link, snapshot=None, job=None):
+    log(f"Applying to: {job_link}")
+    # Skip navigation when this pooled session is still on the posting from the filter stage
+    if snapshot is None or not snapshot.is_loaded_in(driver):
+        get_readiness().get(driver, job_link, baseline=3)  # Wait for page to load
+
+    # Get job description (reuse the filter stage's copy when we have it)
+    if snapshot is not None and snapshot.description:
+        job_desc = snapshot.description
+    else:
+        job_desc = get_extractor().description(driver, job_link) or "No description found."
 
     # Generate cover letter
-    cover_letter = generate_cover_letter(job_desc)
-    with open("cover_letter.txt", "w") as f:
+    job = job or {}
+    cover_letter = generate_cover_letter(job_desc, job.get("company"), job.get("title"))
+    cover_letter_file = cover_letter_path(job_link)
+    with open(cover_letter_file, "w") as f:
         f.write(cover_letter)
 
     # Click "Apply Now" button (adjust selector based on site)
     try:
         apply_button = driver.find_element(By.XPATH, "//button[contains(text(), 'Apply Now')]")
-        apply_button.click()
-        time.sleep(2)
+        get_readiness().click(driver, apply_button, baseline=2)
     except:
-        print("Could not find Apply Now button.")
-        return
+        log("Could not find Apply Now button.")
+        return False
 
     # Fill basic info
     try:
-        driver.find_element(By.NAME, "first_name").send_keys(profile["name"].split()[0])
-        driver.find_element(By.NAME, "last_name").send_keys(profile["name"].split()[-1])
-        driver.find_element(By.NAME, "email").send_keys(profile["email"])
-        driver.find_element(By.NAME, "phone").send_keys(profile["phone"])
+        with tracing.span("fill", type="basic info"):
+            driver.find_element(By.NAME, "first_name").send_keys(get_profile()["name"].split()[0])
+            driver.find_element(By.NAME, "last_name").send_keys(get_profile()["name"].split()[-1])
+            driver.find_element(By.NAME, "email").send_keys(get_profile()["email"])
+            driver.find_element(By.NAME, "phone").send_keys(get_profile()["phone"])
     except:
-        print("Could not fill basic info.")
+        log("Could not fill basic info.")
 
     # Upload resume
     try:
-        resume_field = driver.find_element(By.XPATH, "//input[@type='file'][contains(@id, 'resume')]")
-        resume_field.send_keys(profile["resume"])
+        with tracing.span("upload", file="resume"):
+            resume_field = driver.find_element(By.XPATH, "//input[@type='file'][contains(@id, 'resume')]")
+            resume_field.send_keys(get_resume_path())
     except:
-        print("Could not upload resume.")
+        log("Could not upload resume.")
 
     # Upload cover letter
     try:
-        cover_letter_field = driver.find_element(By.XPATH, "//input[@type='file'][contains(@id, 'cover')]")
-        cover_letter_field.send_keys(os.path.abspath("cover_letter.txt"))
+        with tracing.span("upload", file="cover letter"):
+            cover_letter_field = driver.find_element(By.XPATH, "//input[@type='file'][contains(@id, 'cover')]")
+            cover_letter_field.send_keys(cover_letter_file)
     except:
-        print("Could not upload cover letter.")
+        log("Could not upload cover letter.")
 
     # Answer essay questions (if any)
     try:
@@ -156,37 +104,39 @@ def apply_to_job(job_link):
                 answer = answer_essay_question(question_text)
                 q.send_keys(answer)
     except:
-        print("No essay questions found or could not answer.")
+        log("No essay questions found or could not answer.")
 
     # Submit application
     try:
         submit_button = driver.find_element(By.XPATH, "//button[@type='submit']")
         submit_button.click()
-        print("Application submitted!")
+        log("Application submitted!")
+        return True
     except:
-        print("Could not submit application.")
-
-def main():
-    # Scrape remote software jobs
-    jobs = scrape_jobs("software developer OR AI Engineer OR Python Developer", "remote")
-    print(f"Found {len(jobs)} jobs.")
-
-    # Filter jobs
-    filtered_jobs = []
-    for job in jobs:
-        if filter_job(job["link"]):
-            filtered_jobs.append(job)
-            print(f"Job matches: {job['title']}")
-        else:
-            print(f"Job does not match: {job['title']}")
-        time.sleep(2)  # Avoid overwhelming servers
-
-    # Apply to first 3 filtered jobs
-    for job in filtered_jobs[:3]:
-        apply_to_job(job["link"])
-        time.sleep(5)  # Avoid overwhelming servers
-
-    driver.quit()
+        log("Could not submit application.")
+        return False
+
+def main(argv=None):
+    args = cli.build_parser("Scrape remote software jobs, filter them with Grok and apply.").parse_args(argv)
+    workers = args.workers or MAX_WORKERS
+    max_applications = args.max_applications or MAX_APPLICATIONS
+    keywords = args.queries or ["software developer OR AI Engineer OR Python Developer"]
+    locations = args.locations or ["remote"]
+    max_pages = args.max_pages or MAX_PAGES
+
+    if args.dry_run:
+        cli.print_plan("job_applier.py", [(k, l) for k in keywords for l in locations], ["Indeed"],
+                       workers, max_applications, max_pages=max_pages, incremental=not args.full_crawl)
+        return
+
+    # Spans for every stage, page load, LLM call and form action, summarized at the end
+    tracing.configure("job_applier", chrome_path=args.trace_chrome, otlp_endpoint=args.otlp_endpoint,
+                      verbosity=args.verbosity)
+
+    # Indeed's results pages are read over plain HTTP, so scraping never starts a browser
+    jobs_pipeline.run(args, keywords, locations, {"Indeed": None}, snapshot_job, apply_to_job, workers=workers,
+                      max_applications=max_applications, max_pages=max_pages)
+    close_resources()
 
 if __name__ == "__main__":
-    main()
+    main(sys.argv[1:])
@@ -0,0 +1,142 @@
+import os
+import json
+import time
+import sqlite3
+import threading
+from dedup_index import canonicalize_url
+
+LEDGER_PATH = os.getenv("JOB_LEDGER_PATH", "job_ledger.sqlite3")
+BATCH_SIZE = 25  # Queued state changes written per transaction
+FLUSH_INTERVAL = 2.0  # Seconds a state change may wait in the queue
+
+# scraped -> described -> scored -> applying -> applied | failed; rejected ends a posting early
+STATES = ["scraped", "described", "scored", "applying", "applied", "failed", "rejected"]
+UNFINISHED = ["scraped", "described", "scored"]
+# Stopped mid-application: the form may already be submitted, so these are left for a person to check
+INTERRUPTED = ["applying"]
+# Written before anything else happens, so a crash can't leave them unrecorded
+DURABLE = {"applying", "applied", "failed"}
+
+def reached(job, state):
+    """True if a posting resumed from the ledger already got to `state` (or past it) in an earlier run."""
+    return job.get("state") in STATES and STATES.index(job["state"]) >= STATES.index(state)
+
+class JobLedger:
+    """
+    One row per posting (by canonical URL) with its state and the artifacts each
+    stage produced: description, rank score, LLM match result, cover letter
+    path. State changes are queued and written in batches, each batch in one
+    transaction; applying/applied/failed are written at once. pending() lists
+    the unfinished postings of earlier runs, which --resume feeds back in at the
+    stage they reached; interrupted() lists the ones a run stopped applying to,
+    which are never applied to again automatically.
+    """
+
+    def __init__(self, path=LEDGER_PATH, batch_size=BATCH_SIZE, flush_interval=FLUSH_INTERVAL):
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.transitions = {}
+        self._queue = []
+        self._last_flush = time.monotonic()
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.executescript("""
+            CREATE TABLE IF NOT EXISTS jobs (
+                url TEXT PRIMARY KEY,
+                link TEXT NOT NULL,
+                title TEXT,
+                company TEXT,
+                source TEXT,
+                state TEXT NOT NULL,
+                description TEXT,
+                rank_score REAL,
+                match TEXT,
+                cover_letter TEXT,
+                error TEXT,
+                created REAL NOT NULL,
+                updated REAL NOT NULL
+            );
+            CREATE INDEX IF NOT EXISTS idx_jobs_state ON jobs(state, updated);
+        """)
+        self._conn.commit()
+
+    def advance(self, job, state, description=None, rank_score=None, match=None, cover_letter=None, error=None):
+        """Queue a posting's move to `state`, with whatever artifacts that stage produced."""
+        url = job.get("canonical_url") or canonicalize_url(job["link"])
+        row = (url, job["link"], job.get("title"), job.get("company"), job.get("source"), state, description,
+               rank_score, json.dumps(match) if match is not None else None, cover_letter, error)
+        with self._lock:
+            self._queue.append(row)
+            self.transitions[state] = self.transitions.get(state, 0) + 1
+            due = (state in DURABLE or len(self._queue) >= self.batch_size
+                   or time.monotonic() - self._last_flush >= self.flush_interval)
+        if due:
+            self.flush()
+
+    def flush(self):
+        with self._lock:
+            rows, self._queue = self._queue, []
+            self._last_flush = time.monotonic()
+            if not rows:
+                return
+            now = time.time()
+            # Artifacts accumulate: a later stage's NULL never erases an earlier stage's value
+            with self._conn:
+                self._conn.executemany("""
+                    INSERT INTO jobs (url, link, title, company, source, state, description, rank_score,
+                                      match, cover_letter, error, created, updated)
+                    VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+                    ON CONFLICT(url) DO UPDATE SET
+                        state = excluded.state,
+                        title = COALESCE(excluded.title, title),
+                        company = COALESCE(excluded.company, company),
+                        source = COALESCE(excluded.source, source),
+                        description = COALESCE(excluded.description, description),
+                        rank_score = COALESCE(excluded.rank_score, rank_score),
+                        match = COALESCE(excluded.match, match),
+                        cover_letter = COALESCE(excluded.cover_letter, cover_letter),
+                        error = excluded.error,
+                        updated = excluded.updated
+                """, [row + (now, now) for row in rows])
+
+    def pending(self, states=UNFINISHED):
+        """
+        Unfinished postings, oldest first, as job dicts carrying their artifacts
+        ("description", "score", "match") and the "state" they reached.
+        """
+        self.flush()
+        placeholders = ",".join("?" * len(states))
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT url, link, title, company, source, state, description, rank_score, match FROM jobs "
+                f"WHERE state IN ({placeholders}) ORDER BY updated", list(states)).fetchall()
+        jobs = []
+        for url, link, title, company, source, state, description, rank_score, match in rows:
+            job = {"link": link, "title": title, "company": company, "canonical_url": url, "state": state}
+            if source:
+                job["source"] = source
+            if description is not None:
+                job["description"] = description
+            if rank_score is not None:
+                job["score"] = rank_score
+            if match is not None:
+                job["match"] = json.loads(match)
+            jobs.append(job)
+        return jobs
+
+    def interrupted(self):
+        """Postings a run stopped in the middle of applying to (crash, Ctrl-C), for manual review."""
+        return self.pending(INTERRUPTED)
+
+    def report(self):
+        self.flush()
+        with self._lock:
+            counts = dict(self._conn.execute("SELECT state, COUNT(*) FROM jobs GROUP BY state"))
+        if self.transitions:
+            print("Job ledger: this run " + ", ".join(f"{n} {state}" for state, n in self.transitions.items())
+                  + "; stored " + ", ".join(f"{counts.get(state, 0)} {state}" for state in STATES))
+
+    def close(self):
+        self.flush()
+        with self._lock:
+            self._conn.close()
@@ -1,421 +1,424 @@
-import os
+import sys
 import json
-import time
-import requests
+import threading
 import re  # Added to fix 'name 're' is not defined' error
-import base64
-from bs4 import BeautifulSoup
-from selenium import webdriver
 from selenium.webdriver.common.by import By
-from selenium.webdriver.chrome.options import Options
-from selenium.webdriver.chrome.service import Service
-from selenium.webdriver.support.ui import WebDriverWait
-from selenium.webdriver.support import expected_conditions as EC
-from openai import OpenAI
-from dotenv import load_dotenv
-
-# Load environment variables
-load_dotenv()
-XAI_API_KEY = os.getenv("XAI_API_KEY")
-
-# Initialize Grok client
-client = OpenAI(api_key=XAI_API_KEY, base_url="https://api.x.ai/v1")
-
-# Function to download resume from GitHub
-def download_resume(url, local_path):
-    print(f"Attempting to download resume from {url} to {local_path}")
-    response = requests.get(url)
-    if response.status_code == 200:
-        with open(local_path, "wb") as f:
-            f.write(response.content)
-        print(f"Success: Resume downloaded to {local_path}")
-    else:
-        print(f"Failure: Failed to download resume from {url}. Status code: {response.status_code}")
-        raise Exception(f"Failed to download resume from {url}. Status code: {response.status_code}")
-
-# Download resume
-resume_url = "https://raw.githubusercontent.com/IssacVinson/AutoJobApplications/main/Resume%20Mar%2025.pdf"
-local_resume_path = "/home/vinso/job_applier/resume.pdf"
-download_resume(resume_url, local_resume_path)
-
-# Load profile and update resume path
-print("Attempting to load profile.json")
-with open("profile.json", "r") as f:
-    profile = json.load(f)
-profile["resume"] = local_resume_path  # Update the resume path dynamically
-print("Success: Profile loaded and resume path updated")
-
-# Set up Selenium with headless Chromium
-print("Attempting to set up Selenium WebDriver")
-chrome_options = Options()
-chrome_options.add_argument("--headless")  # Run in headless mode
-chrome_options.add_argument("--no-sandbox")
-chrome_options.add_argument("--disable-dev-shm-usage")
-service = Service("/usr/bin/chromedriver")  # Correct path
-driver = webdriver.Chrome(service=service, options=chrome_options)
-print("Success: Selenium WebDriver set up")
-
-# Function to take a screenshot and encode it as base64
-def take_screenshot():
-    print("Attempting to take screenshot")
-    screenshot = driver.get_screenshot_as_base64()
-    if screenshot:
-        print("Success: Screenshot captured and encoded as base64")
-    else:
-        print("Failure: Failed to capture screenshot")
-    return screenshot
-
-# Function to scrape jobs using vision-based approach
-def scrape_jobs_with_vision(url, source):
-    print(f"Scraping {source} with vision-based approach: {url}")
-    driver.get(url)
-    time.sleep(5)  # Wait for page to load
-
+from posting_snapshot import snapshot_page
+from image_prep import ScreenshotPrep, content_region
+from extractors import resolve_xpaths, card_link
+from crawl import search_url, MAX_PAGES
+from cover_letter import cover_letter_path
+from field_answers import FieldAnswers
+from flow_replay import FlowRecorder, confirmed
+from resources import lazy
+from jobs_pipeline import (get_gateway, get_resume_path, get_profile, get_readiness, get_extractor, get_profiles,
+                           get_prompts, get_scorer, get_cover_letters, fetch_snapshot, MAX_WORKERS, MAX_APPLICATIONS)
+import jobs_pipeline
+import cli
+import tracing
+from tracing import log
+
+# Everything below is created on first use, so importing this module (for a test,
+# a dry run or a quick check) never touches the network, disk caches or Chrome.
+# The resources shared with job_applier.py come from jobs_pipeline.
+
+# Known form-field answers (profile + store); unknown fields go to Grok a form at a time
+@lazy
+def get_field_answers():
+    return FieldAnswers(get_profile(), get_gateway(), get_prompts(), ask=ask_user)
+
+# Recorded action plans of completed applications, replayed on the same ATS
+@lazy
+def get_flows():
+    return FlowRecorder()
+
+# Crops, downscales and re-encodes screenshots before they go to the vision model
+@lazy
+def get_screenshot_prep():
+    return ScreenshotPrep()
+
+# Only one worker at a time may prompt the user on the terminal
+prompt_lock = threading.Lock()
+
+def ask_user(question):
+    with prompt_lock:
+        print(f"Question: {question}")
+        user_answer = input("Please provide an answer (or press Enter to skip): ")
+    return user_answer if user_answer else "Skipped by user"
+
+# Function to take a screenshot, cropped to the page's main content ("search",
+# "posting" or "application") and compressed for the vision model. Pages are
+# loaded lean (no images or fonts), so a search or posting page is reloaded with
+# full rendering first; application pages are already loaded that way.
+def take_screenshot(driver, kind=None):
+    log("Attempting to take screenshot")
+    if get_profiles().use(driver, "full") and kind in ("search", "posting"):
+        log("Reloading page with full rendering for the screenshot")
+        get_readiness().get(driver, driver.current_url, baseline=0)
+    with tracing.span("screenshot", kind=kind):
+        screenshot = driver.get_screenshot_as_base64()
+        if not screenshot:
+            log("Failure: Failed to capture screenshot")
+            return None
+        image = get_screenshot_prep().prepare(screenshot, content_region(driver, kind))
+    log(f"Success: Screenshot captured and encoded ({image.original_size // 1024} KB -> {image.size // 1024} KB)")
+    return image
+
+# Load a search page and read its job cards; the vision model only sees pages
+# the structured extractors can't read
+def scrape_search_page(driver, url, source, vision=None):
+    log(f"Scraping {source}: {url}")
+    get_readiness().get(driver, url, baseline=5)  # Wait for page to load
+    return get_extractor().cards(driver, url, source, fallback=vision or scrape_jobs_with_vision)
+
+# Function to scrape jobs using vision-based approach (search page already loaded)
+def scrape_jobs_with_vision(driver, url, source):
+    log(f"Scraping {source} with vision-based approach: {url}")
     # Take screenshot
-    screenshot = take_screenshot()
+    screenshot = take_screenshot(driver, "search")
     if not screenshot:
-        print(f"Failure: No screenshot available for {source}")
+        log(f"Failure: No screenshot available for {source}")
         return []
 
     # Ask Grok to identify job listings in the screenshot
-    print(f"Attempting to analyze {source} screenshot with Grok")
+    log(f"Attempting to analyze {source} screenshot with Grok")
     try:
-        response = client.chat.completions.create(
-            model="grok-beta",
-            messages=[
-                {
-                    "role": "system",
-                    "content": "You are a web automation assistant with vision capabilities. Analyze the provided screenshot of a job search page and identify job listings. For each job, provide: 1) The job title, 2) The clickable element (XPath) to access the job details or application page. Return a JSON object with a key 'jobs' containing a list of dictionaries, each with 'title' and 'xpath'. If no jobs are found, return: {'jobs': []}."
-                },
-                {
-                    "role": "user",
-                    "content": f"Analyze this screenshot to identify job listings: data:image/png;base64,{screenshot}"
-                }
-            ],
-            timeout=30
-        )
-        print("Success: Grok API call completed")
-        instructions = response.choices[0].message.content.strip()
-        print(f"Grok response: {instructions}")
+        reply = get_gateway().call("vision", [
+            {
+                "role": "system",
+                "content": "You are a web automation assistant with vision capabilities. Analyze the provided screenshot of a job search page and identify job listings. For each job, provide: 1) The job title, 2) The clickable element (XPath) to access the job details or application page. Return a JSON object with a key 'jobs' containing a list of dictionaries, each with 'title' and 'xpath'. If no jobs are found, return: {'jobs': []}."
+            },
+            {
+                "role": "user",
+                "content": f"Analyze this screenshot to identify job listings: {screenshot.data_url}"
+            }
+        ], timeout=30)
+        log("Success: Grok API call completed")
+        instructions = reply.strip()
+        log(f"Grok response: {instructions}")
         json_match = re.search(r'\{.*\}', instructions, re.DOTALL)
         if json_match:
             instructions = json_match.group(0)
-            print(f"Success: Extracted JSON: {instructions}")
+            log(f"Success: Extracted JSON: {instructions}")
         else:
-            print("Failure: No JSON pattern found in Grok response")
+            log("Failure: No JSON pattern found in Grok response")
             return []
         job_data = json.loads(instructions)
         if not isinstance(job_data, dict) or 'jobs' not in job_data:
-            print(f"Failure: Invalid job data from Grok for {source}: {instructions}")
+            log(f"Failure: Invalid job data from Grok for {source}: {instructions}")
             return []
 
-        job_list = []
+        jobs = []
         for i, job in enumerate(job_data.get("jobs", [])):
-            title = job.get("title", f"Untitled_{i}")
-            xpath = job.get("xpath")
-            if not xpath:
-                print(f"Warning: No XPath for job {i} from {source}")
-                continue
+            if job.get("xpath"):
+                jobs.append((i, job.get("title", f"Untitled_{i}"), job["xpath"]))
+            else:
+                log(f"Warning: No XPath for job {i} from {source}")
+
+        # Read every card's link (or posting id) in one script instead of clicking through each card
+        job_list = []
+        unresolved = []
+        for (i, title, xpath), fields in zip(jobs, resolve_xpaths(driver, [xpath for _, _, xpath in jobs])):
+            link = card_link(url, fields) if fields else None
+            if link:
+                job_list.append({"title": title, "link": link, "source": source})
+                log(f"Success: Scraped job {i} from {source}: {title} at {link}")
+            else:
+                unresolved.append((i, title, xpath))
+
+        # Only cards with neither still need a click (and a reload of the search page)
+        for i, title, xpath in unresolved:
             try:
-                print(f"Attempting to find and click job {i} with XPath: {xpath}")
+                log(f"Attempting to find and click job {i} with XPath: {xpath}")
                 element = driver.find_element(By.XPATH, xpath)
-                link = element.get_attribute("href") or url
-                print(f"Success: Found element, attempting to click")
-                element.click()
-                time.sleep(2)  # Wait for navigation
+                log(f"Success: Found element, attempting to click")
+                get_readiness().click(driver, element, baseline=2)  # Wait for navigation
                 current_url = driver.current_url
                 job_list.append({"title": title, "link": current_url, "source": source})
-                print(f"Success: Scraped job {i} from {source}: {title} at {current_url}")
-                driver.get(url)  # Return to search page
-                time.sleep(2)
+                log(f"Success: Scraped job {i} from {source}: {title} at {current_url}")
+                get_readiness().get(driver, url, baseline=2)  # Return to search page
             except Exception as e:
-                print(f"Failure: Error navigating to job {i} from {source}: {e}")
+                log(f"Failure: Error navigating to job {i} from {source}: {e}")
                 job_list.append({"title": title, "link": url, "source": source})
-        print(f"Success: Found {len(job_list)} jobs from {source}")
+        log(f"Success: Found {len(job_list)} jobs from {source}")
         return job_list
     except Exception as e:
-        print(f"Failure: Failed to scrape {source} jobs with vision: {e}")
+        log(f"Failure: Failed to scrape {source} jobs with vision: {e}")
         return []
 
-def scrape_jobs_indeed(keyword, location):
-    url = f"https://www.indeed.com/jobs?q={keyword}&l={location}&remotejob=032b3046-06a3-4876-8dfd-474eb5e7ed11"
-    return scrape_jobs_with_vision(url, "Indeed")
+def scrape_jobs_indeed(driver, keyword, location, page=0):
+    return scrape_search_page(driver, search_url("Indeed", keyword, location, page), "Indeed")
 
 # Commenting out LinkedIn for now
-# def scrape_jobs_linkedin(keyword, location):
-#     keyword_formatted = keyword.replace(" OR ", "+").replace(" ", "+")
-#     url = f"https://www.linkedin.com/jobs/search/?keywords={keyword_formatted}&location={location}&f_WT=2"
-#     return scrape_jobs_with_vision(url, "LinkedIn")
-
-def scrape_jobs_glassdoor(keyword, location):
-    keyword_formatted = keyword.replace(" OR ", "+").replace(" ", "+")
-    url = f"https://www.glassdoor.com/Job/{keyword_formatted}-jobs-SRCH_KO0,30.htm?remoteWorkType=1"
-    return scrape_jobs_with_vision(url, "Glassdoor")
-
-def scrape_jobs_x(keyword, location):
-    query = f"{keyword} {location} job -filter:replies"
-    query_formatted = query.replace(" ", "%20").replace("OR", "%20OR%20")
-    url = f"https://x.com/search?q={query_formatted}&src=typed_query"
-    print(f"Scraping X with vision-based approach: {url}")
-    driver.get(url)
-    time.sleep(5)  # Wait for page to load
+# def scrape_jobs_linkedin(driver, keyword, location, page=0):
+#     return scrape_search_page(driver, search_url("LinkedIn", keyword, location, page), "LinkedIn")
+
+def scrape_jobs_glassdoor(driver, keyword, location, page=0):
+    return scrape_search_page(driver, search_url("Glassdoor", keyword, location, page), "Glassdoor")
+
+def scrape_jobs_x(driver, keyword, location, page=0):
+    return scrape_search_page(driver, search_url("X", keyword, location, page), "X", vision=scrape_x_with_vision)
 
+# X search results with the vision-based approach (search page already loaded)
+def scrape_x_with_vision(driver, url, source):
+    log(f"Scraping X with vision-based approach: {url}")
     # Take screenshot
-    screenshot = take_screenshot()
+    screenshot = take_screenshot(driver, "search")
     if not screenshot:
-        print(f"Failure: No screenshot available for X")
+        log(f"Failure: No screenshot available for X")
         return []
 
     # Ask Grok to identify job postings
-    print(f"Attempting to analyze X screenshot with Grok")
+    log(f"Attempting to analyze X screenshot with Grok")
     try:
-        response = client.chat.completions.create(
-            model="grok-beta",
-            messages=[
-                {
-                    "role": "system",
-                    "content": "You are a web automation assistant with vision capabilities. Analyze the provided screenshot of an X search page and identify job postings. For each job, provide: 1) The job title (or first 50 characters of the tweet), 2) The clickable element (XPath) to access the job link. Return a JSON object with a key 'jobs' containing a list of dictionaries, each with 'title' and 'xpath'. If no jobs are found, return: {'jobs': []}."
-                },
-                {
-                    "role": "user",
-                    "content": f"Analyze this screenshot to identify job postings: data:image/png;base64,{screenshot}"
-                }
-            ],
-            timeout=30
-        )
-        print("Success: Grok API call completed for X")
-        instructions = response.choices[0].message.content.strip()
-        print(f"Grok response for X: {instructions}")
+        reply = get_gateway().call("vision", [
+            {
+                "role": "system",
+                "content": "You are a web automation assistant with vision capabilities. Analyze the provided screenshot of an X search page and identify job postings. For each job, provide: 1) The job title (or first 50 characters of the tweet), 2) The clickable element (XPath) to access the job link. Return a JSON object with a key 'jobs' containing a list of dictionaries, each with 'title' and 'xpath'. If no jobs are found, return: {'jobs': []}."
+            },
+            {
+                "role": "user",
+                "content": f"Analyze this screenshot to identify job postings: {screenshot.data_url}"
+            }
+        ], timeout=30)
+        log("Success: Grok API call completed for X")
+        instructions = reply.strip()
+        log(f"Grok response for X: {instructions}")
         json_match = re.search(r'\{.*\}', instructions, re.DOTALL)
         if json_match:
             instructions = json_match.group(0)
-            print(f"Success: Extracted JSON for X: {instructions}")
+            log(f"Success: Extracted JSON for X: {instructions}")
         else:
-            print("Failure: No JSON pattern found in X Grok response")
+            log("Failure: No JSON pattern found in X Grok response")
             return []
         job_data = json.loads(instructions)
         if not isinstance(job_data, dict) or 'jobs' not in job_data:
-            print(f"Failure: Invalid job data from Grok for X: {instructions}")
+            log(f"Failure: Invalid job data from Grok for X: {instructions}")
             return []
 
-        job_list = []
+        jobs = []
         for i, job in enumerate(job_data.get("jobs", [])):
-            title = job.get("title", f"Untitled_{i}")
-            xpath = job.get("xpath")
-            if not xpath:
-                print(f"Warning: No XPath for X job {i}")
-                continue
-            try:
-                print(f"Attempting to find X job {i} with XPath: {xpath}")
-                element = driver.find_element(By.XPATH, xpath)
-                link = element.get_attribute("href") or url
-                job_list.append({"title": title, "link": link, "source": "X"})
-                print(f"Success: Scraped job {i} from X: {title} at {link}")
-            except Exception as e:
-                print(f"Failure: Error scraping X job {i}: {e}")
-                job_list.append({"title": title, "link": url, "source": "X"})
-        print(f"Success: Found {len(job_list)} jobs from X")
+            if job.get("xpath"):
+                jobs.append((i, job.get("title", f"Untitled_{i}"), job["xpath"]))
+            else:
+                log(f"Warning: No XPath for X job {i}")
+
+        # Resolve all XPaths to links in one script
+        job_list = []
+        for (i, title, xpath), fields in zip(jobs, resolve_xpaths(driver, [xpath for _, _, xpath in jobs])):
+            link = card_link(url, fields) if fields else None
+            if link:
+                log(f"Success: Scraped job {i} from X: {title} at {link}")
+            else:
+                log(f"Failure: Error scraping X job {i}: no link at {xpath}")
+            job_list.append({"title": title, "link": link or url, "source": "X"})
+        log(f"Success: Found {len(job_list)} jobs from X")
         return job_list
     except Exception as e:
-        print(f"Failure: Failed to scrape X jobs with vision: {e}")
+        log(f"Failure: Failed to scrape X jobs with vision: {e}")
         return []
 
-def filter_job(job_link):
-    print(f"Attempting to filter job: {job_link}")
-    driver.get(job_link)
-    time.sleep(2)
+# Load a posting once and capture it (description, DOM text) for later stages
+def snapshot_job(driver, job_link):
+    log(f"Attempting to snapshot job posting: {job_link}")
+    get_readiness().get(driver, job_link, baseline=2)
+    job_desc = get_extractor().description(driver, job_link, fallback=describe_with_vision)
+    return snapshot_page(driver, job_link, description=job_desc)
+
+# Vision fallback for postings the extractors can't read (posting already loaded)
+def describe_with_vision(driver, job_link):
     # Take screenshot
-    screenshot = take_screenshot()
+    screenshot = take_screenshot(driver, "posting")
     if not screenshot:
-        print(f"Failure: No screenshot available for filtering {job_link}")
-        return False
+        log(f"Failure: No screenshot available for filtering {job_link}")
+        return None
 
     # Ask Grok to extract job description from screenshot
-    print(f"Attempting to extract job description with Grok for {job_link}")
+    log(f"Attempting to extract job description with Grok for {job_link}")
     try:
-        response = client.chat.completions.create(
-            model="grok-beta",
-            messages=[
-                {
-                    "role": "system",
-                    "content": "You are a job application assistant with vision capabilities. Analyze the provided screenshot of a job posting page and extract the job description text. Return the text as a string. If no description is found, return: 'No description found.'"
-                },
-                {
-                    "role": "user",
-                    "content": f"Extract the job description from this screenshot: data:image/png;base64,{screenshot}"
-                }
-            ]
-        )
-        print("Success: Grok API call completed for job description")
-        job_desc = response.choices[0].message.content.strip()
-        print(f"Extracted job description: {job_desc}")
-        if not job_desc:
-            job_desc = "No description found."
+        reply = get_gateway().call("vision", [
+            {
+                "role": "system",
+                "content": "You are a job application assistant with vision capabilities. Analyze the provided screenshot of a job posting page and extract the job description text. Return the text as a string. If no description is found, return: 'No description found.'"
+            },
+            {
+                "role": "user",
+                "content": f"Extract the job description from this screenshot: {screenshot.data_url}"
+            }
+        ])
+        log("Success: Grok API call completed for job description")
+        job_desc = reply.strip()
+        log(f"Extracted job description: {job_desc}")
+        if not job_desc or job_desc == "No description found.":
+            return None
+        return job_desc
     except Exception as e:
-        print(f"Failure: Failed to extract job description with vision: {e}")
-        job_desc = "No description found."
-
-    with open("debug_job_desc.txt", "a") as f:
-        f.write(f"Link: {job_link}\nDescription: {job_desc}\n\n")
-    response = client.chat.completions.create(
-        model="grok-beta",
-        messages=[
-            {"role": "system", "content": "You are a job application assistant."},
-            {"role": "user", "content": f"Given this profile: {profile}, does this job description match my skills and experience? Job description: {job_desc}"}
-        ]
-    )
-    answer = response.choices[0].message.content.lower()
-    print(f"Filter decision: {'yes' if 'yes' in answer or 'match' in answer else 'no'}")
-    return "yes" in answer or "match" in answer
-
-def generate_cover_letter(job_desc):
-    print(f"Attempting to generate cover letter for description: {job_desc[:50]}...")
-    response = client.chat.completions.create(
-        model="grok-beta",
-        messages=[
-            {"role": "system", "content": "You are a job application assistant."},
-            {"role": "user", "content": f"Using this profile: {profile}, write a cover letter for this job description: {job_desc}"}
-        ]
-    )
-    cover_letter = response.choices[0].message.content
-    print("Success: Cover letter generated")
-    return cover_letter
+        log(f"Failure: Failed to extract job description with vision: {e}")
+        return None
 
-def answer_essay_question(question):
-    print(f"Attempting to answer essay question: {question}")
-    sensitive_keywords = ["ssn", "social security", "password", "credit card", "bank account"]
-    if any(keyword in question.lower() for keyword in sensitive_keywords):
-        print(f"Sensitive question detected: {question}")
-        user_answer = input("Please provide an answer (or press Enter to skip): ")
-        return user_answer if user_answer else "Skipped by user"
-    
-    try:
-        response = client.chat.completions.create(
-            model="grok-beta",
-            messages=[
-                {"role": "system", "content": "You are a job application assistant answering essay questions based on this profile: " + str(profile)},
-                {"role": "user", "content": f"Answer this question: {question}"}
-            ]
-        )
-        answer = response.choices[0].message.content
-        print(f"Success: Generated answer for {question}")
-        return answer
-    except Exception as e:
-        print(f"Failure: Failed to generate answer for {question}: {e}")
-        user_answer = input("Please provide an answer (or press Enter to skip): ")
-        return user_answer if user_answer else "Skipped by user"
+def filter_job(driver, job_link):
+    log(f"Attempting to filter job: {job_link}")
+    snapshot = fetch_snapshot(job_link) or snapshot_job(driver, job_link)
+    if snapshot.description is None:
+        return False
+    matched = filter_jobs([snapshot.description])[0]
+    log(f"Filter decision: {'yes' if matched else 'no'}")
+    return matched
+
+# Score all descriptions with a few batched Grok calls; returns one bool per description
+def filter_jobs(job_descs):
+    log(f"Attempting to filter {len(job_descs)} jobs in batches")
+    results = get_scorer().score_many([{"description": job_desc} for job_desc in job_descs])
+    decisions = [bool(result and result["match"]) for result in results]
+    log(f"Success: {sum(decisions)}/{len(decisions)} jobs matched")
+    return decisions
+
+def generate_cover_letter(job_desc, company=None, title=None):
+    log(f"Attempting to generate cover letter for description: {job_desc[:50]}...")
+    cover_letter = get_cover_letters().letter(job_desc, company, title)
+    log("Success: Cover letter generated")
+    return cover_letter
 
-def apply_to_job(job_link):
-    print(f"Applying to: {job_link}")
-    driver.get(job_link)
-    time.sleep(5)  # Initial wait for page load
+def apply_to_job(driver, job_link, snapshot=None, job=None):
+    # Selenium's wait helpers are slow to import and only needed once we apply
+    from selenium.webdriver.support.ui import WebDriverWait
+    from selenium.webdriver.support import expected_conditions as EC
+    log(f"Applying to: {job_link}")
+    # The application is driven from screenshots, so it is rendered in full
+    lean_page = get_profiles().use(driver, "full")
+    # Skip navigation when this pooled session is still on the posting from the filter stage
+    if snapshot is not None and snapshot.is_loaded_in(driver) and not lean_page:
+        log("Success: Posting already loaded from filter stage, skipping navigation")
+    else:
+        get_readiness().get(driver, job_link, baseline=5)  # Initial wait for page load
 
-    # Generate cover letter
-    try:
-        job_desc = driver.find_element(By.CLASS_NAME, "jobsearch-JobDescriptionSection").text
-    except:
-        job_desc = "No description found."
-    cover_letter = generate_cover_letter(job_desc)
-    with open("cover_letter.txt", "w") as f:
+    # Generate cover letter (reuse the filter stage's description when we have it)
+    if snapshot is not None and snapshot.description:
+        job_desc = snapshot.description
+    else:
+        job_desc = get_extractor().description(driver, job_link) or "No description found."
+    job = job or {}
+    cover_letter = generate_cover_letter(job_desc, job.get("company"), job.get("title"))
+    cover_letter_file = cover_letter_path(job_link)
+    with open(cover_letter_file, "w") as f:
         f.write(cover_letter)
 
-    # Vision-based application loop
+    # Vision-based application loop; flows already completed on this ATS are replayed instead
     max_steps = 10  # Maximum steps to avoid infinite loops
     success = False
+    if get_flows().begin(job_link, driver):
+        log("Success: Known application flow, replaying recorded steps")
     for step in range(max_steps):
-        print(f"Step {step + 1}/{max_steps} of application process")
-        # Take screenshot
-        screenshot = take_screenshot()
-        if not screenshot:
-            print(f"Failure: No screenshot available at step {step}")
-            break
+        log(f"Step {step + 1}/{max_steps} of application process")
+        # A recorded step whose elements are all on the page needs no screenshot or Grok call
+        action_plan = get_flows().replay(job_link, driver)
+        replayed = action_plan is not None
+        if replayed:
+            log(f"Success: Replaying recorded step: {json.dumps(action_plan)}")
+        else:
+            # Take screenshot
+            screenshot = take_screenshot(driver, "application")
+            if not screenshot:
+                log(f"Failure: No screenshot available at step {step}")
+                break
 
-        # Ask Grok for the next action
-        print(f"Attempting to determine next action with Grok at step {step}")
+            # Ask Grok for the next action, unless the page looks the same as when we last asked
+            # and the plan it gave then only clicked a button
+            log(f"Attempting to determine next action with Grok at step {step}")
         try:
-            response = client.chat.completions.create(
-                model="grok-beta",
-                messages=[
-                    {
-                        "role": "system",
-                        "content": "You are a web automation assistant with vision capabilities. Analyze the provided screenshot of a job application page and determine the next action to proceed with the application. Identify: 1) Input fields to fill (e.g., name, email, phone) with their XPaths and the type (e.g., 'text', 'checkbox'), 2) File upload fields for resume or cover letter with their XPaths, 3) The next button to click (e.g., 'Apply', 'Next', 'Submit') with its XPath. Return a JSON object with keys 'inputs', 'file_inputs', and 'button', where 'inputs' and 'file_inputs' are lists of dictionaries with 'xpath' and 'type', and 'button' is a dictionary with 'xpath' and 'text'. If no actions are found or the application is complete, return: {'inputs': [], 'file_inputs': [], 'button': null, 'complete': true/false}."
-                    },
-                    {
-                        "role": "user",
-                        "content": f"Determine the next action for this job application: data:image/png;base64,{screenshot}"
-                    }
-                ],
-                timeout=30
-            )
-            print("Success: Grok API call completed for action determination")
-            instructions = response.choices[0].message.content.strip()
-            print(f"Grok action response: {instructions}")
-            json_match = re.search(r'\{.*\}', instructions, re.DOTALL)
-            if json_match:
-                instructions = json_match.group(0)
-                print(f"Success: Extracted action JSON: {instructions}")
-            else:
-                print("Failure: No JSON pattern found in Grok action response")
-                break
-            action_plan = json.loads(instructions)
-            if not isinstance(action_plan, dict) or not all(key in action_plan for key in ['inputs', 'file_inputs', 'button']):
-                print(f"Failure: Invalid action plan from Grok: {instructions}")
-                break
+            if not replayed:
+                reply = get_screenshot_prep().repeat(job_link, screenshot)
+                if reply is not None:
+                    log("Success: Page unchanged since last step, reusing previous action plan")
+                else:
+                    reply = get_gateway().call("vision", [
+                        {
+                            "role": "system",
+                            "content": "You are a web automation assistant with vision capabilities. Analyze the provided screenshot of a job application page and determine the next action to proceed with the application. Identify: 1) Input fields to fill (e.g., name, email, phone) with their XPaths and the type (e.g., 'text', 'checkbox'), 2) File upload fields for resume or cover letter with their XPaths, 3) The next button to click (e.g., 'Apply', 'Next', 'Submit') with its XPath. Return a JSON object with keys 'inputs', 'file_inputs', and 'button', where 'inputs' and 'file_inputs' are lists of dictionaries with 'xpath' and 'type', and 'button' is a dictionary with 'xpath' and 'text'. If no actions are found or the application is complete, return: {'inputs': [], 'file_inputs': [], 'button': null, 'complete': true/false}."
+                        },
+                        {
+                            "role": "user",
+                            "content": f"Determine the next action for this job application: {screenshot.data_url}"
+                        }
+                    ], timeout=30)
+                    log("Success: Grok API call completed for action determination")
+                instructions = reply.strip()
+                log(f"Grok action response: {instructions}")
+                json_match = re.search(r'\{.*\}', instructions, re.DOTALL)
+                if json_match:
+                    instructions = json_match.group(0)
+                    log(f"Success: Extracted action JSON: {instructions}")
+                else:
+                    log("Failure: No JSON pattern found in Grok action response")
+                    break
+                action_plan = json.loads(instructions)
+                if not isinstance(action_plan, dict) or not all(key in action_plan for key in ['inputs', 'file_inputs', 'button']):
+                    log(f"Failure: Invalid action plan from Grok: {instructions}")
+                    break
+                # Only a plan that fills nothing (just a button) may be replayed on a frame that
+                # looks unchanged; a form would be typed into and uploaded to a second time
+                if action_plan.get("inputs") or action_plan.get("file_inputs"):
+                    get_screenshot_prep().forget(job_link)
+                else:
+                    get_screenshot_prep().remember(job_link, screenshot, reply)
+            get_flows().record(job_link, action_plan, replayed=replayed)
 
             # Check if application is complete
             if action_plan.get("complete", False):
-                print("Success: Application process completed according to Grok!")
+                log("Success: Application process completed according to Grok!")
                 success = True
                 break
 
+            # Answer every text field of this form at once: known labels come from the
+            # field-answer store, the rest share one LLM call
+            text_xpaths = [f.get("xpath") for f in action_plan.get("inputs", [])
+                           if f.get("xpath") and f.get("type", "text") == "text"]
+            text_answers = {}
+            if text_xpaths:
+                log(f"Attempting to answer {len(text_xpaths)} text fields")
+                fields = get_field_answers().describe(driver, text_xpaths)
+                text_answers = dict(zip(text_xpaths, get_field_answers().answer_all(fields)))
+
             # Fill input fields
             for input_field in action_plan.get("inputs", []):
                 xpath = input_field.get("xpath", "")
                 field_type = input_field.get("type", "text")
                 if not xpath:
-                    print(f"Warning: No XPath for input at step {step}")
+                    log(f"Warning: No XPath for input at step {step}")
                     continue
                 try:
-                    print(f"Attempting to fill {field_type} field with xpath: {xpath}")
-                    element = WebDriverWait(driver, 10).until(
-                        EC.presence_of_element_located((By.XPATH, xpath))
-                    )
-                    if field_type == "text":
-                        if "first_name" in xpath.lower():
-                            element.send_keys(profile["name"].split()[0])
-                        elif "last_name" in xpath.lower():
-                            element.send_keys(profile["name"].split()[-1])
-                        elif "email" in xpath.lower():
-                            element.send_keys(profile["email"])
-                        elif "phone" in xpath.lower():
-                            element.send_keys(profile["phone"])
-                        else:
-                            answer = answer_essay_question(f"Fill this field: {xpath}")
-                            element.send_keys(answer if answer else "")
-                    elif field_type in ["checkbox", "radio"]:
-                        element.click()
-                    print(f"Success: Filled {field_type} field with xpath: {xpath}")
+                    log(f"Attempting to fill {field_type} field with xpath: {xpath}")
+                    with tracing.span("fill", type=field_type):
+                        element = WebDriverWait(driver, 10).until(
+                            EC.presence_of_element_located((By.XPATH, xpath))
+                        )
+                        if field_type == "text":
+                            element.send_keys(text_answers.get(xpath) or "")
+                        elif field_type in ["checkbox", "radio"]:
+                            element.click()
+                    log(f"Success: Filled {field_type} field with xpath: {xpath}")
                 except Exception as e:
-                    print(f"Failure: Failed to fill input {xpath}: {e}")
+                    log(f"Failure: Failed to fill input {xpath}: {e}")
 
             # Upload files
             for file_input in action_plan.get("file_inputs", []):
                 xpath = file_input.get("xpath", "")
                 if not xpath:
-                    print(f"Warning: No XPath for file input at step {step}")
+                    log(f"Warning: No XPath for file input at step {step}")
                     continue
                 try:
-                    print(f"Attempting to upload file with xpath: {xpath}")
-                    element = WebDriverWait(driver, 10).until(
-                        EC.presence_of_element_located((By.XPATH, xpath))
-                    )
-                    if "resume" in xpath.lower():
-                        element.send_keys(profile["resume"])
-                    elif "cover" in xpath.lower():
-                        element.send_keys(os.path.abspath("cover_letter.txt"))
-                    print(f"Success: Uploaded file for xpath: {xpath}")
+                    log(f"Attempting to upload file with xpath: {xpath}")
+                    with tracing.span("upload"):
+                        element = WebDriverWait(driver, 10).until(
+                            EC.presence_of_element_located((By.XPATH, xpath))
+                        )
+                        if "resume" in xpath.lower():
+                            element.send_keys(get_resume_path())
+                        elif "cover" in xpath.lower():
+                            element.send_keys(cover_letter_file)
+                    log(f"Success: Uploaded file for xpath: {xpath}")
                 except Exception as e:
-                    print(f"Failure: Failed to upload file for {xpath}: {e}")
+                    log(f"Failure: Failed to upload file for {xpath}: {e}")
 
             # Click the next button
             button = action_plan.get("button")
@@ -424,111 +427,114 @@ def apply_to_job(job_link):
                 max_retries = 2
                 for attempt in range(max_retries):
                     try:
-                        print(f"Attempt {attempt + 1}/{max_retries} to click button with xpath: {xpath}")
+                        log(f"Attempt {attempt + 1}/{max_retries} to click button with xpath: {xpath}")
                         element = WebDriverWait(driver, 10).until(
                             EC.element_to_be_clickable((By.XPATH, xpath))
                         )
-                        element.click()
-                        time.sleep(2)
-                        print(f"Success: Clicked button with xpath: {xpath} (text: {button.get('text', 'unknown')})")
+                        get_readiness().click(driver, element, baseline=2)
+                        log(f"Success: Clicked button with xpath: {xpath} (text: {button.get('text', 'unknown')})")
                         break
                     except Exception as e:
-                        print(f"Failure: Attempt {attempt + 1}/{max_retries} failed to click {xpath}: {e}")
+                        log(f"Failure: Attempt {attempt + 1}/{max_retries} failed to click {xpath}: {e}")
                         if attempt < max_retries - 1:
-                            time.sleep(2)
+                            get_readiness().settle(driver, baseline=2)
                         else:
-                            print(f"Failure: Max retries reached for button {xpath}")
+                            log(f"Failure: Max retries reached for button {xpath}")
                             break
             else:
-                print("Warning: No button to click at step {step}, checking if application is complete...")
+                log("Warning: No button to click at step {step}, checking if application is complete...")
                 break
 
         except Exception as e:
-            print(f"Failure: Failed to determine next action with vision at step {step}: {e}")
+            log(f"Failure: Failed to determine next action with vision at step {step}: {e}")
             break
 
-    # Verify application success
-    if success:
-        print("Attempting to verify application success with vision")
+    get_screenshot_prep().forget(job_link)
+    get_flows().finish(job_link, success)
+
+    # Verify application success; the page text is checked before spending a vision call
+    if success and confirmed(driver):
+        log("Success: Application successfully submitted (confirmation text on the page)")
+    elif success:
+        log("Attempting to verify application success with vision")
         # Take a final screenshot for verification
-        screenshot = take_screenshot()
+        screenshot = take_screenshot(driver)
         if not screenshot:
-            print("Failure: No screenshot available for verification")
+            log("Failure: No screenshot available for verification")
         else:
             try:
-                response = client.chat.completions.create(
-                    model="grok-beta",
-                    messages=[
-                        {
-                            "role": "system",
-                            "content": "You are a web automation assistant with vision capabilities. Analyze the provided screenshot of a job application page and determine if the application has been successfully submitted. Look for phrases like 'Application submitted', 'Thank you', or 'applied'. Return a JSON object with a key 'success' (boolean) and 'message' (string) describing the confirmation."
-                        },
-                        {
-                            "role": "user",
-                            "content": f"Check if the application is successfully submitted: data:image/png;base64,{screenshot}"
-                        }
-                    ]
-                )
-                print("Success: Grok API call completed for verification")
-                instructions = response.choices[0].message.content.strip()
-                print(f"Verification response: {instructions}")
+                reply = get_gateway().call("vision", [
+                    {
+                        "role": "system",
+                        "content": "You are a web automation assistant with vision capabilities. Analyze the provided screenshot of a job application page and determine if the application has been successfully submitted. Look for phrases like 'Application submitted', 'Thank you', or 'applied'. Return a JSON object with a key 'success' (boolean) and 'message' (string) describing the confirmation."
+                    },
+                    {
+                        "role": "user",
+                        "content": f"Check if the application is successfully submitted: {screenshot.data_url}"
+                    }
+                ])
+                log("Success: Grok API call completed for verification")
+                instructions = reply.strip()
+                log(f"Verification response: {instructions}")
                 json_match = re.search(r'\{.*\}', instructions, re.DOTALL)
                 if json_match:
                     instructions = json_match.group(0)
-                    print(f"Extracted verification JSON: {instructions}")
+                    log(f"Extracted verification JSON: {instructions}")
                 else:
-                    print("Failure: No JSON pattern found in verification response")
+                    log("Failure: No JSON pattern found in verification response")
                 verification = json.loads(instructions)
                 if verification.get("success", False):
-                    print(f"Success: Application successfully submitted (confirmed by vision): {verification.get('message', 'No message')}")
+                    log(f"Success: Application successfully submitted (confirmed by vision): {verification.get('message', 'No message')}")
                 else:
-                    print(f"Warning: Application may have been submitted, but no confirmation found: {verification.get('message', 'No message')}")
+                    log(f"Warning: Application may have been submitted, but no confirmation found: {verification.get('message', 'No message')}")
             except Exception as e:
-                print(f"Failure: Failed to verify application success with vision: {e}")
-                print("Warning: Application may have been submitted, but verification failed.")
+                log(f"Failure: Failed to verify application success with vision: {e}")
+                log("Warning: Application may have been submitted, but verification failed.")
     else:
-        print("Failure: Application process failed or did not complete.")
-
-def main():
-    # Scrape jobs from multiple sources
-    keyword = "software developer"
-    location = "remote"
-    
-    print("Scraping jobs from Indeed...")
-    indeed_jobs = scrape_jobs_indeed(keyword, location)
-    # Commenting out LinkedIn for now
-    # print("Scraping jobs from LinkedIn...")
-    # linkedin_jobs = scrape_jobs_linkedin(keyword, location)
-    print("Scraping jobs from Glassdoor...")
-    glassdoor_jobs = scrape_jobs_glassdoor(keyword, location)
-    print("Scraping jobs from X...")
-    x_jobs = scrape_jobs_x(keyword, location)
-
-    # Combine all jobs
-    jobs = indeed_jobs + [] + glassdoor_jobs + x_jobs  # Empty list replaces linkedin_jobs
-    print(f"Found {len(jobs)} jobs in total.")
-
-    # Limit to 10 jobs for testing
-    jobs = jobs[:2]
-
-    # Filter jobs
-    filtered_jobs = []
-    for job in jobs:
-        if filter_job(job["link"]):
-            filtered_jobs.append(job)
-            print(f"Success: Job matches: {job['title']} (Source: {job['source']})")
-        else:
-            print(f"Failure: Job does not match: {job['title']} (Source: {job['source']})")
-        time.sleep(2)  # Avoid overwhelming servers
-
-    # Apply to first 3 filtered jobs
-    for job in filtered_jobs[:3]:
-        print(f"Starting application process for: {job['link']}")
-        apply_to_job(job["link"])
-        time.sleep(5)  # Avoid overwhelming servers
-
-    driver.quit()
-    print("Success: Driver quit")
+        log("Failure: Application process failed or did not complete.")
+    return success
+
+# Print run summaries for whatever was actually used, then release it
+def close_resources():
+    if get_screenshot_prep.peek():
+        get_screenshot_prep().report()
+    if get_field_answers.peek():
+        get_field_answers().report()
+        get_field_answers().close()
+    if get_flows.peek():
+        get_flows().report()
+        get_flows().close()
+    jobs_pipeline.close_resources()
+
+def main(argv=None):
+    args = cli.build_parser("Scrape job boards with Grok vision, filter the postings and apply.").parse_args(argv)
+    workers = args.workers or MAX_WORKERS
+    max_applications = args.max_applications or MAX_APPLICATIONS
+
+    # Scrape jobs from multiple sources, for every keyword x location
+    keywords = args.queries or ["software developer"]
+    locations = args.locations or ["remote"]
+    max_pages = args.max_pages or MAX_PAGES
+
+    # Commenting out LinkedIn for now (scrape_jobs_linkedin)
+    scrapers = {
+        "Indeed": scrape_jobs_indeed,
+        "Glassdoor": scrape_jobs_glassdoor,
+        "X": scrape_jobs_x,
+    }
+
+    if args.dry_run:
+        cli.print_plan("jobbappVision.py", [(k, l) for k in keywords for l in locations], scrapers,
+                       workers, max_applications, max_pages=max_pages, incremental=not args.full_crawl)
+        return
+
+    # Spans for every stage, page load, LLM call and form action, summarized at the end
+    tracing.configure("jobbappVision", chrome_path=args.trace_chrome, otlp_endpoint=args.otlp_endpoint,
+                      verbosity=args.verbosity)
+
+    jobs_pipeline.run(args, keywords, locations, scrapers, snapshot_job, apply_to_job, workers=workers,
+                      max_applications=max_applications, max_pages=max_pages)
+    close_resources()
 
 if __name__ == "__main__":
-    main()
+    main(sys.argv[1:])
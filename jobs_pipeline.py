@@ -0,0 +1,314 @@
+import os
+import json
+from browser_pool import BrowserPool
+from browser_profiles import BrowserProfiles
+from politeness import Politeness
+from llm_gateway import LLMGateway
+from llm_cache import ResponseCache
+from page_ready import PageReadiness
+from posting_snapshot import PostingSnapshot
+from pipeline import Pipeline, Stage
+from dedup_index import DedupIndex
+from extractors import Extractor
+from http_fetch import HttpFetcher
+from crawl import Crawler, search_url, MAX_PAGES
+from ranker import Ranker
+from match_scoring import MatchScorer
+from prompts import PromptBuilder
+from cover_letter import CoverLetterWriter, cover_letter_path
+from job_ledger import JobLedger, reached
+from resources import lazy, fetch_resume, RESUME_URL, LOCAL_RESUME_PATH
+import tracing
+from tracing import log
+
+# The crawl -> dedup -> snapshot -> rank -> filter -> apply pipeline shared by
+# job_applier.py and jobbappVision.py, and the resources its stages use. Each
+# script passes in how it reads a posting in Chrome and how it applies.
+
+# Everything below is created on first use, so importing this module (for a test,
+# a dry run or scraping only) never touches the network, disk caches or Chrome.
+
+# Initialize Grok gateway (async client with rate limiting, retries and an on-disk reply cache)
+@lazy
+def get_gateway():
+    from dotenv import load_dotenv
+    load_dotenv()  # Load environment variables
+    return LLMGateway(api_key=os.getenv("XAI_API_KEY"), cache=ResponseCache())
+
+# Resume is only downloaded when missing or changed on GitHub
+@lazy
+def get_resume_path():
+    return fetch_resume(RESUME_URL, LOCAL_RESUME_PATH)
+
+# Load profile and update resume path
+@lazy
+def get_profile():
+    with open("profile.json", "r") as f:
+        profile = json.load(f)
+    profile["resume"] = LOCAL_RESUME_PATH  # Update the resume path dynamically
+    return profile
+
+# Cross-board, cross-run index of postings already seen or applied to
+@lazy
+def get_dedup():
+    return DedupIndex()
+
+# Per-host pacing, robots.txt crawl-delay and 429/captcha backoff for every page load
+@lazy
+def get_politeness():
+    return Politeness()
+
+# Event-driven page readiness (replaces fixed sleeps after navigation and clicks)
+@lazy
+def get_readiness():
+    return PageReadiness(politeness=get_politeness())
+
+# DOM/JSON-LD first extraction; the scripts' fallbacks (e.g. vision) are the last resort
+@lazy
+def get_extractor():
+    return Extractor()
+
+# Pooled keep-alive HTTP client for server-rendered pages; only JS-dependent ones open Chrome
+@lazy
+def get_fetcher():
+    return HttpFetcher(politeness=get_politeness())
+
+# Lean Chrome sessions (no images, fonts or trackers) with warm on-disk profiles
+@lazy
+def get_profiles():
+    return BrowserProfiles()
+
+# Local TF-IDF match score; only the best-scoring postings reach the LLM filter
+@lazy
+def get_ranker():
+    return Ranker(get_profile())
+
+# Compact per-task profile block, sent first so every call of a task shares its prompt prefix
+@lazy
+def get_prompts():
+    return PromptBuilder(get_profile())
+
+# Batched, structured-output LLM match scores (several postings per request)
+@lazy
+def get_scorer():
+    return MatchScorer(get_gateway(), get_profile(), prompts=get_prompts())
+
+# Cover letters from the profile template plus one short LLM-written paragraph
+@lazy
+def get_cover_letters():
+    return CoverLetterWriter(get_gateway(), get_profile(), get_prompts())
+
+# Per-posting state and stage artifacts, so --resume continues where a run stopped
+@lazy
+def get_ledger():
+    return JobLedger()
+
+# Concurrency limit for scrape/filter/apply workers (one pooled Chrome session each)
+MAX_WORKERS = int(os.getenv("JOB_APPLIER_WORKERS", "3"))
+MAX_APPLICATIONS = 3
+
+# A server-rendered posting read over plain HTTP, or None if it needs the browser
+def fetch_snapshot(job_link):
+    return get_fetcher().snapshot(job_link, get_extractor())
+
+# A recycled or closed Chrome session's network monitor is folded into the readiness totals
+def forget_session(driver):
+    if get_readiness.peek():
+        get_readiness().forget(driver)
+
+# Print run summaries for whatever was actually used, then release it
+def close_resources():
+    if get_gateway.peek():
+        get_gateway().close()
+    if get_readiness.peek():
+        get_readiness().report()
+    if get_extractor.peek():
+        get_extractor().report()
+    if get_fetcher.peek():
+        get_fetcher().report()
+        get_fetcher().close()
+    if get_profiles.peek():
+        get_profiles().report()
+    if get_politeness.peek():
+        get_politeness().report()
+    if get_ranker.peek():
+        get_ranker().report()
+    if get_scorer.peek():
+        get_scorer().report()
+    if get_cover_letters.peek():
+        get_cover_letters().report()
+    if get_prompts.peek():
+        get_prompts().report()
+    if get_ledger.peek():
+        get_ledger().report()
+        get_ledger().close()
+    if get_dedup.peek():
+        get_dedup().report()
+    tracing.tracer().close()
+
+def run(args, keywords, locations, scrapers, snapshot_job, apply_to_job, workers=MAX_WORKERS,
+        max_applications=MAX_APPLICATIONS, max_pages=MAX_PAGES):
+    """
+    Crawl every keyword x location, filter and apply, for the flags of
+    cli.build_parser(). `scrapers` maps each board to scraper(driver, keyword,
+    location, page) for results pages that need JavaScript, or to None for
+    boards read over plain HTTP only. snapshot_job(driver, link) loads a posting
+    in Chrome and returns its PostingSnapshot; apply_to_job(driver, link,
+    snapshot, job) applies and returns True on success.
+    """
+    with BrowserPool(profiles=get_profiles(), on_discard=forget_session) as pool:
+        # Server-rendered results pages are read over plain HTTP; the others get a
+        # pooled session only while they are being read
+        def fetch_page(source, scraper):
+            def fetch(keyword, location, page):
+                jobs = get_fetcher().cards(search_url(source, keyword, location, page), source, get_extractor())
+                if jobs or scraper is None:
+                    return jobs or []
+                with pool.driver() as driver:
+                    return scraper(driver, keyword, location, page)
+            return fetch
+
+        crawler = Crawler({source: fetch_page(source, scraper) for source, scraper in scrapers.items()},
+                          max_pages=max_pages, incremental=not args.full_crawl)
+        tasks = crawler.tasks(keywords, locations)
+        # Unfinished postings of earlier runs go in first, ahead of the crawl
+        resumed = get_ledger().pending() if args.resume and not args.scrape_only else []
+        resumed_urls = {job["canonical_url"] for job in resumed}
+        if resumed:
+            log(f"Resuming {len(resumed)} unfinished postings from earlier runs")
+        # An application a run stopped in the middle of may already be submitted: never redo it
+        interrupted = get_ledger().interrupted() if not args.scrape_only else []
+        interrupted_urls = {job["canonical_url"] for job in interrupted}
+        for job in interrupted:
+            log(f"Warning: Interrupted while applying, check by hand: {job['title']} {job['link']}")
+
+        # Crawl every board x query at once; each page's jobs flow on as soon as it is read
+        def scrape_stage(task):
+            if isinstance(task, dict):  # A resumed posting, already scraped
+                return [task]
+            return crawler.crawl(task)
+
+        # Drop postings already seen on another board or in an earlier run
+        def dedup_stage(job):
+            url = get_dedup().canonical(job["link"]) if "state" not in job else None
+            if url in resumed_urls:
+                return []  # Coming back from the ledger with its artifacts instead
+            if url in interrupted_urls:
+                return []
+            if not get_dedup().claim_url(job):
+                return []
+            if "state" not in job and not args.scrape_only:
+                get_ledger().advance(job, "scraped")
+            tracing.count("postings")
+            return [job]
+
+        # Snapshot each posting over plain HTTP, or on a pooled session (released before
+        # emitting) when its board needs JavaScript; resumed postings already have their
+        # description
+        def snapshot_stage(job):
+            if job.get("description"):
+                snapshot = PostingSnapshot(url=job["link"], final_url=job["link"], description=job["description"])
+            else:
+                snapshot = fetch_snapshot(job["link"])
+            if snapshot is None:
+                with pool.driver() as driver:
+                    snapshot = snapshot_job(driver, job["link"])
+            if snapshot.description is None:
+                log(f"Job does not match: {job['title']} (no description)")
+                get_ledger().advance(job, "rejected", error="no description")
+                return []
+            if not reached(job, "described"):
+                get_ledger().advance(job, "described", description=snapshot.description)
+            # Near-duplicate check (company + title + description) before any LLM work
+            if not get_dedup().claim_content(job, snapshot.description):
+                return []
+            job["snapshot"] = snapshot
+            return [job]
+
+        # Snapshot workers take the posting whose host is free soonest (resumed ones load nothing),
+        # so a host being paced doesn't idle them; apply keeps best-first order and waits its turn
+        def snapshot_inbox(maxsize):
+            return get_politeness().queue(lambda job: None if job.get("description") else job["link"], maxsize)
+
+        # Cheap local score first; postings below the threshold never cost an LLM call
+        def rank_stage(job):
+            if "score" not in job:
+                job["score"] = get_ranker().score(job["snapshot"].description)
+            if job["score"] < get_ranker().threshold:
+                log(f"Job does not match: {job['title']} (score {job['score']:.2f})")
+                get_dedup().record(job, "rejected")
+                get_ledger().advance(job, "rejected", rank_score=job["score"])
+                return []
+            if not reached(job, "scored"):  # A resumed match keeps its state, and its LLM result
+                get_ledger().advance(job, "described", rank_score=job["score"])
+            return [job]
+
+        # Released window by window during the crawl, best first: only the top K of each
+        # window are scored by the LLM, a batch of postings per request
+        shortlist = get_ranker().best_first()
+
+        # Matches of each window go on to the apply stage best first
+        def filter_shortlist(jobs):
+            if not jobs:
+                return []
+            # Resumed postings the LLM already matched go straight on
+            matched = [job for job in jobs if job.get("state") == "scored"]
+            jobs = [job for job in jobs if job.get("state") != "scored"]
+            results = get_scorer().score_many([
+                {"title": job["title"], "company": job.get("company"), "description": job["snapshot"].description}
+                for job in jobs
+            ])
+            for job, result in zip(jobs, results):
+                if result is not None and result["match"]:
+                    job["match"] = result
+                    log(f"Job matches: {job['title']} (Source: {job.get('source')}, match {result['score']}, "
+                        f"rank {job['score']:.2f})")
+                    get_ledger().advance(job, "scored", match=result)
+                    matched.append(job)
+                    continue
+                reason = f"match {result['score']}, gaps: {', '.join(result['gaps']) or 'none'}" if result else "could not be scored"
+                log(f"Job does not match: {job['title']} (Source: {job.get('source')}, {reason})")
+                if result is not None:  # Unscored postings get another chance next run
+                    get_dedup().record(job, "rejected")
+                    get_ledger().advance(job, "rejected", match=result)
+            return sorted(matched, key=lambda job: (job["match"]["score"], job["score"]), reverse=True)
+
+        # Prefer the session still showing the posting so apply can skip navigation
+        def apply_stage(job):
+            get_ledger().advance(job, "applying")
+            try:
+                with pool.driver(prefer_url=job["snapshot"].final_url) as driver:
+                    applied = apply_to_job(driver, job["link"], job["snapshot"], job)
+            except Exception as e:
+                get_ledger().advance(job, "failed", error=str(e))
+                raise
+            get_dedup().record(job, "applied" if applied else "failed")
+            get_ledger().advance(job, "applied" if applied else "failed", cover_letter=cover_letter_path(job["link"]))
+            tracing.count("applied" if applied else "failed")
+            return [job]
+
+        # Scraping only needs the crawl and dedup stages (a browser only for boards that need one)
+        if args.scrape_only:
+            pipeline = Pipeline([
+                Stage("scrape", scrape_stage, workers=min(len(tasks), workers)),
+                Stage("dedup", dedup_stage, workers=1),
+            ])
+            for job in pipeline.run(tasks):
+                print(f"{job['title']} ({job['source']}): {job['link']}")
+        else:
+            # Each stage starts as soon as the one before it emits its first job
+            pipeline = Pipeline([
+                Stage("scrape", scrape_stage, workers=min(len(tasks), workers)),
+                Stage("dedup", dedup_stage, workers=1),
+                Stage("snapshot", snapshot_stage, workers=workers, inbox=snapshot_inbox),
+                Stage("rank", rank_stage, workers=1),
+                Stage("filter", lambda job: filter_shortlist(shortlist.add(job)), workers=1,
+                      flush=lambda: filter_shortlist(shortlist.flush())),
+                # Apply to the best matches of each window as they come, up to max_applications
+                Stage("apply", apply_stage, workers=workers, max_items=max_applications),
+            ])
+            for job in pipeline.run(resumed + tasks):
+                log(f"Finished application for: {job['title']} ({job['link']})")
+        pipeline.report()
+        crawler.report()
+        crawler.close()
@@ -0,0 +1,186 @@
+import os
+import re
+import json
+import time
+import sqlite3
+import hashlib
+import threading
+
+CACHE_PATH = os.getenv("LLM_CACHE_PATH", "llm_cache.sqlite3")
+PROFILE_PATH = "profile.json"
+
+# Only text prompts are worth caching; screenshots never repeat byte-for-byte
+CACHEABLE_ENDPOINTS = {"filter", "cover_letter", "essay"}
+
+DEFAULT_TTL = 14 * 24 * 3600  # Job postings and answers go stale after two weeks
+DEFAULT_MAX_ENTRIES = 5000
+DEFAULT_MAX_BYTES = 50 * 1024 * 1024
+
+def normalize_text(text):
+    """Case- and whitespace-insensitive form so trivially different inputs share a key."""
+    return re.sub(r"\s+", " ", str(text)).strip().lower()
+
+def profile_version(path=PROFILE_PATH):
+    """Content hash of profile.json; changes whenever the profile is edited."""
+    try:
+        with open(path, "rb") as f:
+            return hashlib.sha256(f.read()).hexdigest()[:16]
+    except OSError:
+        return "no-profile"
+
+class ResponseCache:
+    """
+    On-disk, content-addressed cache of LLM replies backed by SQLite.
+    Keys hash (model, system prompt, profile version, normalized input), so a
+    reply is only reused for the same question asked with the same profile.
+    Entries expire after `ttl` seconds and the least recently used ones are
+    evicted once the cache grows past `max_entries` or `max_bytes`. Entries built
+    from an older profile.json are purged as soon as the profile changes.
+    """
+
+    def __init__(self, path=CACHE_PATH, ttl=DEFAULT_TTL, max_entries=DEFAULT_MAX_ENTRIES,
+                 max_bytes=DEFAULT_MAX_BYTES, profile_path=PROFILE_PATH,
+                 endpoints=CACHEABLE_ENDPOINTS):
+        self.path = path
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.profile_path = profile_path
+        self.endpoints = set(endpoints)
+        self.hits = 0
+        self.misses = 0
+        self.expired = 0
+        self.evicted = 0
+        self.stale = 0
+        self._lock = threading.Lock()
+        self._profile_mtime = None
+        self._profile_version = None
+        self._db = None
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("""
+            CREATE TABLE IF NOT EXISTS responses (
+                key TEXT PRIMARY KEY,
+                endpoint TEXT NOT NULL,
+                profile_version TEXT NOT NULL,
+                response TEXT NOT NULL,
+                size INTEGER NOT NULL,
+                created_at REAL NOT NULL,
+                accessed_at REAL NOT NULL
+            )
+        """)
+        self._conn.execute("CREATE INDEX IF NOT EXISTS idx_responses_accessed ON responses(accessed_at)")
+        self._conn.commit()
+        self.current_profile_version()
+
+    @property
+    def _conn(self):
+        # Reopened on first use after close(), so an owner may close and keep using it
+        if self._db is None:
+            self._db = sqlite3.connect(self.path, check_same_thread=False)
+        return self._db
+
+    def current_profile_version(self):
+        """Re-hash profile.json only when its mtime moves, purging stale entries if it changed."""
+        try:
+            mtime = os.stat(self.profile_path).st_mtime
+        except OSError:
+            mtime = None
+        if mtime != self._profile_mtime or self._profile_version is None:
+            self._profile_mtime = mtime
+            version = profile_version(self.profile_path)
+            if version != self._profile_version:
+                self._profile_version = version
+                self._purge_stale(version)
+        return self._profile_version
+
+    def _purge_stale(self, version):
+        with self._lock:
+            cursor = self._conn.execute("DELETE FROM responses WHERE profile_version != ?", (version,))
+            self._conn.commit()
+        if cursor.rowcount:
+            self.stale += cursor.rowcount
+            print(f"LLM cache: profile changed, dropped {cursor.rowcount} stale entries")
+
+    def make_key(self, model, messages, **params):
+        system = "\n".join(str(m.get("content", "")) for m in messages if m.get("role") == "system")
+        conversation = [(m.get("role"), normalize_text(m.get("content", "")))
+                        for m in messages if m.get("role") != "system"]
+        payload = json.dumps([model, system, self.current_profile_version(), conversation,
+                              sorted(params.items())], default=str)
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+    def get(self, key):
+        now = time.time()
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT response, created_at FROM responses WHERE key = ?", (key,)
+            ).fetchone()
+            if row is None:
+                self.misses += 1
+                return None
+            response, created_at = row
+            if self.ttl and now - created_at > self.ttl:
+                self._conn.execute("DELETE FROM responses WHERE key = ?", (key,))
+                self._conn.commit()
+                self.expired += 1
+                self.misses += 1
+                return None
+            self._conn.execute("UPDATE responses SET accessed_at = ? WHERE key = ?", (now, key))
+            self._conn.commit()
+            self.hits += 1
+            return response
+
+    def put(self, key, endpoint, response):
+        now = time.time()
+        size = len(response.encode("utf-8"))
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO responses VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (key, endpoint, self._profile_version, response, size, now, now),
+            )
+            self._evict()
+            self._conn.commit()
+
+    def _evict(self):
+        count, total = self._conn.execute("SELECT COUNT(*), COALESCE(SUM(size), 0) FROM responses").fetchone()
+        if count <= self.max_entries and total <= self.max_bytes:
+            return
+        # Walk from least recently used until both limits hold again
+        doomed = []
+        for key, size in self._conn.execute("SELECT key, size FROM responses ORDER BY accessed_at"):
+            if count <= self.max_entries and total <= self.max_bytes:
+                break
+            doomed.append((key,))
+            count -= 1
+            total -= size
+        self._conn.executemany("DELETE FROM responses WHERE key = ?", doomed)
+        self.evicted += len(doomed)
+
+    def stats(self):
+        lookups = self.hits + self.misses
+        with self._lock:
+            entries, total = self._conn.execute(
+                "SELECT COUNT(*), COALESCE(SUM(size), 0) FROM responses"
+            ).fetchone()
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+            "expired": self.expired,
+            "evicted": self.evicted,
+            "stale": self.stale,
+            "entries": entries,
+            "bytes": total,
+        }
+
+    def report(self):
+        s = self.stats()
+        print(f"LLM cache: {s['hits']} hits, {s['misses']} misses ({s['hit_rate']:.0%} hit rate), "
+              f"{s['expired']} expired, {s['evicted']} evicted, {s['stale']} stale, "
+              f"{s['entries']} entries / {s['bytes'] / 1024:.0f} KiB on disk")
+
+    def close(self):
+        with self._lock:
+            if self._db is not None:
+                self._db.close()
+                self._db = None
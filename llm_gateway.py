@@ -0,0 +1,277 @@
+import os
+import time
+import random
+import asyncio
+import threading
+import tracing
+
+XAI_BASE_URL = os.getenv("XAI_BASE_URL", "https://api.x.ai/v1")
+DEFAULT_MODEL = "grok-beta"
+
+# Max in-flight requests per call site; vision payloads are heavy so keep them low
+ENDPOINT_LIMITS = {
+    "filter": 16,
+    "cover_letter": 4,
+    "essay": 4,
+    "vision": 4,
+}
+DEFAULT_ENDPOINT_LIMIT = 4
+
+# Provider-wide request rate (requests/second) and burst size for the token bucket
+DEFAULT_RATE = float(os.getenv("LLM_RATE_LIMIT", "5"))
+DEFAULT_BURST = int(os.getenv("LLM_RATE_BURST", "10"))
+
+class TokenBucket:
+    """Async token bucket: `rate` tokens per second, holding at most `capacity`."""
+
+    def __init__(self, rate, capacity):
+        self.rate = rate
+        self.capacity = capacity
+        self.tokens = capacity
+        self.updated = time.monotonic()
+        self._lock = None
+        self._loop = None
+
+    async def acquire(self, tokens=1):
+        # The lock belongs to the loop it was made on; the gateway starts a new loop after close()
+        loop = asyncio.get_running_loop()
+        if self._loop is not loop:
+            self._lock = asyncio.Lock()
+            self._loop = loop
+        async with self._lock:
+            while True:
+                now = time.monotonic()
+                self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+                self.updated = now
+                if self.tokens >= tokens:
+                    self.tokens -= tokens
+                    return
+                await asyncio.sleep((tokens - self.tokens) / self.rate)
+
+def is_retryable(error):
+    """429s, 5xx responses and dropped connections are worth another try."""
+    from openai import APIConnectionError, APIStatusError, RateLimitError
+    if isinstance(error, (RateLimitError, APIConnectionError)):
+        return True
+    return isinstance(error, APIStatusError) and error.status_code >= 500
+
+def retry_after(error):
+    """Seconds the server asked us to wait, if it sent a Retry-After header."""
+    response = getattr(error, "response", None)
+    if response is None:
+        return None
+    try:
+        return float(response.headers.get("retry-after"))
+    except (TypeError, ValueError):
+        return None
+
+class LLMGateway:
+    """
+    Async front door for every Grok call.
+    Each call names its endpoint ("filter", "cover_letter", "essay", "vision"),
+    which picks a concurrency semaphore. All endpoints share one token bucket for
+    the provider rate limit, and retryable failures back off with full jitter.
+    With a ResponseCache attached, replies for cacheable endpoints are served
+    from disk when the same prompt was answered before.
+    `complete`/`complete_many` are awaitable on the gateway's event loop;
+    threaded callers use `call`/`call_many`, which run on a background loop.
+    """
+
+    def __init__(self, api_key=None, base_url=None, model=DEFAULT_MODEL, limits=None,
+                 rate=DEFAULT_RATE, burst=DEFAULT_BURST, max_retries=4,
+                 backoff_base=0.5, backoff_cap=20.0, timeout=60, cache=None):
+        self.api_key = api_key or os.getenv("XAI_API_KEY")
+        self.base_url = base_url or XAI_BASE_URL
+        self.model = model
+        self.limits = dict(ENDPOINT_LIMITS, **(limits or {}))
+        self.bucket = TokenBucket(rate, burst)
+        self.max_retries = max_retries
+        self.backoff_base = backoff_base
+        self.backoff_cap = backoff_cap
+        self.timeout = timeout
+        self.cache = cache
+        self.usage = {}  # endpoint -> token counts reported by the provider
+        self._usage_lock = threading.Lock()
+        self._client = None
+        self._semaphores = {}
+        self._loop = None
+        self._thread = None
+        self._start_lock = threading.Lock()
+
+    @property
+    def client(self):
+        if self._client is None:
+            # Imported on first use: openai alone costs ~1s of startup
+            from openai import AsyncOpenAI
+            # Retries are handled here so they respect the rate limiter
+            self._client = AsyncOpenAI(api_key=self.api_key, base_url=self.base_url,
+                                       max_retries=0, timeout=self.timeout)
+        return self._client
+
+    def _semaphore(self, endpoint):
+        if endpoint not in self._semaphores:
+            self._semaphores[endpoint] = asyncio.Semaphore(self.limits.get(endpoint, DEFAULT_ENDPOINT_LIMIT))
+        return self._semaphores[endpoint]
+
+    def _backoff(self, attempt, error):
+        delay = retry_after(error)
+        if delay is None:
+            delay = random.uniform(0, min(self.backoff_cap, self.backoff_base * 2 ** attempt))
+        return delay
+
+    async def complete(self, endpoint, messages, model=None, **kwargs):
+        """Send one chat completion and return the reply text."""
+        model = model or self.model
+        cache_key = None
+        if self.cache is not None and endpoint in self.cache.endpoints:
+            params = {k: v for k, v in kwargs.items() if k != "timeout"}
+            cache_key = self.cache.make_key(model, messages, **params)
+            cached = self.cache.get(cache_key)
+            if cached is not None:
+                return cached
+        reply = await self._request(endpoint, messages, model, **kwargs)
+        if cache_key is not None and reply:
+            self.cache.put(cache_key, endpoint, reply)
+        return reply
+
+    async def _request(self, endpoint, messages, model, **kwargs):
+        async with self._semaphore(endpoint):
+            attempt = 0
+            while True:
+                await self.bucket.acquire()
+                try:
+                    with tracing.span("llm", endpoint=endpoint, model=model, attempt=attempt) as span:
+                        response = await self.client.chat.completions.create(
+                            model=model, messages=messages, **kwargs
+                        )
+                        usage = getattr(response, "usage", None)
+                        if usage is not None:
+                            span["tokens_in"], span["tokens_out"] = usage.prompt_tokens, usage.completion_tokens
+                    self._record_usage(endpoint, usage)
+                    return response.choices[0].message.content
+                except Exception as e:
+                    if attempt >= self.max_retries or not is_retryable(e):
+                        raise
+                    delay = self._backoff(attempt, e)
+                    print(f"LLM {endpoint}: retrying in {delay:.1f}s after error: {e}")
+                    attempt += 1
+                    await asyncio.sleep(delay)
+
+    async def stream(self, endpoint, messages, model=None, stop_at=None, **kwargs):
+        """
+        Stream one chat completion and return the reply text. With `stop_at`, reading
+        stops as soon as that string appears after some text (e.g. "\n\n" to keep
+        one paragraph), so the rest is never waited for. Retries only happen before
+        the first chunk arrives. Streamed replies bypass the response cache.
+        """
+        model = model or self.model
+        async with self._semaphore(endpoint):
+            attempt = 0
+            while True:
+                await self.bucket.acquire()
+                parts = []
+                try:
+                    with tracing.span("llm", endpoint=endpoint, model=model, attempt=attempt, stream=True) as span:
+                        response = await self.client.chat.completions.create(
+                            model=model, messages=messages, stream=True, **kwargs
+                        )
+                        try:
+                            async for chunk in response:
+                                if chunk.choices and chunk.choices[0].delta.content:
+                                    parts.append(chunk.choices[0].delta.content)
+                                    if stop_at and stop_at in "".join(parts).lstrip():
+                                        break
+                        finally:
+                            await response.close()
+                        # Streams carry no usage; chunks are roughly one token each
+                        span["tokens_in"] = sum(len(m["content"]) for m in messages) // 4
+                        span["tokens_out"] = len(parts)
+                    text = "".join(parts).lstrip()
+                    return text.split(stop_at)[0] if stop_at else text
+                except Exception as e:
+                    if parts or attempt >= self.max_retries or not is_retryable(e):
+                        raise
+                    delay = self._backoff(attempt, e)
+                    print(f"LLM {endpoint}: retrying in {delay:.1f}s after error: {e}")
+                    attempt += 1
+                    await asyncio.sleep(delay)
+
+    def _record_usage(self, endpoint, usage):
+        if usage is None:
+            return
+        details = getattr(usage, "prompt_tokens_details", None)
+        with self._usage_lock:
+            counts = self.usage.setdefault(endpoint, {"calls": 0, "prompt": 0, "cached": 0, "completion": 0})
+            counts["calls"] += 1
+            counts["prompt"] += usage.prompt_tokens or 0
+            counts["cached"] += (getattr(details, "cached_tokens", 0) or 0) if details else 0
+            counts["completion"] += usage.completion_tokens or 0
+
+    def report_usage(self):
+        if not self.usage:
+            return
+        print("LLM token usage:")
+        for endpoint, counts in self.usage.items():
+            print(f"  {endpoint}: {counts['calls']} calls, {counts['prompt']} prompt tokens "
+                  f"({counts['cached']} served from the provider's prompt cache), "
+                  f"{counts['completion']} completion tokens")
+
+    async def complete_many(self, endpoint, batch, model=None, **kwargs):
+        """
+        Send many conversations at once; the batch finishes about as fast as its
+        slowest requests. Failed items come back as the exception instead of a reply.
+        """
+        tasks = [self.complete(endpoint, messages, model=model, **kwargs) for messages in batch]
+        return await asyncio.gather(*tasks, return_exceptions=True)
+
+    def _ensure_loop(self):
+        with self._start_lock:
+            if self._loop is None:
+                self._loop = asyncio.new_event_loop()
+                self._thread = threading.Thread(target=self._loop.run_forever,
+                                                name="llm-gateway", daemon=True)
+                self._thread.start()
+        return self._loop
+
+    def run(self, coro):
+        """Run a coroutine on the gateway loop from synchronous code and wait for it."""
+        return asyncio.run_coroutine_threadsafe(coro, self._ensure_loop()).result()
+
+    def call(self, endpoint, messages, **kwargs):
+        return self.run(self.complete(endpoint, messages, **kwargs))
+
+    def call_many(self, endpoint, batch, **kwargs):
+        return self.run(self.complete_many(endpoint, batch, **kwargs))
+
+    def call_stream(self, endpoint, messages, **kwargs):
+        return self.run(self.stream(endpoint, messages, **kwargs))
+
+    def close(self):
+        """Stop the event loop and close the response cache; a later call starts both again."""
+        if self._loop is not None:
+            if self._client is not None:
+                self.run(self._client.close())
+            self._loop.call_soon_threadsafe(self._loop.stop)
+            self._thread.join(timeout=5)
+            self._loop = None
+            self._client = None
+            self._semaphores = {}
+            self.report_usage()
+            if self.cache is not None:
+                self.cache.report()
+        if self.cache is not None:
+            self.cache.close()
+
+if __name__ == "__main__":
+    # Smoke benchmark: point XAI_BASE_URL at mock_openai_server.py and compare
+    # wall time for a concurrent batch against the sum of request latencies.
+    import sys
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 100
+    gateway = LLMGateway(api_key=os.getenv("XAI_API_KEY", "test"), rate=1000, burst=1000)
+    batch = [[{"role": "user", "content": f"Does job {i} match? Answer yes or no."}] for i in range(count)]
+    start = time.perf_counter()
+    replies = gateway.call_many("filter", batch)
+    elapsed = time.perf_counter() - start
+    failures = sum(isinstance(r, Exception) for r in replies)
+    print(f"{count} requests in {elapsed:.2f}s ({failures} failed)")
+    gateway.close()
@@ -0,0 +1,186 @@
+import os
+import re
+import json
+import threading
+from prompts import PromptBuilder
+
+BATCH_SIZE = int(os.getenv("MATCH_BATCH_SIZE", "8"))
+MIN_SCORE = int(os.getenv("MATCH_MIN_SCORE", "70"))  # 0-100; at or above counts as a match
+SUMMARY_CHARS = 1500  # Per posting; requirements survive, boilerplate is dropped first
+
+# Structured-output schema for one batch; the same shape is spelled out in the
+# prompt for models that ignore response_format
+RESPONSE_SCHEMA = {
+    "type": "object",
+    "properties": {
+        "results": {
+            "type": "array",
+            "items": {
+                "type": "object",
+                "properties": {
+                    "id": {"type": "integer"},
+                    "score": {"type": "integer", "minimum": 0, "maximum": 100},
+                    "gaps": {"type": "array", "items": {"type": "string"}},
+                    "reasoning": {"type": "string"},
+                },
+                "required": ["id", "score", "gaps", "reasoning"],
+                "additionalProperties": False,
+            },
+        },
+    },
+    "required": ["results"],
+    "additionalProperties": False,
+}
+
+# {min_score} is filled in with the scorer's threshold, so the model and the filter agree on a match
+INSTRUCTIONS = (
+    "You are a job application assistant. Score how well each job posting fits the candidate above, "
+    "0-100 ({min_score}+ means the candidate meets the must-have requirements). For each posting list "
+    "the must-have requirements the candidate lacks as 'gaps' and give one sentence of 'reasoning'. "
+    'Reply with JSON only: {{"results": [{{"id": <posting id>, "score": <0-100>, "gaps": [...], '
+    '"reasoning": "..."}}]}}, one entry per posting.'
+)
+
+# Lines that never change the decision: EEO statements, perks, application instructions
+_BOILERPLATE = re.compile(
+    r"equal opportunity|eeo|without regard to|reasonable accommodation|benefits include|"
+    r"401\(?k\)?|paid time off|pto\b|dental|vision insurance|click apply|how to apply|about us",
+    re.IGNORECASE,
+)
+
+def summarize(description, max_chars=SUMMARY_CHARS):
+    """Description with boilerplate lines dropped and collapsed whitespace, cut to max_chars."""
+    lines = [re.sub(r"\s+", " ", line).strip() for line in (description or "").splitlines()]
+    kept = [line for line in lines if line and not _BOILERPLATE.search(line)]
+    text = " | ".join(kept)
+    return text if len(text) <= max_chars else text[:max_chars].rsplit(" ", 1)[0] + " ..."
+
+def validate(reply, ids):
+    """
+    Results keyed by posting id; raises ValueError unless every id got a
+    well-formed entry. Entries for ids outside the batch are ignored.
+    """
+    match = re.search(r"\{.*\}", reply or "", re.DOTALL)
+    if not match:
+        raise ValueError("no JSON object in reply")
+    data = json.loads(match.group(0))
+    entries = data.get("results") if isinstance(data, dict) else None
+    if not isinstance(entries, list):
+        raise ValueError("reply has no 'results' list")
+    results = {}
+    for entry in entries:
+        if not isinstance(entry, dict):
+            raise ValueError(f"result is not an object: {entry!r}")
+        try:
+            posting_id = int(entry["id"])
+            score = int(entry["score"])
+        except (KeyError, TypeError, ValueError):
+            raise ValueError(f"result without a numeric id/score: {entry!r}")
+        if posting_id not in ids:
+            continue  # Not one of this batch's postings, and must not overwrite another batch's result
+        gaps = entry.get("gaps", [])
+        if not 0 <= score <= 100 or not isinstance(gaps, list) or not isinstance(entry.get("reasoning", ""), str):
+            raise ValueError(f"malformed result: {entry!r}")
+        results[posting_id] = {"score": score, "gaps": [str(g) for g in gaps],
+                               "reasoning": entry.get("reasoning", "")}
+    missing = set(ids) - set(results)
+    if missing:
+        raise ValueError(f"no result for postings {sorted(missing)}")
+    return results
+
+class MatchScorer:
+    """
+    Scores many postings against the profile with one structured-output LLM call
+    per batch. Replies are validated against RESPONSE_SCHEMA; a batch that fails
+    (API error or invalid output) is split in half and each half retried, down to
+    single postings, so one bad posting can't sink its whole batch.
+    """
+
+    def __init__(self, gateway, profile, batch_size=BATCH_SIZE, min_score=MIN_SCORE,
+                 summary_chars=SUMMARY_CHARS, endpoint="filter", prompts=None):
+        self.gateway = gateway
+        self.prompts = prompts or PromptBuilder(profile)
+        self.batch_size = max(1, batch_size)
+        self.min_score = min_score
+        self.summary_chars = summary_chars
+        self.endpoint = endpoint
+        self.structured = True  # Cleared if the provider rejects response_format
+        self.requests = 0
+        self.splits = 0
+        self.failed = 0
+        self.prompt_chars = 0
+        self._lock = threading.Lock()
+
+    def messages(self, postings):
+        blocks = []
+        for posting_id, posting in postings:
+            header = " at ".join(filter(None, [posting.get("title"), posting.get("company")]))
+            blocks.append(f"[{posting_id}] {header or 'Untitled'}\n"
+                          f"{summarize(posting.get('description'), self.summary_chars)}")
+        return self.prompts.messages("filter", INSTRUCTIONS.format(min_score=self.min_score),
+                                     "Postings:\n" + "\n\n".join(blocks))
+
+    def _kwargs(self):
+        if not self.structured:
+            return {}
+        return {"response_format": {"type": "json_schema",
+                                    "json_schema": {"name": "match_scores", "strict": True,
+                                                    "schema": RESPONSE_SCHEMA}}}
+
+    def score_many(self, postings):
+        """
+        One result per posting dict ({"title", "company", "description"}):
+        {"score", "gaps", "reasoning", "match"}, or None if it could not be scored.
+        """
+        numbered = list(enumerate(postings))
+        batches = [numbered[i:i + self.batch_size] for i in range(0, len(numbered), self.batch_size)]
+        results = {}
+        while batches:
+            batch_messages = [self.messages(batch) for batch in batches]
+            with self._lock:
+                self.requests += len(batches)
+                self.prompt_chars += sum(len(m["content"]) for msgs in batch_messages for m in msgs)
+            structured = self.structured  # The mode this round's requests were sent in
+            replies = self.gateway.call_many(self.endpoint, batch_messages, **self._kwargs())
+            retry = []
+            for batch, reply in zip(batches, replies):
+                try:
+                    if isinstance(reply, Exception):
+                        # Rejected response_format fails every batch of the round: each is retried whole
+                        if structured and _rejects_response_format(reply):
+                            if self.structured:
+                                print("Match scoring: provider rejected response_format, "
+                                      "falling back to prompt-only JSON")
+                                self.structured = False
+                            retry.append(batch)
+                            continue
+                        raise reply
+                    results.update(validate(reply, [posting_id for posting_id, _ in batch]))
+                except Exception as e:
+                    if len(batch) > 1:
+                        half = len(batch) // 2
+                        print(f"Match scoring: batch of {len(batch)} failed ({e}), retrying as {half} + {len(batch) - half}")
+                        with self._lock:
+                            self.splits += 1
+                        retry.extend([batch[:half], batch[half:]])
+                    else:
+                        print(f"Match scoring: could not score posting {batch[0][0]}: {e}")
+                        with self._lock:
+                            self.failed += 1
+            batches = retry
+        scored = []
+        for posting_id, _ in numbered:
+            result = results.get(posting_id)
+            if result is not None:
+                result = dict(result, match=result["score"] >= self.min_score)
+            scored.append(result)
+        return scored
+
+    def report(self):
+        if self.requests:
+            print(f"Match scoring: {self.requests} requests ({self.splits} batch splits, "
+                  f"{self.failed} postings unscored), ~{self.prompt_chars // 4} prompt tokens")
+
+def _rejects_response_format(error):
+    status = getattr(error, "status_code", None)
+    return status in (400, 422) and "response_format" in str(error)
@@ -0,0 +1,138 @@
+import json
+import time
+import random
+import argparse
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+# Local stand-in for the OpenAI-compatible chat completions API.
+# Run it and set XAI_BASE_URL=http://127.0.0.1:<port>/v1 to exercise the
+# scripts without touching x.ai.
+
+def default_reply(messages):
+    """Deterministic canned reply: says yes to anything mentioning Python."""
+    text = " ".join(str(m.get("content", "")) for m in messages)
+    return "Yes, this job is a match." if "python" in text.lower() else "No."
+
+class MockOpenAIHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def log_message(self, format, *args):
+        if self.server.verbose:
+            super().log_message(format, *args)
+
+    def _send_json(self, status, payload, headers=None):
+        body = json.dumps(payload).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        for key, value in (headers or {}).items():
+            self.send_header(key, value)
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _stream(self, content, model):
+        """Server-sent events, one word per chunk, paced like token generation."""
+        self.send_response(200)
+        self.send_header("Content-Type", "text/event-stream")
+        self.send_header("Connection", "close")
+        self.end_headers()
+        self.close_connection = True
+        words = content.split(" ")
+        try:
+            for i, word in enumerate(words):
+                time.sleep(self.server.token_latency)
+                chunk = {
+                    "id": f"chatcmpl-mock-{self.server.requests}",
+                    "object": "chat.completion.chunk",
+                    "created": int(time.time()),
+                    "model": model,
+                    "choices": [{"index": 0, "delta": {"content": word + (" " if i < len(words) - 1 else "")},
+                                 "finish_reason": None}],
+                }
+                self.wfile.write(f"data: {json.dumps(chunk)}\n\n".encode("utf-8"))
+                self.wfile.flush()
+            self.wfile.write(b"data: [DONE]\n\n")
+        except (BrokenPipeError, ConnectionResetError):
+            pass  # Client stopped reading early
+
+    def do_POST(self):
+        length = int(self.headers.get("Content-Length", 0))
+        request = json.loads(self.rfile.read(length) or b"{}")
+        if not self.path.rstrip("/").endswith("/chat/completions"):
+            self._send_json(404, {"error": {"message": f"Unknown path {self.path}"}})
+            return
+
+        server = self.server
+        with server.lock:
+            server.requests += 1
+        # Big prompts (inlined screenshots) take longer to upload and process
+        time.sleep(server.latency + random.uniform(0, server.jitter) + server.latency_per_kb * length / 1024)
+
+        if server.error_rate and random.random() < server.error_rate:
+            status = random.choice([429, 500, 503])
+            self._send_json(status, {"error": {"message": "mock failure", "type": "server_error"}},
+                            headers={"Retry-After": "0"} if status == 429 else None)
+            return
+
+        messages = request.get("messages", [])
+        content = server.reply(messages)
+        if request.get("max_tokens"):
+            content = " ".join(content.split(" ")[:request["max_tokens"]])
+        if request.get("stream"):
+            self._stream(content, request.get("model", "mock"))
+            return
+        time.sleep(server.token_latency * len(content.split()))
+        prompt_tokens = sum(len(str(m.get("content", ""))) for m in messages) // 4
+        completion_tokens = len(content) // 4
+        self._send_json(200, {
+            "id": f"chatcmpl-mock-{server.requests}",
+            "object": "chat.completion",
+            "created": int(time.time()),
+            "model": request.get("model", "mock"),
+            "choices": [{
+                "index": 0,
+                "message": {"role": "assistant", "content": content},
+                "finish_reason": "stop",
+            }],
+            "usage": {
+                "prompt_tokens": prompt_tokens,
+                "completion_tokens": completion_tokens,
+                "total_tokens": prompt_tokens + completion_tokens,
+            },
+        })
+
+def start_server(host="127.0.0.1", port=0, latency=0.2, jitter=0.0, error_rate=0.0,
+                 reply=default_reply, verbose=False, latency_per_kb=0.0, token_latency=0.0):
+    """Start the mock server on a background thread and return it (server.server_port)."""
+    server = ThreadingHTTPServer((host, port), MockOpenAIHandler)
+    server.daemon_threads = True
+    server.latency = latency
+    server.jitter = jitter
+    server.latency_per_kb = latency_per_kb
+    server.token_latency = token_latency  # Seconds per generated word
+    server.error_rate = error_rate
+    server.reply = reply
+    server.verbose = verbose
+    server.requests = 0
+    server.lock = threading.Lock()
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Mock OpenAI-compatible chat completions server")
+    parser.add_argument("--port", type=int, default=8001)
+    parser.add_argument("--latency", type=float, default=0.2, help="Seconds of delay per request")
+    parser.add_argument("--jitter", type=float, default=0.0, help="Extra random delay up to this many seconds")
+    parser.add_argument("--latency-per-kb", type=float, default=0.0, help="Extra seconds of delay per KB of request body")
+    parser.add_argument("--token-latency", type=float, default=0.0, help="Seconds per generated word")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="Fraction of requests answered with 429/5xx")
+    args = parser.parse_args()
+    server = start_server(port=args.port, latency=args.latency, jitter=args.jitter,
+                          error_rate=args.error_rate, verbose=True, latency_per_kb=args.latency_per_kb,
+                          token_latency=args.token_latency)
+    print(f"Mock OpenAI server listening on http://127.0.0.1:{server.server_port}/v1")
+    try:
+        threading.Event().wait()
+    except KeyboardInterrupt:
+        server.shutdown()
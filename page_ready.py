@@ -0,0 +1,333 @@
+import os
+import json
+import time
+import threading
+import tracing
+from urllib.parse import urlparse
+from selenium.webdriver.common.by import By
+
+LATENCY_PATH = os.getenv("PAGE_LATENCY_PATH", "page_latency.json")
+
+# A page counts as ready as soon as one of its domain's content selectors shows up
+READY_SELECTORS = {
+    "indeed.com": "[data-testid='jobcard'], #jobDescriptionText, .jobsearch-JobDescriptionSection",
+    "glassdoor.com": ".JobsList_jobListItem__JBBUV, [data-test='jobListing'], .JobDetails_jobDescription__uW_fK",
+    "linkedin.com": ".base-card, .show-more-less-html__markup, .jobs-description",
+    "x.com": "[data-testid='tweet']",
+    "greenhouse.io": "#application, #app_body, form",
+    "lever.co": ".application-form, .posting-page",
+    "myworkdayjobs.com": "[data-automation-id='jobPostingDescription'], [data-automation-id='applyManually']",
+}
+
+POLL_INTERVAL = 0.1
+IDLE_WINDOW = 0.5  # Network must stay quiet this long to count as idle
+MIN_TIMEOUT = 2.0
+MAX_TIMEOUT = 30.0
+DEFAULT_TIMEOUT = 10.0
+
+# Maps the URL of a page to the URL it is loaded from, and back. None in a real run; the
+# benchmarks install one that serves every board from a local copy (benchmarks/recorded_site.py)
+_url_mapper = None
+
+def set_url_mapper(mapper):
+    """
+    Load every page through `mapper` (None restores direct loads): an object whose
+    fetch_url(url) gives the URL to load and original_url(fetched) the page it stands for.
+    """
+    global _url_mapper
+    _url_mapper = mapper
+
+def fetch_url(url):
+    """The URL to load for a page: the page's own URL unless a URL mapper is installed."""
+    return _url_mapper.fetch_url(url) if _url_mapper is not None else url
+
+def domain_of(url):
+    if _url_mapper is not None and url:
+        url = _url_mapper.original_url(url)
+    host = urlparse(url or "").hostname or ""
+    return host[4:] if host.startswith("www.") else host
+
+class DomainLatency:
+    """
+    Per-domain load latency estimates, persisted between runs.
+    Uses the TCP retransmit-timer recipe: a smoothed mean plus four smoothed
+    deviations, clamped to [MIN_TIMEOUT, MAX_TIMEOUT].
+    """
+
+    def __init__(self, path=LATENCY_PATH):
+        self.path = path
+        self._lock = threading.Lock()
+        self.stats = {}
+        try:
+            with open(path, "r") as f:
+                self.stats = json.load(f)
+        except (OSError, ValueError):
+            self.stats = {}
+
+    def timeout(self, domain):
+        entry = self.stats.get(domain)
+        if not entry:
+            return DEFAULT_TIMEOUT
+        return min(MAX_TIMEOUT, max(MIN_TIMEOUT, entry["mean"] + 4 * entry["dev"]))
+
+    def observe(self, domain, seconds):
+        with self._lock:
+            entry = self.stats.get(domain)
+            if entry is None:
+                self.stats[domain] = {"mean": seconds, "dev": seconds / 2, "samples": 1}
+                return
+            error = seconds - entry["mean"]
+            entry["mean"] += 0.125 * error
+            entry["dev"] += 0.25 * (abs(error) - entry["dev"])
+            entry["samples"] += 1
+
+    def save(self):
+        with self._lock:
+            with open(self.path, "w") as f:
+                json.dump(self.stats, f, indent=2, sort_keys=True)
+
+class NetworkMonitor:
+    """
+    Counts in-flight requests for one driver from Chrome's DevTools Network events.
+    Events arrive through the "performance" log (see browser_pool's goog:loggingPrefs).
+    Falls back to watching the Resource Timing buffer when that log isn't available.
+    Also totals the bytes the driver downloaded and the requests Chrome blocked,
+    and keeps the status and Retry-After header of the last page (document) response.
+    """
+
+    def __init__(self):
+        self.inflight = set()
+        self.last_activity = time.monotonic()
+        self.use_cdp = True
+        self.bytes = 0
+        self.blocked = 0
+        self.status = None
+        self.retry_after = None
+        self._resource_count = None
+
+    def reset(self, driver):
+        self.status = None
+        self.retry_after = None
+        self.inflight.clear()
+        self.last_activity = time.monotonic()
+        self._resource_count = None
+        self.poll(driver)
+        self.inflight.clear()
+
+    def poll(self, driver):
+        """Drain pending events; returns the number of requests still in flight."""
+        if self.use_cdp:
+            try:
+                entries = driver.get_log("performance")
+            except Exception:
+                self.use_cdp = False
+            else:
+                for entry in entries:
+                    try:
+                        message = json.loads(entry["message"])["message"]
+                    except (KeyError, ValueError):
+                        continue
+                    method = message.get("method", "")
+                    request_id = message.get("params", {}).get("requestId")
+                    if method == "Network.requestWillBeSent":
+                        self.inflight.add(request_id)
+                    elif method == "Network.loadingFinished":
+                        self.inflight.discard(request_id)
+                        self.bytes += int(message["params"].get("encodedDataLength", 0))
+                    elif method == "Network.loadingFailed":
+                        self.inflight.discard(request_id)
+                        self.blocked += bool(message["params"].get("blockedReason"))
+                    elif method == "Network.responseReceived" and message["params"].get("type") == "Document":
+                        response = message["params"].get("response", {})
+                        headers = {k.lower(): v for k, v in response.get("headers", {}).items()}
+                        self.status, self.retry_after = response.get("status"), headers.get("retry-after")
+                        continue
+                    else:
+                        continue
+                    self.last_activity = time.monotonic()
+                return len(self.inflight)
+        try:
+            count = driver.execute_script("return performance.getEntriesByType('resource').length")
+        except Exception:
+            return 0
+        if count != self._resource_count:
+            self._resource_count = count
+            self.last_activity = time.monotonic()
+        return 0
+
+    def idle_for(self):
+        return time.monotonic() - self.last_activity
+
+class PageReadiness:
+    """
+    Event-driven replacement for fixed sleeps after navigation and clicks.
+    A page is ready when its domain's ready selector matches, or when the DOM is
+    complete and the network has been idle for IDLE_WINDOW. Timeouts adapt to
+    each domain's observed load latency. Every wait records how long the old
+    fixed sleep (`baseline`) would have taken so the savings can be reported.
+    With `politeness` (politeness.Politeness) every navigation first waits for
+    its host's turn, and the page's status, Retry-After and any bot wall are
+    reported back to it.
+    """
+
+    def __init__(self, selectors=READY_SELECTORS, latency=None, idle_window=IDLE_WINDOW,
+                 max_inflight=0, politeness=None):
+        self.selectors = selectors
+        self.politeness = politeness
+        self.latency = latency or DomainLatency()
+        self.idle_window = idle_window
+        self.max_inflight = max_inflight
+        self._monitors = {}
+        self._lock = threading.Lock()
+        self.waits = 0
+        self.timeouts = 0
+        self.waited = 0.0
+        self.baseline = 0.0
+        self.loads = 0
+        self.load_seconds = 0.0
+        self._retired = {"bytes": 0, "blocked": 0}  # Totals of forgotten monitors
+
+    def _monitor(self, driver):
+        with self._lock:
+            if driver not in self._monitors:
+                self._monitors[driver] = NetworkMonitor()
+            return self._monitors[driver]
+
+    def selector_for(self, url):
+        domain = domain_of(url)
+        for site, selector in self.selectors.items():
+            if domain == site or domain.endswith("." + site):
+                return selector
+        return None
+
+    def _is_ready(self, driver, monitor, selector):
+        inflight = monitor.poll(driver)
+        try:
+            state = driver.execute_script("return document.readyState")
+        except Exception:
+            return False
+        if state == "loading":
+            return False
+        if selector and driver.find_elements(By.CSS_SELECTOR, selector):
+            return True
+        return (state == "complete" and inflight <= self.max_inflight
+                and monitor.idle_for() >= self.idle_window)
+
+    def wait(self, driver, baseline=0.0, use_selector=True, started=None):
+        """Block until the current page is ready; returns True unless the adaptive timeout hit."""
+        started = started or time.monotonic()
+        url = driver.current_url
+        domain = domain_of(url)
+        selector = self.selector_for(url) if use_selector else None
+        monitor = self._monitor(driver)
+        deadline = started + self.latency.timeout(domain)
+        ready = False
+        bytes_before = monitor.bytes
+        with tracing.span("wait", domain=domain) as span:
+            while time.monotonic() < deadline:
+                if self._is_ready(driver, monitor, selector):
+                    ready = True
+                    break
+                time.sleep(POLL_INTERVAL)
+            span["ready"] = ready
+            span["bytes"] = monitor.bytes - bytes_before
+        elapsed = time.monotonic() - started
+        # Timeouts are observed too, so a slow domain earns a longer budget next time
+        self.latency.observe(domain, elapsed)
+        with self._lock:
+            self.waits += 1
+            self.waited += elapsed
+            self.baseline += baseline
+            if not ready:
+                self.timeouts += 1
+        if not ready:
+            print(f"Page readiness: timed out after {elapsed:.1f}s on {domain}")
+        return ready
+
+    def get(self, driver, url, baseline=5.0):
+        """driver.get() followed by a readiness wait instead of a fixed sleep."""
+        if self.politeness is not None:
+            self.politeness.acquire(url)
+        monitor = self._monitor(driver)
+        monitor.reset(driver)
+        started = time.monotonic()
+        with tracing.span("navigate", domain=domain_of(url)):
+            driver.get(fetch_url(url))
+        ready = self.wait(driver, baseline=baseline, started=started)
+        with self._lock:
+            self.loads += 1
+            self.load_seconds += time.monotonic() - started
+        if self.politeness is not None:
+            self.politeness.observe_page(driver, url, monitor.status, monitor.retry_after)
+        return ready
+
+    def click(self, driver, element, baseline=2.0):
+        """Click and wait for whatever the click triggered (navigation or XHR) to settle."""
+        monitor = self._monitor(driver)
+        monitor.reset(driver)
+        before = driver.current_url
+        started = time.monotonic()
+        with tracing.span("click", domain=domain_of(before)):
+            element.click()
+        # Same-page clicks: the ready selector is already on screen, so only trust the network
+        return self.settle(driver, baseline=baseline, started=started,
+                           use_selector=driver.current_url != before)
+
+    def settle(self, driver, baseline=2.0, started=None, use_selector=False):
+        """Wait for the network to go quiet without navigating (e.g. between retries)."""
+        return self.wait(driver, baseline=baseline, use_selector=use_selector, started=started)
+
+    def forget(self, driver):
+        """Drop the monitor of a session that is being quit, keeping its traffic in the totals."""
+        with self._lock:
+            monitor = self._monitors.pop(driver, None)
+            if monitor is not None:
+                self._retired["bytes"] += monitor.bytes
+                self._retired["blocked"] += monitor.blocked
+
+    def traffic(self):
+        """(bytes downloaded, requests blocked) over every driver so far."""
+        with self._lock:
+            monitors = list(self._monitors.values())
+            downloaded, blocked = self._retired["bytes"], self._retired["blocked"]
+        for monitor in monitors:
+            downloaded += monitor.bytes
+            blocked += monitor.blocked
+        return downloaded, blocked
+
+    def report(self):
+        saved = self.baseline - self.waited
+        print(f"Page readiness: {self.waits} waits took {self.waited:.1f}s instead of "
+              f"{self.baseline:.1f}s of fixed sleeps (saved {saved:.1f}s, {self.timeouts} timeouts)")
+        if self.loads:
+            downloaded, blocked = self.traffic()
+            print(f"Page readiness: {self.loads} page loads, {self.load_seconds / self.loads:.2f}s and "
+                  f"{downloaded / self.loads / 1e3:.0f} kB per page, {blocked} requests blocked")
+        try:
+            self.latency.save()
+        except OSError as e:
+            print(f"Page readiness: could not save latency stats: {e}")
+        return saved
+
+if __name__ == "__main__":
+    # Measure readiness waits against the fixed sleeps on the local static-site fixture
+    import functools
+    from http.server import SimpleHTTPRequestHandler, ThreadingHTTPServer
+    from browser_pool import BrowserPool
+
+    fixture_dir = os.path.join(os.path.dirname(os.path.abspath(__file__)), "fixtures", "static_site")
+    handler = functools.partial(SimpleHTTPRequestHandler, directory=fixture_dir)
+    server = ThreadingHTTPServer(("127.0.0.1", 0), handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    base = f"http://127.0.0.1:{server.server_port}"
+    pages = ["search.html", "posting.html"]
+
+    readiness = PageReadiness(latency=DomainLatency(path=os.devnull))
+    with BrowserPool(size=1) as pool, pool.driver() as driver:
+        for page in pages * 3:
+            started = time.monotonic()
+            ready = readiness.get(driver, f"{base}/{page}", baseline=5.0)
+            print(f"{page}: ready={ready} in {time.monotonic() - started:.2f}s")
+    readiness.latency.path = os.devnull
+    readiness.report()
+    server.shutdown()
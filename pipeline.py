@@ -0,0 +1,161 @@
+import time
+import queue
+import threading
+import tracing
+
+_DONE = object()  # End-of-stream marker, one per downstream worker
+
+def _finish(inbox):
+    # Inboxes that reorder items (politeness.HostQueue) must hand out the marker last
+    getattr(inbox, "put_last", inbox.put)(_DONE)
+
+class Stage:
+    """
+    One step of a Pipeline: `workers` threads flat-map each input through func(item),
+    which returns an iterable of outputs (a list, a generator, or [] to drop the item).
+    The stage's inbox holds at most `buffer` items, so a slow stage pushes back on the
+    ones feeding it. `max_items` caps how many inputs the stage accepts; once it is
+    reached every upstream stage is stopped. `delay` is a per-worker pause after each
+    item. Funcs should release pooled resources (e.g. browser sessions) before
+    returning, since emitting can block on a full downstream buffer. `flush`, if
+    given, runs once after the last input and returns any outputs held back until
+    the end of the stream (e.g. to emit them sorted). `inbox(maxsize)`, if given,
+    makes the stage's inbox instead of a FIFO queue.Queue (e.g. a
+    politeness.HostQueue, which hands out items whose host is free first).
+    """
+
+    def __init__(self, name, func, workers=1, buffer=8, max_items=None, delay=0, flush=None, inbox=None):
+        self.name = name
+        self.func = func
+        self.workers = max(1, workers)
+        self.buffer = buffer
+        self.max_items = max_items
+        self.delay = delay
+        self.flush = flush
+        self.inbox = inbox or (lambda maxsize: queue.Queue(maxsize=maxsize))
+        self.stopped = threading.Event()
+        self.accepted = 0
+        self.emitted = 0
+        self.failed = 0
+        self.busy = 0.0
+        self.first_output = None
+        self._lock = threading.Lock()
+
+    def _admit(self):
+        with self._lock:
+            if self.max_items is not None and self.accepted >= self.max_items:
+                return False, False
+            self.accepted += 1
+            return True, self.max_items is not None and self.accepted == self.max_items
+
+class Pipeline:
+    """Streams items through a chain of Stages connected by bounded queues."""
+
+    def __init__(self, stages):
+        self.stages = stages
+        self.started = None
+
+    def stop(self, upto=None):
+        """Stop stages [0, upto) (all of them by default); stopped stages drain and discard."""
+        for stage in self.stages[:upto]:
+            stage.stopped.set()
+
+    def run(self, items):
+        """Feed `items` into the first stage and yield what the last stage emits."""
+        self.started = time.monotonic()
+        queues = [stage.inbox(stage.buffer) for stage in self.stages]
+        queues.append(queue.Queue(maxsize=self.stages[-1].buffer))
+        threads = []
+
+        def feed():
+            first = self.stages[0]
+            try:
+                for item in items:
+                    if first.stopped.is_set():
+                        break
+                    queues[0].put(item)
+            finally:
+                for _ in range(first.workers):
+                    _finish(queues[0])
+
+        def emit(stage, outbox, outputs):
+            for output in outputs or ():
+                if stage.stopped.is_set():
+                    break
+                outbox.put(output)
+                with stage._lock:
+                    stage.emitted += 1
+                    if stage.first_output is None:
+                        stage.first_output = time.monotonic() - self.started
+
+        def work(index, remaining):
+            stage = self.stages[index]
+            inbox, outbox = queues[index], queues[index + 1]
+            while True:
+                item = inbox.get()
+                if item is _DONE:
+                    break
+                if stage.stopped.is_set():
+                    continue
+                admitted, filled = stage._admit()
+                if not admitted:
+                    continue
+                if filled:
+                    # Nothing upstream can reach us any more, so stop doing its work
+                    self.stop(index)
+                started = time.monotonic()
+                try:
+                    with tracing.span(f"stage.{stage.name}"):
+                        emit(stage, outbox, stage.func(item))
+                except Exception as e:
+                    with stage._lock:
+                        stage.failed += 1
+                    print(f"Pipeline stage {stage.name} failed on {item}: {e}")
+                with stage._lock:
+                    stage.busy += time.monotonic() - started
+                if stage.delay:
+                    time.sleep(stage.delay)
+            with remaining["lock"]:
+                remaining["count"] -= 1
+                last = remaining["count"] == 0
+            if last:
+                if stage.flush is not None and not stage.stopped.is_set():
+                    try:
+                        emit(stage, outbox, stage.flush())
+                    except Exception as e:
+                        print(f"Pipeline stage {stage.name} failed to flush: {e}")
+                downstream = self.stages[index + 1].workers if index + 1 < len(self.stages) else 1
+                for _ in range(downstream):
+                    _finish(outbox)
+
+        threads.append(threading.Thread(target=feed, name="pipeline-feed", daemon=True))
+        for index, stage in enumerate(self.stages):
+            remaining = {"count": stage.workers, "lock": threading.Lock()}
+            for n in range(stage.workers):
+                threads.append(threading.Thread(target=work, args=(index, remaining),
+                                                name=f"pipeline-{stage.name}-{n}", daemon=True))
+        for thread in threads:
+            thread.start()
+
+        results = queues[-1]
+        output = None
+        try:
+            while True:
+                output = results.get()
+                if output is _DONE:
+                    break
+                yield output
+        finally:
+            # Consumer gave up early: stop everything and drain so workers can exit
+            self.stop()
+            while output is not _DONE:
+                output = results.get()
+            for thread in threads:
+                thread.join()
+
+    def report(self):
+        print("Pipeline summary:")
+        for stage in self.stages:
+            first = f"{stage.first_output:.1f}s" if stage.first_output is not None else "n/a"
+            print(f"  {stage.name}: {stage.accepted} in, {stage.emitted} out, {stage.failed} failed, "
+                  f"{stage.busy:.1f}s busy across {stage.workers} workers, first output after {first}")
@@ -0,0 +1,289 @@
+import os
+import re
+import time
+import random
+import threading
+from collections import deque
+from email.utils import parsedate_to_datetime
+from urllib.robotparser import RobotFileParser
+from page_ready import domain_of, fetch_url
+from tracing import log
+
+POLITENESS = os.getenv("POLITENESS", "1") != "0"  # 0 turns pacing off (local mirrors, benchmarks)
+INTERVAL = float(os.getenv("POLITE_INTERVAL", "1.0"))  # Seconds between page loads on one host
+BURST = int(os.getenv("POLITE_BURST", "2"))  # Page loads a rested host may get back to back
+# The job boards throttle scrapers hardest; ATS pages (Greenhouse, Lever, ...) get INTERVAL
+HOST_INTERVALS = {
+    "indeed.com": 2.0,
+    "glassdoor.com": 3.0,
+    "linkedin.com": 3.0,
+    "x.com": 3.0,
+}
+BACKOFF_BASE = 30.0  # Pause after a host's first 429 or captcha, doubled for each one after it
+MAX_BACKOFF = 600.0
+MAX_SLOWDOWN = 16.0  # A throttled host's interval is stretched up to this factor, and eased back on success
+MAX_CRAWL_DELAY = 60.0  # robots.txt crawl-delays above this are capped
+ROBOTS_TIMEOUT = 5.0
+THROTTLE_STATUSES = (429, 503)
+
+# Bot walls (Cloudflare, PerimeterX, DataDome) that replace the page asked for. A reCAPTCHA
+# widget inside an application form is not one of them, so it isn't matched here.
+CHALLENGE_TITLES = re.compile(r"just a moment|attention required|security check|verify you are human|"
+                              r"access denied|are you a robot|captcha", re.I)
+CHALLENGE_SELECTOR = ("#challenge-form, #challenge-running, iframe[src*='challenges.cloudflare.com'], "
+                      "#px-captcha, iframe[src*='captcha-delivery.com']")
+CHALLENGE_MARKERS = ("cf-challenge", "challenge-platform", "px-captcha", "captcha-delivery.com")
+
+def parse_retry_after(value):
+    """Seconds from a Retry-After header (delta-seconds or an HTTP date), or None."""
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        return max(0.0, parsedate_to_datetime(value).timestamp() - time.time())
+    except (TypeError, ValueError):
+        return None
+
+def is_challenge(title="", html=""):
+    """True if a page looks like a captcha or bot wall rather than the page asked for."""
+    if title and CHALLENGE_TITLES.search(title):
+        return True
+    if not html:
+        return False
+    head = html[:20000].lower()
+    if any(marker in head for marker in CHALLENGE_MARKERS):
+        return True
+    title = re.search(r"<title[^>]*>([^<]*)", head)
+    return bool(title and CHALLENGE_TITLES.search(title.group(1)))
+
+class HostState:
+    """Token bucket and backoff state of one host."""
+
+    def __init__(self, interval, burst):
+        self.interval = interval
+        self.burst = burst
+        self.tokens = float(burst)
+        self.updated = time.monotonic()
+        self.blocked_until = 0.0
+        self.slowdown = 1.0
+        self.requests = 0
+        self.waited = 0.0
+        self.throttled = 0
+
+    def wait(self, now):
+        """Seconds until the next page load may start (refills the bucket as a side effect)."""
+        interval = self.interval * self.slowdown
+        capacity = self.burst if self.slowdown == 1.0 else 1  # No bursts while backing off
+        if interval > 0:
+            self.tokens = min(capacity, self.tokens + (now - self.updated) / interval)
+        else:
+            self.tokens = capacity
+        self.updated = now
+        refill = (1 - self.tokens) * interval if self.tokens < 1 else 0.0
+        return max(self.blocked_until - now, refill, 0.0)
+
+class Politeness:
+    """
+    Per-host pacing for every page load, over HTTP or in Chrome. Each host has
+    a token bucket: `burst` loads back to back, then one per interval (its
+    HOST_INTERVALS entry, else `interval`, stretched to the robots.txt
+    crawl-delay or request-rate). A 429/503 or a captcha page pauses the host
+    for its Retry-After, or for an exponential backoff, and stretches its
+    interval until it answers normally again. Hosts are independent: a slow
+    board never holds up a Greenhouse or Lever page. queue() gives a pipeline
+    stage an inbox that hands out the item whose host is free soonest, so
+    workers switch hosts instead of waiting.
+    """
+
+    def __init__(self, interval=INTERVAL, burst=BURST, host_intervals=HOST_INTERVALS, robots=True,
+                 enabled=POLITENESS):
+        self.interval = interval
+        self.burst = max(1, burst)
+        self.host_intervals = host_intervals
+        self.robots = robots
+        self.enabled = enabled
+        self._hosts = {}
+        self._robots_locks = {}
+        self._lock = threading.Lock()
+
+    def _host_interval(self, host):
+        for site, interval in self.host_intervals.items():
+            if host == site or host.endswith("." + site):
+                return interval
+        return self.interval
+
+    def _robots_interval(self, host):
+        """Seconds between requests that the host's robots.txt asks for (crawl-delay or request-rate)."""
+        import requests
+        from http_fetch import USER_AGENT
+        try:
+            response = requests.get(fetch_url(f"https://{host}/robots.txt"), timeout=ROBOTS_TIMEOUT,
+                                    headers={"User-Agent": USER_AGENT})
+        except requests.RequestException:
+            return None
+        if response.status_code != 200:
+            return None
+        parser = RobotFileParser()
+        parser.parse(response.text.splitlines())
+        parser.modified()  # crawl_delay() and request_rate() answer None for a parser never marked as read
+        delay = parser.crawl_delay(USER_AGENT)
+        rate = parser.request_rate(USER_AGENT)
+        intervals = [float(delay)] if delay else []
+        if rate and rate.requests:
+            intervals.append(rate.seconds / rate.requests)
+        return min(MAX_CRAWL_DELAY, max(intervals)) if intervals else None
+
+    def _state(self, host):
+        with self._lock:
+            state = self._hosts.get(host)
+            if state is not None:
+                return state
+            robots_lock = self._robots_locks.setdefault(host, threading.Lock())
+        # robots.txt is read once per host, without holding up the other hosts
+        with robots_lock:
+            with self._lock:
+                if host in self._hosts:
+                    return self._hosts[host]
+            interval = self._host_interval(host)
+            crawl_delay = self._robots_interval(host) if self.robots else None
+            if crawl_delay and crawl_delay > interval:
+                log(f"Politeness: {host} asks for {crawl_delay:.0f}s between requests (robots.txt)")
+                interval = crawl_delay
+            with self._lock:
+                state = self._hosts[host] = HostState(interval, self.burst)
+            return state
+
+    def ready_in(self, url):
+        """Seconds before a page load on url's host may start; 0 for hosts not visited yet."""
+        if not self.enabled:
+            return 0.0
+        with self._lock:
+            state = self._hosts.get(domain_of(url))
+            return state.wait(time.monotonic()) if state is not None else 0.0
+
+    def acquire(self, url):
+        """Block until url's host may be loaded again and take its slot; returns the seconds waited."""
+        if not self.enabled:
+            return 0.0
+        state = self._state(domain_of(url))
+        waited = 0.0
+        while True:
+            with self._lock:
+                delay = state.wait(time.monotonic())
+                if delay <= 0:
+                    state.tokens -= 1
+                    state.requests += 1
+                    state.waited += waited
+                    return waited
+            time.sleep(delay)
+            waited += delay
+
+    def observe(self, url, status=None, retry_after=None, challenged=False):
+        """Feed back how a page load went: throttling pauses and slows the host, success eases it back."""
+        if not self.enabled:
+            return
+        host = domain_of(url)
+        pause = parse_retry_after(retry_after)
+        with self._lock:
+            state = self._hosts.get(host)
+            if state is None:
+                return
+            if challenged or status in THROTTLE_STATUSES:
+                state.slowdown = min(MAX_SLOWDOWN, state.slowdown * 2)
+                if pause is None:
+                    pause = min(MAX_BACKOFF, BACKOFF_BASE * state.slowdown / 2) * random.uniform(0.8, 1.2)
+                state.blocked_until = max(state.blocked_until, time.monotonic() + pause)
+                state.tokens = 0.0
+                state.throttled += 1
+            elif status is None or status < 400:
+                state.slowdown = max(1.0, state.slowdown * 0.9)
+                return
+            else:
+                return
+        reason = "a captcha" if challenged else f"HTTP {status}"
+        log(f"Warning: {host} answered with {reason}, pausing it for {pause:.0f}s")
+
+    def observe_page(self, driver, url, status=None, retry_after=None):
+        """observe() for a page loaded in Chrome, checking it for a bot wall in one round trip."""
+        if not self.enabled:
+            return
+        try:
+            title, walled = driver.execute_script(
+                "return [document.title, !!document.querySelector(arguments[0])]", CHALLENGE_SELECTOR)
+        except Exception:
+            title, walled = "", False
+        self.observe(url, status, retry_after, challenged=walled or is_challenge(title))
+
+    def queue(self, host, maxsize=0):
+        """A pipeline inbox that orders items by how soon host(item)'s host is free (see HostQueue)."""
+        return HostQueue(self, host, maxsize)
+
+    def report(self):
+        with self._lock:
+            hosts = dict(self._hosts)
+        if not hosts:
+            return
+        requests = sum(state.requests for state in hosts.values())
+        waited = sum(state.waited for state in hosts.values())
+        throttled = {host: state for host, state in hosts.items() if state.throttled}
+        print(f"Politeness: {requests} page loads on {len(hosts)} hosts, {waited:.1f}s spent waiting on host limits")
+        for host, state in sorted(throttled.items(), key=lambda item: -item[1].throttled):
+            print(f"  {host}: throttled {state.throttled} times, ended at {state.slowdown:.1f}x its "
+                  f"{state.interval:.1f}s interval")
+
+class HostQueue:
+    """
+    Bounded inbox for a pipeline stage whose items each load a page. get()
+    returns the oldest item of whichever host can be loaded soonest (FIFO
+    within a host), so workers keep busy on other hosts while one is being
+    paced. Items put with put_last() (end-of-stream markers) come out only
+    once every other item has.
+    """
+
+    def __init__(self, politeness, host, maxsize=0):
+        self.politeness = politeness
+        self.host = host  # item -> URL it will load
+        self.maxsize = maxsize
+        self._items = []
+        self._last = deque()
+        self._cond = threading.Condition()
+
+    def put(self, item):
+        with self._cond:
+            while self.maxsize and len(self._items) >= self.maxsize:
+                self._cond.wait()
+            self._items.append((self.host(item), item))
+            self._cond.notify_all()
+
+    def put_last(self, item):
+        with self._cond:
+            self._last.append(item)
+            self._cond.notify_all()
+
+    def get(self):
+        with self._cond:
+            while True:
+                if not self._items:
+                    if self._last:
+                        return self._last.popleft()
+                    self._cond.wait()
+                    continue
+                best, soonest, seen = 0, None, set()
+                for i, (url, _) in enumerate(self._items):
+                    host = domain_of(url)
+                    if host in seen:
+                        continue
+                    seen.add(host)
+                    delay = self.politeness.ready_in(url)
+                    if soonest is None or delay < soonest:
+                        best, soonest = i, delay
+                    if delay <= 0:
+                        break
+                if soonest <= 0:
+                    item = self._items.pop(best)[1]
+                    self._cond.notify_all()
+                    return item
+                self._cond.wait(timeout=soonest)
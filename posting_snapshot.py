@@ -0,0 +1,35 @@
+import time
+from dataclasses import dataclass, field
+from selenium.webdriver.common.by import By
+
+@dataclass
+class PostingSnapshot:
+    """
+    Everything the filter stage learned about one posting, reused by later stages
+    so a matching job is never loaded or described twice.
+    """
+    url: str
+    final_url: str
+    dom_text: str = ""
+    description: str = None
+    fetched_at: float = field(default_factory=time.time)
+
+    def is_loaded_in(self, driver):
+        """True if the driver is still showing this posting, so navigation can be skipped."""
+        try:
+            return driver.current_url == self.final_url
+        except Exception:
+            return False
+
+def snapshot_page(driver, url, description=None):
+    """Capture the page the driver is currently showing as a PostingSnapshot."""
+    try:
+        dom_text = driver.find_element(By.TAG_NAME, "body").text
+    except Exception:
+        dom_text = ""
+    return PostingSnapshot(
+        url=url,
+        final_url=driver.current_url,
+        dom_text=dom_text,
+        description=description,
+    )
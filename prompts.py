@@ -0,0 +1,75 @@
+import re
+import threading
+
+# Profile fields each task actually uses. Contact details and the resume path
+# are only ever typed into forms, and the cover letter template is filled in
+# locally (cover_letter.py), so it never goes to the model.
+TASK_FIELDS = {
+    "filter": ["skills", "experience"],
+    "cover_letter": ["name", "skills", "experience"],
+    "essay": ["name", "skills", "experience"],
+}
+FIELD_LABELS = {
+    "name": "Name",
+    "skills": "Skills",
+    "experience": "Experience",
+}
+
+def compact(text):
+    """Collapse runs of spaces/tabs and blank lines; keeps single line breaks."""
+    text = re.sub(r"[ \t]+", " ", text or "")
+    return re.sub(r"\n\s*\n+", "\n", text).strip()
+
+def profile_block(profile, task):
+    """Canonical profile text for a task: same fields, same order, same wording every call."""
+    lines = ["Candidate profile:"]
+    for field in TASK_FIELDS[task]:
+        value = profile.get(field)
+        if not value:
+            continue
+        if isinstance(value, (list, tuple)):
+            value = ", ".join(str(v) for v in value)
+        lines.append(f"{FIELD_LABELS[field]}: {compact(str(value))}")
+    return "\n".join(lines)
+
+def estimate_tokens(text):
+    return len(text) // 4
+
+class PromptBuilder:
+    """
+    Builds chat messages as [system: profile block + task instructions, user: per-call content].
+    The profile block comes first and never varies for a task, so every call of
+    that task shares a byte-identical prefix that provider-side prompt caching can
+    reuse. Counts the tokens each call sends against what interpolating the
+    whole profile dict (the old str(profile) prompts) would have cost.
+    """
+
+    def __init__(self, profile):
+        self.profile = profile
+        self._blocks = {task: profile_block(profile, task) for task in TASK_FIELDS}
+        self._full_profile = estimate_tokens(str(profile))
+        self.stats = {}
+        self._lock = threading.Lock()
+
+    def block(self, task):
+        return self._blocks[task]
+
+    def messages(self, task, instructions, content):
+        system = f"{self._blocks[task]}\n\n{instructions}"
+        with self._lock:
+            stats = self.stats.setdefault(task, {"calls": 0, "tokens": 0, "saved": 0})
+            stats["calls"] += 1
+            stats["tokens"] += estimate_tokens(system) + estimate_tokens(content)
+            stats["saved"] += self._full_profile - estimate_tokens(self._blocks[task])
+        return [
+            {"role": "system", "content": system},
+            {"role": "user", "content": content},
+        ]
+
+    def report(self):
+        if not self.stats:
+            return
+        print("Prompt tokens (estimated):")
+        for task, stats in self.stats.items():
+            print(f"  {task}: {stats['calls']} calls, ~{stats['tokens']} tokens sent, "
+                  f"~{stats['saved']} saved by the compact profile")
@@ -0,0 +1,165 @@
+import os
+import re
+import json
+import math
+import heapq
+import threading
+
+DF_PATH = os.getenv("RANK_DF_PATH", "ranker_df.json")
+# TF-IDF cosine between the profile and a description; typical matches score 0.1-0.3
+THRESHOLD = float(os.getenv("RANK_THRESHOLD", "0.05"))
+# Only the best K postings (after the threshold) reach the LLM; 0 keeps all of them
+TOP_K = int(os.getenv("RANK_TOP_K", "20"))
+# Postings per shortlist window: the best TOP_K of each window go on as soon as it fills,
+# so LLM scoring and applying start during the crawl; 0 waits for the whole crawl
+WINDOW = int(os.getenv("RANK_WINDOW", "50"))
+SKILL_WEIGHT = 3  # Skills count more than the free-text experience blurb
+
+STOPWORDS = set("""
+a an and are as at be but by for from has have in is it its of on or our that the their this
+to was we were will with you your they them he she his her i me my not all any can more other
+such than then there these those which who whom what when where why how also into about over
+""".split())
+
+# Keeps c++, c#, node.js and the like together as one term
+_WORD = re.compile(r"[a-z][a-z0-9]*(?:[+#]+|\.[a-z0-9]+)*")
+
+def tokenize(text):
+    """Lower-cased words without stopwords, plus adjacent-word bigrams ("web development")."""
+    words = [w for w in _WORD.findall((text or "").lower()) if w not in STOPWORDS and len(w) > 1]
+    return words + [f"{a} {b}" for a, b in zip(words, words[1:])]
+
+def profile_text(profile):
+    skills = profile.get("skills") or []
+    if isinstance(skills, str):
+        skills = [skills]
+    return " ".join([" ".join(skills)] * SKILL_WEIGHT + [profile.get("experience") or ""])
+
+class Ranker:
+    """
+    Local first-pass match score: TF-IDF vectors for the profile's skills and
+    experience and for each description, compared by cosine similarity in NumPy.
+    Document frequencies accumulate across runs (DF_PATH), so IDF reflects the
+    postings actually seen rather than just the current batch.
+    """
+
+    def __init__(self, profile, threshold=THRESHOLD, top_k=TOP_K, df_path=DF_PATH, window=WINDOW):
+        self.threshold = threshold
+        self.top_k = top_k
+        self.window = window
+        self.df_path = df_path
+        self.scored = 0
+        self.passed = 0
+        self._lock = threading.Lock()
+        try:
+            with open(df_path, "r") as f:
+                state = json.load(f)
+            self.docs, self.df = state["docs"], state["df"]
+        except (OSError, ValueError, KeyError):
+            self.docs, self.df = 0, {}
+        self.profile_terms = self._counts(tokenize(profile_text(profile)))
+
+    @staticmethod
+    def _counts(tokens):
+        counts = {}
+        for token in tokens:
+            counts[token] = counts.get(token, 0) + 1
+        return counts
+
+    def score_many(self, descriptions):
+        """Cosine similarity of each description to the profile, as a NumPy array."""
+        import numpy as np
+        docs = [self._counts(tokenize(d)) for d in descriptions]
+        with self._lock:
+            for counts in docs:
+                self.docs += 1
+                for term in counts:
+                    self.df[term] = self.df.get(term, 0) + 1
+            vocab = {term: i for i, term in enumerate(set(self.profile_terms).union(*docs))}
+            idf = np.ones(len(vocab))
+            for term, i in vocab.items():
+                idf[i] = math.log((1 + self.docs) / (1 + self.df.get(term, 0))) + 1
+
+        matrix = np.zeros((len(docs), len(vocab)))
+        for row, counts in enumerate(docs):
+            for term, count in counts.items():
+                matrix[row, vocab[term]] = 1 + math.log(count)  # Sublinear tf: repetition isn't relevance
+        profile = np.zeros(len(vocab))
+        for term, count in self.profile_terms.items():
+            profile[vocab[term]] = 1 + math.log(count)
+        matrix *= idf
+        profile *= idf
+        norms = np.linalg.norm(matrix, axis=1) * np.linalg.norm(profile)
+        scores = np.divide(matrix @ profile, norms, out=np.zeros(len(docs)), where=norms > 0)
+        with self._lock:
+            self.scored += len(docs)
+            self.passed += int((scores >= self.threshold).sum())
+        return scores
+
+    def score(self, description):
+        return float(self.score_many([description])[0])
+
+    def rank(self, descriptions):
+        """Indices of the descriptions worth an LLM call: above threshold, best first, at most top_k."""
+        import numpy as np
+        scores = self.score_many(descriptions)
+        order = [int(i) for i in np.argsort(-scores, kind="stable") if scores[i] >= self.threshold]
+        return order[:self.top_k] if self.top_k else order
+
+    def best_first(self, limit=None, window=None):
+        """A BestFirst buffer for scored jobs, keeping at most `limit` (default: top_k) per `window`."""
+        return BestFirst(self.top_k if limit is None else limit, self.window if window is None else window)
+
+    def save(self):
+        with self._lock:
+            with open(self.df_path, "w") as f:
+                json.dump({"docs": self.docs, "df": self.df}, f)
+
+    def report(self):
+        if self.scored:
+            per_window = f" per {self.window} postings" if self.window else ""
+            print(f"Ranker: {self.passed}/{self.scored} postings scored at least {self.threshold:.2f}"
+                  f"{f', at most {self.top_k}{per_window} sent on' if self.top_k else ''}")
+        self.save()
+
+class BestFirst:
+    """
+    Pipeline helper: releases jobs (dicts with a "score") best first, window by
+    window. Every `window` jobs added (0 or None: only at the end of the stream)
+    the best `limit` of them (0 or None keeps all) are released, so downstream
+    stages get work while the crawl is still running. Only `limit` jobs are
+    held at a time (a bounded heap; the worst one is dropped), and a held job's
+    page text is dropped, as later stages only need its description. add()
+    returns what a full window releases and flush() the last partial window.
+    """
+
+    def __init__(self, limit=None, window=None):
+        self.limit = limit
+        self.window = window
+        self.held = []  # Min-heap of (score, sequence, job): the worst held job is on top
+        self.added = 0
+        self.dropped = 0
+        self._lock = threading.Lock()
+
+    def add(self, job):
+        snapshot = job.get("snapshot")
+        if snapshot is not None:
+            snapshot.dom_text = ""
+        with self._lock:
+            self.added += 1
+            heapq.heappush(self.held, (job.get("score", 0), self.added, job))
+            if self.limit and len(self.held) > self.limit:
+                heapq.heappop(self.held)
+                self.dropped += 1
+            if self.window and self.added % self.window == 0:
+                return self._release()
+        return []
+
+    def flush(self):
+        with self._lock:
+            return self._release()
+
+    def _release(self):
+        jobs = [job for _, _, job in sorted(self.held, key=lambda entry: (-entry[0], entry[1]))]
+        self.held = []
+        return jobs
@@ -0,0 +1,85 @@
+import os
+import json
+import time
+import threading
+import functools
+
+RESUME_URL = os.getenv(
+    "RESUME_URL", "https://raw.githubusercontent.com/IssacVinson/AutoJobApplications/main/Resume%20Mar%2025.pdf")
+LOCAL_RESUME_PATH = os.getenv("RESUME_PATH", "/home/vinso/job_applier/resume.pdf")
+RESUME_MAX_AGE = 24 * 3600  # Re-validate the local resume against GitHub at most once a day
+
+def lazy(factory):
+    """
+    Decorator for expensive module-level resources: the factory runs on the first
+    call (once, even with several threads racing) and later calls return the same
+    object. `getter.peek()` returns the object only if it was already built.
+    """
+    lock = threading.Lock()
+    box = []
+
+    @functools.wraps(factory)
+    def getter():
+        if not box:
+            with lock:
+                if not box:
+                    box.append(factory())
+        return box[0]
+
+    getter.peek = lambda: box[0] if box else None
+    return getter
+
+def fetch_resume(url=RESUME_URL, local_path=LOCAL_RESUME_PATH, max_age=RESUME_MAX_AGE):
+    """
+    Make sure an up-to-date resume exists at local_path and return the path.
+    A local copy checked within `max_age` seconds is used without any network call;
+    an older one is re-validated with a conditional GET (ETag / Last-Modified), so
+    the PDF is only downloaded again when it actually changed on GitHub.
+    """
+    meta_path = local_path + ".meta.json"
+    try:
+        with open(meta_path, "r") as f:
+            meta = json.load(f)
+    except (OSError, ValueError):
+        meta = {}
+    have_copy = os.path.exists(local_path)
+    if have_copy and time.time() - meta.get("checked_at", 0) < max_age:
+        return local_path
+
+    import requests
+    headers = {}
+    if have_copy:
+        if meta.get("etag"):
+            headers["If-None-Match"] = meta["etag"]
+        if meta.get("last_modified"):
+            headers["If-Modified-Since"] = meta["last_modified"]
+    try:
+        response = requests.get(url, headers=headers, timeout=30)
+    except requests.RequestException as e:
+        if have_copy:
+            print(f"Could not re-validate resume ({e}); using local copy {local_path}")
+            return local_path
+        raise
+
+    if response.status_code == 304 and have_copy:
+        print(f"Resume unchanged, using local copy {local_path}")
+    elif response.status_code == 200:
+        os.makedirs(os.path.dirname(local_path) or ".", exist_ok=True)
+        tmp_path = local_path + ".part"
+        with open(tmp_path, "wb") as f:
+            f.write(response.content)
+        os.replace(tmp_path, local_path)
+        print(f"Resume downloaded to {local_path}")
+    elif have_copy:
+        print(f"Resume check returned {response.status_code}; using local copy {local_path}")
+    else:
+        raise Exception(f"Failed to download resume from {url}. Status code: {response.status_code}")
+
+    meta = {
+        "etag": response.headers.get("ETag", meta.get("etag")),
+        "last_modified": response.headers.get("Last-Modified", meta.get("last_modified")),
+        "checked_at": time.time(),
+    }
+    with open(meta_path, "w") as f:
+        json.dump(meta, f)
+    return local_path
@@ -0,0 +1,65 @@
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from field_answers import FieldAnswers, FUZZY_THRESHOLD, normalize_label, similarity
+
+PROFILE = {"name": "Jane Doe", "email": "jane@example.com", "phone": "555-0100", "linkedin": "", "github": "",
+           "website": "", "location": "Remote"}
+
+# Questions that read alike but ask different things: a stored answer for one must never fill the other
+DIFFERENT = [
+    ("Years of SQL experience", "Years of C# experience"),
+    ("Are you authorized to work in the US?", "Are you authorized to work in the UK?"),
+    ("Country: United States", "Country: United Kingdom"),
+    ("Expected salary (USD)", "Expected salary (EUR)"),
+    ("Years of Rust experience", "Years of Ruby experience"),
+    ("Years of React experience", "Years of Redux experience"),
+    ("Do you have 5+ years of Python experience?", "Do you have 3+ years of Python experience?"),
+    ("Expected salary", "Current salary"),
+    ("Years of JavaScript experience", "Years of TypeScript experience"),
+]
+
+# Same question, different wording
+SAME = [
+    ("Years of Python experience", "How many years of experience do you have with Python?"),
+    ("Years of Python experience", "Python experience (years)"),
+    ("Are you authorized to work in the US?", "Authorized to work in the US *"),
+]
+
+@pytest.mark.parametrize("a, b", DIFFERENT)
+def test_different_questions_do_not_match(a, b):
+    assert similarity(normalize_label(a), normalize_label(b)) < FUZZY_THRESHOLD
+
+@pytest.mark.parametrize("a, b", SAME)
+def test_reworded_questions_match(a, b):
+    assert similarity(normalize_label(a), normalize_label(b)) >= FUZZY_THRESHOLD
+
+@pytest.mark.parametrize("a, b", DIFFERENT)
+def test_lookup_does_not_reuse_answer_of_different_question(a, b):
+    store = FieldAnswers(PROFILE, path=":memory:")
+    store.remember({"label": a}, "42", "user")
+    assert store.lookup({"label": b}) == (None, None)
+    store.close()
+
+def test_lookup_reuses_answer_of_reworded_question():
+    store = FieldAnswers(PROFILE, path=":memory:")
+    store.remember({"label": "Years of Python experience"}, "5", "user")
+    assert store.lookup({"label": "How many years have you worked with Python?"}) == ("5", "fuzzy")
+    store.close()
+
+def test_first_and_last_name_stay_apart():
+    store = FieldAnswers(PROFILE, path=":memory:")
+    assert store.lookup({"label": "Last name"}) == ("Doe", "profile")
+    assert store.lookup({"label": "Preferred first name"}) == (None, None)
+    store.close()
+
+def test_empty_profile_value_falls_through_to_the_store():
+    store = FieldAnswers(PROFILE, path=":memory:")
+    assert store.lookup({"name": "linkedin"}) == (None, None)
+    store.remember({"name": "linkedin"}, "https://linkedin.com/in/jane", "user")
+    assert store.lookup({"name": "linkedin"}) == ("https://linkedin.com/in/jane", "exact")
+    store.close()
@@ -0,0 +1,181 @@
+import os
+import re
+import json
+import math
+import time
+import threading
+from contextlib import contextmanager
+
+TRACE_DIR = os.getenv("TRACE_DIR", "traces")  # Empty disables the JSON-lines trace file
+# 0: quiet (run summaries only), 1: also failures and warnings, 2: every progress line
+VERBOSITY = int(os.getenv("JOB_APPLIER_VERBOSITY", "2"))
+# USD per million tokens for the cost estimate (defaults: Grok 3 list prices)
+PRICE_INPUT = float(os.getenv("LLM_PRICE_INPUT", "3.0"))
+PRICE_OUTPUT = float(os.getenv("LLM_PRICE_OUTPUT", "15.0"))
+
+_IMPORTANT = re.compile(r"^(Failure|Warning|Could not|Sensitive)", re.IGNORECASE)
+
+def percentile(values, fraction):
+    """Nearest-rank percentile of a non-empty list."""
+    ordered = sorted(values)
+    return ordered[max(0, math.ceil(fraction * len(ordered)) - 1)]
+
+class Tracer:
+    """
+    Collects timed spans (name, start, duration, attributes such as URL, endpoint
+    or tokens in/out) from every thread. Each span is appended to a JSON-lines
+    trace file as it ends; close() prints a run summary (count, p50, p95 and
+    total time per span name, tokens, cost estimate, applications per hour) and
+    can also write a Chrome trace viewer file (chrome://tracing, Perfetto) and
+    export the spans to an OpenTelemetry collector over OTLP/HTTP.
+    A Tracer without a path only keeps the in-memory summary.
+    """
+
+    def __init__(self, path=None, chrome_path=None, otlp_endpoint=None):
+        self.path = path
+        self.chrome_path = chrome_path
+        self.otlp_endpoint = otlp_endpoint
+        self.started = time.time()
+        self.spans = []
+        self.counts = {}
+        self._lock = threading.Lock()
+        self._file = None
+        if path:
+            os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+            self._file = open(path, "a", buffering=1 << 16)
+
+    @contextmanager
+    def span(self, name, **attrs):
+        """Time the block as one span; the yielded dict takes attributes learned inside it (e.g. tokens)."""
+        start = time.time()
+        try:
+            yield attrs
+        except BaseException as e:
+            attrs["error"] = type(e).__name__
+            raise
+        finally:
+            self.add(name, start, time.time() - start, **attrs)
+
+    def add(self, name, start, duration, **attrs):
+        record = {"name": name, "start": start, "duration": duration,
+                  "thread": threading.current_thread().name, **attrs}
+        with self._lock:
+            self.spans.append(record)
+            if self._file is not None:
+                self._file.write(json.dumps(record, default=str) + "\n")
+
+    def count(self, name, n=1):
+        """Count an outcome (e.g. "applied") for the per-hour rates in the summary."""
+        with self._lock:
+            self.counts[name] = self.counts.get(name, 0) + n
+
+    def summary(self):
+        with self._lock:
+            spans = list(self.spans)
+            counts = dict(self.counts)
+        stages = {}
+        for record in spans:
+            stages.setdefault(record["name"], []).append(record["duration"])
+        tokens_in = sum(record.get("tokens_in") or 0 for record in spans)
+        tokens_out = sum(record.get("tokens_out") or 0 for record in spans)
+        hours = max(time.time() - self.started, 1e-9) / 3600
+        return {
+            "elapsed": hours * 3600,
+            "stages": {name: {"count": len(d), "p50": percentile(d, 0.5), "p95": percentile(d, 0.95),
+                              "total": sum(d)} for name, d in sorted(stages.items())},
+            "tokens_in": tokens_in,
+            "tokens_out": tokens_out,
+            "cost": (tokens_in * PRICE_INPUT + tokens_out * PRICE_OUTPUT) / 1e6,
+            "per_hour": {name: n / hours for name, n in counts.items()},
+            "counts": counts,
+        }
+
+    def report(self):
+        summary = self.summary()
+        if not summary["stages"]:
+            return
+        print(f"Run trace ({summary['elapsed']:.0f}s{', ' + self.path if self.path else ''}):")
+        for name, stats in summary["stages"].items():
+            print(f"  {name}: {stats['count']} spans, p50 {stats['p50']:.2f}s, p95 {stats['p95']:.2f}s, "
+                  f"{stats['total']:.1f}s total")
+        print(f"  LLM tokens: {summary['tokens_in']} in, {summary['tokens_out']} out, "
+              f"~${summary['cost']:.4f} at ${PRICE_INPUT}/${PRICE_OUTPUT} per million")
+        for name, rate in summary["per_hour"].items():
+            print(f"  {name}: {summary['counts'][name]} ({rate:.1f}/hour)")
+
+    def write_chrome_trace(self, path):
+        """Chrome trace event format: one complete ("X") event per span, one track per thread."""
+        threads = {}
+        events = []
+        with self._lock:
+            spans = list(self.spans)
+        for record in spans:
+            tid = threads.setdefault(record["thread"], len(threads) + 1)
+            args = {k: v for k, v in record.items() if k not in ("name", "start", "duration", "thread")}
+            events.append({"name": record["name"], "ph": "X", "pid": 1, "tid": tid,
+                           "ts": int(record["start"] * 1e6), "dur": int(record["duration"] * 1e6), "args": args})
+        events.extend({"name": "thread_name", "ph": "M", "pid": 1, "tid": tid, "args": {"name": name}}
+                      for name, tid in threads.items())
+        with open(path, "w") as f:
+            json.dump({"traceEvents": events, "displayTimeUnit": "ms"}, f, default=str)
+        print(f"Chrome trace written to {path}")
+
+    def export_otlp(self, endpoint):
+        """Send the spans to an OpenTelemetry collector (needs opentelemetry-sdk and the OTLP HTTP exporter)."""
+        try:
+            from opentelemetry.sdk.trace import TracerProvider
+            from opentelemetry.sdk.trace.export import BatchSpanProcessor
+            from opentelemetry.exporter.otlp.proto.http.trace_exporter import OTLPSpanExporter
+        except ImportError:
+            print("Tracing: OTLP export needs opentelemetry-sdk and opentelemetry-exporter-otlp-proto-http")
+            return
+        provider = TracerProvider()
+        provider.add_span_processor(BatchSpanProcessor(OTLPSpanExporter(endpoint=endpoint)))
+        tracer = provider.get_tracer("job_applier")
+        with self._lock:
+            spans = list(self.spans)
+        for record in spans:
+            attributes = {k: v if isinstance(v, (str, bool, int, float)) else str(v)
+                          for k, v in record.items() if k not in ("name", "start", "duration") and v is not None}
+            span = tracer.start_span(record["name"], start_time=int(record["start"] * 1e9), attributes=attributes)
+            span.end(end_time=int((record["start"] + record["duration"]) * 1e9))
+        provider.shutdown()
+        print(f"Tracing: exported {len(spans)} spans to {endpoint}")
+
+    def close(self):
+        self.report()
+        with self._lock:
+            if self._file is not None:
+                self._file.close()
+                self._file = None
+        if self.chrome_path:
+            self.write_chrome_trace(self.chrome_path)
+        if self.otlp_endpoint:
+            self.export_otlp(self.otlp_endpoint)
+
+# Process-wide tracer: modules record into it without being handed one. Until a
+# script calls configure() it only keeps the in-memory summary.
+_tracer = Tracer()
+
+def configure(run_name="run", chrome_path=None, otlp_endpoint=None, verbosity=None):
+    """Start tracing this run to TRACE_DIR/<run_name>-<timestamp>.jsonl; returns the Tracer."""
+    global _tracer, VERBOSITY
+    if verbosity is not None:
+        VERBOSITY = verbosity
+    path = os.path.join(TRACE_DIR, f"{run_name}-{time.strftime('%Y%m%d-%H%M%S')}.jsonl") if TRACE_DIR else None
+    _tracer = Tracer(path, chrome_path=chrome_path, otlp_endpoint=otlp_endpoint)
+    return _tracer
+
+def tracer():
+    return _tracer
+
+def span(name, **attrs):
+    return _tracer.span(name, **attrs)
+
+def count(name, n=1):
+    _tracer.count(name, n)
+
+def log(message):
+    """print() for progress lines, filtered by VERBOSITY; failures and warnings survive level 1."""
+    if VERBOSITY >= 2 or (VERBOSITY == 1 and _IMPORTANT.match(message)):
+        print(message)